@@ -0,0 +1,129 @@
+"""Offline performance benchmarks for the backend.
+
+Run from backend/ (needs mongomock-motor unless BENCH_MONGO=real):
+
+    python -m benchmarks micro [--repeat N] [--output micro.json]
+    python -m benchmarks load [--duration S] [--concurrency N] [--output load.json]
+    python -m benchmarks serialization [--iterations N]
+    python -m benchmarks startup [--repeat N]
+    python -m benchmarks compare baseline.json current.json [--threshold 10]
+
+Every run writes one JSON document (stdout, or --output) with the git commit
+it ran on, so results from two commits can be fed to ``compare``.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+from benchmarks.harness import peak_rss_mb, run_metadata
+
+# Metrics where a bigger number is an improvement; everything else is a cost
+HIGHER_IS_BETTER = ("throughput_rps", "speedup")
+COMPARED_SUFFIXES = ("p50_ms", "p99_ms", "mean_ms", "_us", "throughput_rps", "bytes", "self", "children", "import_server_ms", "rss_mb")
+
+
+def flatten(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from flatten(value, f"{prefix}/{key}" if prefix else str(key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    """Print per-metric changes and return the number of regressions beyond threshold percent"""
+    before = dict(flatten(baseline.get("results", {})))
+    after = dict(flatten(current.get("results", {})))
+    regressions = 0
+    print(f"baseline {baseline.get('meta', {}).get('commit')} -> current {current.get('meta', {}).get('commit')}")
+    for key in sorted(before.keys() & after.keys()):
+        if not any(part in key for part in COMPARED_SUFFIXES) or before[key] == 0:
+            continue
+        change = (after[key] - before[key]) / before[key] * 100
+        worse = -change if any(part in key for part in HIGHER_IS_BETTER) else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:80s} {before[key]:>12.3f} {after[key]:>12.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    micro = commands.add_parser("micro", help="per-function micro-benchmarks")
+    micro.add_argument("--repeat", type=int, default=20)
+
+    load = commands.add_parser("load", help="end-to-end load scenario")
+    load.add_argument("--duration", type=float, default=10.0)
+    load.add_argument("--concurrency", type=int, default=16)
+    load.add_argument("--upload-ratio", type=float, default=0.2)
+    load.add_argument("--pages", type=int, default=2)
+    load.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM latency in seconds")
+    load.add_argument("--executor", choices=("process", "thread"), default="process")
+    load.add_argument("--repeat-uploads", action="store_true", help="upload one file repeatedly (parse cache hits)")
+
+    serialization = commands.add_parser("serialization", help="JSON encoding and compression")
+    serialization.add_argument("--iterations", type=int, default=2000)
+
+    startup = commands.add_parser("startup", help="cold-start import time and RSS of the API process")
+    startup.add_argument("--repeat", type=int, default=5)
+
+    for command in (micro, load, serialization, startup):
+        command.add_argument("--output", help="write JSON here instead of stdout")
+
+    compare_parser = commands.add_parser("compare", help="diff two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    if args.command == "micro":
+        from benchmarks import micro as module
+        results = module.run(repeat=args.repeat)
+    elif args.command == "load":
+        from benchmarks import load as module
+        results = module.run(
+            duration=args.duration,
+            concurrency=args.concurrency,
+            upload_ratio=args.upload_ratio,
+            pages=args.pages,
+            llm_latency=args.llm_latency,
+            unique_uploads=not args.repeat_uploads,
+            executor=args.executor,
+        )
+    elif args.command == "startup":
+        from benchmarks import startup as module
+        results = module.run(repeat=args.repeat)
+    else:
+        from benchmarks import bench_serialization as module
+        results = module.run(iterations=args.iterations)
+
+    document = {
+        "benchmark": args.command,
+        "meta": run_metadata(),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    output = json.dumps(document, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
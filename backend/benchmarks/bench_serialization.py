@@ -0,0 +1,101 @@
+"""Serialization and compression cost of realistic API payloads.
+
+Compares the stdlib encoder FastAPI used before (jsonable_encoder + json.dumps)
+with orjson, and raw bytes against gzip and brotli, on a parse_resume response
+and a get_portfolio response. Run from backend/:
+
+    python -m benchmarks.bench_serialization [--iterations N]
+
+Prints one JSON document to stdout; also runs as ``python -m benchmarks serialization``.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.corpus import make_parsed_resume
+from compression import brotli
+
+def make_payloads(seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    parsed = make_parsed_resume(rng)
+    return {
+        "parse_resume": {
+            "success": True,
+            "parsed_data": parsed,
+            "message": "Resume parsed successfully",
+            "extracted_text_length": 5400,
+            "extraction_strategy": "pdfium",
+            "cached": False,
+        },
+        "get_portfolio": {
+            "success": True,
+            "portfolio": {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "username": "jordan_example",
+                "parsed_resume": parsed,
+                "selected_template": "proclassic",
+                "route_slug": "jordan_example_1a2b3c4d",
+                "created_at": datetime(2026, 1, 1, 12, 0, 0),
+            },
+        },
+    }
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_payload(payload: dict, iterations: int) -> dict:
+    def stdlib():
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast():
+        return orjson.dumps(payload)
+
+    body = fast()
+    result = {
+        "serialize_us": {
+            "stdlib": round(time_per_call(stdlib, iterations), 2),
+            "orjson": round(time_per_call(fast, iterations), 2),
+        },
+        "bytes": {
+            "raw": len(body),
+            "gzip_6": len(gzip.compress(body, compresslevel=6)),
+        },
+        "compress_us": {
+            "gzip_6": round(time_per_call(lambda: gzip.compress(body, compresslevel=6), max(1, iterations // 10)), 2),
+        },
+    }
+    result["serialize_us"]["speedup"] = round(result["serialize_us"]["stdlib"] / result["serialize_us"]["orjson"], 1)
+    if brotli is not None:
+        result["bytes"]["brotli_5"] = len(brotli.compress(body, quality=5))
+        result["compress_us"]["brotli_5"] = round(
+            time_per_call(lambda: brotli.compress(body, quality=5), max(1, iterations // 10)), 2
+        )
+    return result
+
+
+def run(iterations: int = 2000) -> dict:
+    return {name: bench_payload(payload, iterations) for name, payload in make_payloads().items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(json.dumps({"benchmark": "serialization", "iterations": args.iterations, "results": run(args.iterations)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
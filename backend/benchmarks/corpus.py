@@ -0,0 +1,158 @@
+"""Synthetic resume corpus for the benchmarks: PDFs and DOCX files of any page count.
+
+PDFs are written directly (one Helvetica text stream per page) so no PDF
+library is needed to generate them; DOCX files are built with python-docx.
+Everything is seeded, so the same arguments always give the same bytes.
+"""
+import io
+import random
+from typing import List
+
+import docx
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "MongoDB", "PostgreSQL", "Docker",
+    "Kubernetes", "AWS", "GCP", "FastAPI", "Django", "GraphQL", "Redis", "Terraform", "Go", "Rust",
+    "Machine Learning", "PyTorch", "Pandas", "CI/CD", "Linux", "Kafka", "Spark", "Figma",
+]
+WORDS = (
+    "designed built led shipped scaled migrated optimized reduced latency throughput platform service "
+    "pipeline customers revenue team architecture reliability observability features dashboard api "
+    "infrastructure automated tested deployed mentored collaborated delivered improved"
+).split()
+LINES_PER_PAGE = 48
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_parsed_resume(rng: random.Random, experiences: int = 6, projects: int = 5) -> dict:
+    """A ParsedResumeData-shaped dict roughly the size Gemini returns for a two-page CV"""
+    return {
+        "name": "Jordan Example",
+        "email": "jordan.example@email.com",
+        "phone": "+1-555-010-0199",
+        "location": "Austin, TX",
+        "skills": rng.sample(SKILLS, 18),
+        "education": [
+            {"degree": "B.S. Computer Science", "institution": "State University", "year": "2012-2016", "details": sentence(rng, 12)},
+            {"degree": "M.S. Software Engineering", "institution": "Tech Institute", "year": "2016-2018", "details": sentence(rng, 10)},
+        ],
+        "experience": [
+            {
+                "title": rng.choice(["Software Engineer", "Senior Engineer", "Staff Engineer", "Tech Lead"]),
+                "company": f"Company {i}",
+                "duration": f"{2018 + i} - {2019 + i}",
+                "description": " ".join(sentence(rng, 14) for _ in range(4)),
+            }
+            for i in range(experiences)
+        ],
+        "projects": [
+            {
+                "name": f"Project {i}",
+                "description": " ".join(sentence(rng, 12) for _ in range(2)),
+                "technologies": ", ".join(rng.sample(SKILLS, 4)),
+                "link": f"https://github.com/example/project-{i}",
+            }
+            for i in range(projects)
+        ],
+        "socials": {
+            "linkedin": "https://linkedin.com/in/example",
+            "github": "https://github.com/example",
+            "website": "https://example.dev",
+        },
+    }
+
+
+def make_resume_lines(pages: int, seed: int = 0) -> List[str]:
+    """Plain-text resume lines filling ``pages`` pages"""
+    rng = random.Random(seed)
+    lines = [
+        f"Jordan Example {seed}",
+        "Senior Software Engineer",
+        f"jordan.{seed}@email.com",
+        "+1-555-010-0199",
+        "Austin, TX",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 12)),
+        "EXPERIENCE",
+    ]
+    company = 0
+    while len(lines) < pages * LINES_PER_PAGE - 6:
+        company += 1
+        lines.append(f"{rng.choice(['Software Engineer', 'Senior Engineer', 'Tech Lead'])} at Company {company} ({2010 + company % 15} - {2011 + company % 15})")
+        lines.extend(f"- {sentence(rng, 11)}" for _ in range(4))
+    lines.extend([
+        "EDUCATION",
+        "B.S. Computer Science, State University (2012-2016)",
+        "PROJECTS",
+        f"Project {seed}: {sentence(rng, 8)}",
+        "GitHub: https://github.com/example",
+        "LinkedIn: https://linkedin.com/in/example",
+    ])
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int = 2, seed: int = 0) -> bytes:
+    """A text PDF with ``pages`` pages of resume content"""
+    lines = make_resume_lines(pages, seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_refs = []
+    for page in range(pages):
+        page_lines = lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]
+        stream = "BT /F1 10 Tf 14 TL 50 770 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in page_lines) + " ET"
+        stream_bytes = stream.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(pages: int = 2, seed: int = 0, tables: int = 0, table_rows: int = 8) -> bytes:
+    """A DOCX resume with ``pages`` pages worth of paragraphs and ``tables`` skills tables.
+
+    Each table has a merged header row spanning all columns, the layout that
+    makes python-docx report the same cell several times.
+    """
+    rng = random.Random(seed)
+    document = docx.Document()
+    for line in make_resume_lines(pages, seed):
+        document.add_paragraph(line)
+    for index in range(tables):
+        table = document.add_table(rows=table_rows + 1, cols=3)
+        header = table.cell(0, 0).merge(table.cell(0, 2))
+        header.text = f"Skills matrix {index}"
+        for row in range(1, table_rows + 1):
+            table.cell(row, 0).text = rng.choice(SKILLS)
+            table.cell(row, 1).text = f"{rng.randint(1, 10)} years"
+            table.cell(row, 2).text = sentence(rng, 6)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
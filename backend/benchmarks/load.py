@@ -0,0 +1,102 @@
+"""End-to-end load scenario against the in-process app.
+
+A fixed number of concurrent clients issue a mix of resume uploads and
+portfolio reads for a set duration, the way public traffic and onboarding
+overlap in production. Uploads are unique files by default so they miss
+the parse cache and exercise extraction plus the (fake) LLM.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.corpus import make_parsed_resume, make_pdf
+from benchmarks.harness import load_offline_server, summarize
+
+
+async def run_scenario(
+    server,
+    duration: float,
+    concurrency: int,
+    upload_ratio: float,
+    pages: int,
+    portfolios: int,
+    unique_uploads: bool,
+) -> Dict[str, Any]:
+    import httpx
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    shared_pdf = make_pdf(pages, seed=0)
+    upload_seq = 0
+
+    await server.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            slugs = []
+            for index in range(portfolios):
+                response = await client.post("/api/portfolio/deploy", json={
+                    "username": f"user {index}",
+                    "selected_template": "proclassic",
+                    "parsed_resume": make_parsed_resume(random.Random(index)),
+                })
+                slugs.append(response.json()["portfolio_url"].split("/")[-1])
+
+            async def upload():
+                nonlocal upload_seq
+                upload_seq += 1
+                pdf = make_pdf(pages, seed=upload_seq) if unique_uploads else shared_pdf
+                return await client.post("/api/resume/parse", files={"file": ("resume.pdf", pdf, "application/pdf")})
+
+            async def read():
+                return await client.get(f"/api/portfolio/{random.choice(slugs)}")
+
+            deadline = time.perf_counter() + duration
+
+            async def worker(rng: random.Random):
+                while time.perf_counter() < deadline:
+                    route, call = ("parse_resume", upload) if rng.random() < upload_ratio else ("get_portfolio", read)
+                    start = time.perf_counter()
+                    try:
+                        response = await call()
+                        if response.status_code >= 400:
+                            errors[f"{route}:{response.status_code}"] += 1
+                    except Exception as e:
+                        errors[f"{route}:{type(e).__name__}"] += 1
+                    latencies[route].append(time.perf_counter() - start)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(random.Random(seed)) for seed in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await server.app.router.shutdown()
+
+    return {
+        "config": {
+            "duration_s": duration,
+            "concurrency": concurrency,
+            "upload_ratio": upload_ratio,
+            "pages": pages,
+            "unique_uploads": unique_uploads,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": {route: round(len(values) / elapsed, 2) for route, values in latencies.items()},
+        "latency": {route: summarize(values) for route, values in latencies.items()},
+        "errors": dict(errors),
+    }
+
+
+def run(
+    duration: float = 10.0,
+    concurrency: int = 16,
+    upload_ratio: float = 0.2,
+    pages: int = 2,
+    portfolios: int = 50,
+    llm_latency: float = 0.3,
+    unique_uploads: bool = True,
+    executor: str = "process",
+) -> Dict[str, Any]:
+    server = load_offline_server(llm_latency=llm_latency, executor=executor)
+    return asyncio.run(run_scenario(server, duration, concurrency, upload_ratio, pages, portfolios, unique_uploads))
@@ -0,0 +1,243 @@
+"""Micro-benchmarks for the backend hot paths, one case per function and input size."""
+import asyncio
+import io
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.corpus import make_docx, make_parsed_resume, make_pdf, make_resume_lines
+from benchmarks.harness import load_offline_server, summarize, time_calls
+
+PDF_PAGES = (1, 2, 5, 10, 20)
+DOCX_PAGES = (1, 5, 20)
+PDF_STRATEGIES = ("pdfium", "pypdf2", "pdfplumber")
+
+
+async def time_async_calls(fn: Callable[[], Awaitable[Any]], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        await fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_extraction(repeat: int) -> Dict[str, Any]:
+    from extraction import extract_text_from_docx, extract_text_from_pdf, get_pdf_strategy_order
+
+    results = {}
+    for pages in PDF_PAGES:
+        pdf = make_pdf(pages, seed=pages)
+        results[f"extract_text_from_pdf[pages={pages}]"] = summarize(time_calls(lambda: extract_text_from_pdf(pdf), repeat))
+
+        # Each strategy on its own, to see what the cheap-first order saves
+        for strategy in PDF_STRATEGIES:
+            os.environ["PDF_EXTRACTION_STRATEGIES"] = strategy
+            if not get_pdf_strategy_order():
+                continue
+            results[f"extract_text_from_pdf[pages={pages},strategy={strategy}]"] = summarize(
+                time_calls(lambda: extract_text_from_pdf(pdf), repeat)
+            )
+        os.environ.pop("PDF_EXTRACTION_STRATEGIES", None)
+
+    for pages in DOCX_PAGES:
+        document = make_docx(pages, seed=pages, tables=2)
+        results[f"extract_text_from_docx[pages={pages}]"] = summarize(
+            time_calls(lambda: extract_text_from_docx(document), repeat)
+        )
+    return results
+
+
+def peak_allocated_mb(fn: Callable[[], Any]) -> float:
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_docx(repeat: int) -> Dict[str, Any]:
+    """Streaming DOCX reader against the python-docx object model on table-heavy resumes"""
+    from extraction import extract_docx_streaming, extract_docx_with_python_docx
+
+    results = {}
+    for pages, tables in ((2, 5), (5, 20)):
+        document = make_docx(pages, seed=pages, tables=tables, table_rows=12)
+        for name, extract in (("stream", extract_docx_streaming), ("python-docx", extract_docx_with_python_docx)):
+            case = f"pages={pages},tables={tables},reader={name}"
+            results[f"extract_docx[{case}]"] = summarize(time_calls(lambda: extract(document), repeat))
+            results[f"extract_docx_peak_mb[{case}]"] = peak_allocated_mb(lambda: extract(document))
+            results[f"extract_docx_chars[{case}]"] = len(extract(document))
+    return results
+
+
+def bench_prompt(repeat: int) -> Dict[str, Any]:
+    """Normalization plus pre-parse cost, and estimated prompt tokens saved, per document"""
+    from extraction import extract_pdf, extract_text_from_docx
+    from normalize import estimate_tokens, normalize_resume_text
+    from preparse import build_llm_prompt, preparse_resume
+
+    documents = {
+        "pdf[pages=2]": extract_pdf(make_pdf(2, seed=2)).text,
+        "pdf[pages=10]": extract_pdf(make_pdf(10, seed=10)).text,
+        "docx[pages=5,tables=3]": extract_text_from_docx(make_docx(5, seed=5, tables=3)),
+    }
+    results = {}
+    for name, text in documents.items():
+        def prepare():
+            normalized = normalize_resume_text(text)
+            return build_llm_prompt(preparse_resume(normalized.text), normalized.text, token_budget=6000)
+
+        results[f"prepare_prompt[{name}]"] = summarize(time_calls(prepare, repeat))
+        results[f"prompt_tokens[{name}]"] = {"raw": estimate_tokens(text), "sent": estimate_tokens(prepare())}
+    return results
+
+
+def bench_metrics(repeat: int) -> Dict[str, Any]:
+    """Per-call cost of the instrumentation wrapped around each stage"""
+    from metrics import stage_timer
+
+    def timed_blocks(count: int = 10000):
+        for _ in range(count):
+            with stage_timer("bench", "noop"):
+                pass
+
+    return {"stage_timer[x10000]": summarize(time_calls(timed_blocks, repeat))}
+
+
+class SlowStream(io.StringIO):
+    """A log sink whose writes block, like a stderr pipe the log collector has stopped draining"""
+
+    def write(self, text: str) -> int:
+        time.sleep(0.00005)
+        return super().write(text)
+
+
+def bench_logging(repeat: int) -> Dict[str, Any]:
+    """Caller-side cost of a log call through the queue handler, against formatting and writing inline"""
+    import logging
+    import logging.handlers
+    import queue
+
+    from logs import JsonFormatter, RequestQueueHandler
+
+    logger = logging.getLogger("bench.logging")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    def log_lines(count: int = 1000):
+        for i in range(count):
+            logger.info("Extracted %d characters via %s", i, "pdfium", extra={"text_chars": i, "strategy": "pdfium"})
+
+    results = {}
+    for sink in ("memory", "slow"):
+        stream = logging.StreamHandler(SlowStream() if sink == "slow" else io.StringIO())
+        stream.setFormatter(JsonFormatter())
+        logger.handlers = [stream]
+        results[f"log_call[inline,sink={sink},x1000]"] = summarize(time_calls(log_lines, repeat))
+
+        log_queue: queue.Queue = queue.Queue()
+        listener = logging.handlers.QueueListener(log_queue, stream)
+        listener.start()
+        logger.handlers = [RequestQueueHandler(log_queue)]
+        try:
+            results[f"log_call[queued,sink={sink},x1000]"] = summarize(time_calls(log_lines, repeat))
+        finally:
+            listener.stop()
+            logger.handlers = []
+    return results
+
+
+def bench_json_stream(repeat: int) -> Dict[str, Any]:
+    """Incremental decoding of a streamed LLM reply against one json.loads of the whole reply"""
+    import json
+    import random
+
+    from json_stream import IncrementalJsonDecoder
+
+    reply = "```json\n" + json.dumps(make_parsed_resume(random.Random(1))) + "\n```"
+
+    def decode_stream(chunk_chars: int = 64):
+        decoder = IncrementalJsonDecoder()
+        for i in range(0, len(reply), chunk_chars):
+            decoder.feed(reply[i:i + chunk_chars])
+        return decoder.result()
+
+    return {
+        "json_stream_decode[chunks=64]": summarize(time_calls(decode_stream, repeat)),
+        "json_loads[whole_reply]": summarize(time_calls(lambda: json.loads(reply[8:-4]), repeat)),
+    }
+
+
+async def bench_app(server, repeat: int) -> Dict[str, Any]:
+    import httpx
+    import random
+
+    results = {}
+    resume_text = "\n".join(make_resume_lines(2))
+    results["parse_resume_with_gemini[fake_llm]"] = summarize(
+        await time_async_calls(lambda: server.parse_resume_with_gemini(resume_text), repeat)
+    )
+
+    await server.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            body = {
+                "username": "Jordan Example",
+                "selected_template": "proclassic",
+                "parsed_resume": make_parsed_resume(random.Random(1)),
+            }
+            slugs = []
+
+            async def deploy():
+                response = await client.post("/api/portfolio/deploy", json=body)
+                slugs.append(response.json()["portfolio_url"].split("/")[-1])
+
+            results["deploy_portfolio"] = summarize(await time_async_calls(deploy, repeat))
+
+            # Per-portfolio cost of a bulk deploy, to compare with deploy_portfolio above
+            batch = {"portfolios": [body] * 100}
+            batch_latencies = await time_async_calls(lambda: client.post("/api/portfolio/deploy/batch", json=batch), repeat)
+            results["deploy_portfolio_batch[n=100]"] = summarize(batch_latencies)
+            results["deploy_portfolio_batch[per_item]"] = summarize([latency / 100 for latency in batch_latencies])
+
+            # Stored BSON per deployed portfolio, with the shared parsed resumes spread across them
+            import bson
+
+            portfolio_bytes = sum([len(bson.encode(doc)) async for doc in server.db.portfolios.find({})])
+            resume_bytes = sum([len(bson.encode(doc)) async for doc in server.db.parsed_resumes.find({})])
+            deployed = await server.db.portfolios.count_documents({})
+            results["stored_bytes[per_portfolio]"] = round((portfolio_bytes + resume_bytes) / deployed)
+            results["stored_bytes[embedded_resume]"] = len(bson.encode({"parsed_resume": body["parsed_resume"]}))
+
+            slug = slugs[0]
+            results["get_portfolio[warm]"] = summarize(
+                await time_async_calls(lambda: client.get(f"/api/portfolio/{slug}"), repeat)
+            )
+
+            async def cold_read():
+                server.portfolio_cache.memory.clear()
+                await client.get(f"/api/portfolio/{slug}")
+
+            results["get_portfolio[cold]"] = summarize(await time_async_calls(cold_read, repeat))
+    finally:
+        await server.app.router.shutdown()
+    return results
+
+
+def run(repeat: int = 20) -> Dict[str, Any]:
+    server = load_offline_server(llm_latency=0.0)
+    results = bench_extraction(repeat)
+    results.update(bench_docx(repeat))
+    results.update(bench_prompt(repeat))
+    results.update(bench_metrics(repeat))
+    results.update(bench_logging(repeat))
+    results.update(bench_json_stream(repeat))
+    results.update(asyncio.run(bench_app(server, repeat)))
+    return results
@@ -0,0 +1,67 @@
+"""Cold-start cost of importing the app: wall time, RSS and an import-time breakdown.
+
+Each repeat imports server.py in a fresh interpreter under ``-X importtime``.
+Self times are summed per top-level package, which attributes every
+microsecond exactly once, and the run records which of the heavy parser
+and LLM libraries ended up loaded in the API process.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+HEAVY_MODULES = ("pdfplumber", "PyPDF2", "pypdfium2", "docx", "emergentintegrations", "litellm", "httpx")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from benchmarks.harness import load_offline_server
+load_offline_server()
+elapsed = time.perf_counter() - start
+scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+print(json.dumps({
+    "import_s": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self import time in milliseconds per top-level package"""
+    totals: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        totals[name.split(".")[0]] += int(self_us) / 1000
+    return totals
+
+
+def probe_once() -> Dict[str, Any]:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=backend_dir, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["packages_ms"] = parse_importtime(completed.stderr)
+    return result
+
+
+def run(repeat: int = 5, top: int = 15) -> Dict[str, Any]:
+    probes: List[Dict[str, Any]] = [probe_once() for _ in range(repeat)]
+    packages = defaultdict(list)
+    for probe in probes:
+        for name, ms in probe["packages_ms"].items():
+            packages[name].append(ms)
+    breakdown = sorted(((name, statistics.median(values)) for name, values in packages.items()), key=lambda item: -item[1])
+    return {
+        "import_server_ms": round(statistics.median(probe["import_s"] for probe in probes) * 1000, 1),
+        "rss_mb": round(statistics.median(probe["rss_mb"] for probe in probes), 1),
+        "heavy_modules_loaded": probes[-1]["loaded"],
+        "import_breakdown_ms": {name: round(ms, 1) for name, ms in breakdown[:top]},
+    }
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Hashable, Optional
+
+import orjson
+
+from metrics import stage_timer
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry TTL and a total size budget.
+
+    Entries are evicted least-recently-used first whenever either ``max_entries``
+    or ``max_bytes`` would be exceeded. Sizes are supplied by the caller, so the
+    budget is only as accurate as the estimate passed to ``set``.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = 1, ttl: Optional[float] = None) -> None:
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ParseCache:
+    """Two-tier cache of resume parse results keyed by file hash and parser version.
+
+    Lookups hit the in-process LRU first and fall back to the ``parse_cache``
+    MongoDB collection, promoting database hits into memory. Each entry holds
+    the extracted text and, when the LLM call succeeded, the parsed resume.
+    """
+
+    def __init__(self, collection, version: str, memory: TTLCache, db_ttl_seconds: int = 30 * 24 * 3600):
+        self.collection = collection
+        self.version = version
+        self.memory = memory
+        self.db_ttl_seconds = db_ttl_seconds
+        self.db_hits = 0
+        self.db_errors = 0
+
+    def make_key(self, file_hash: str) -> str:
+        return f"{file_hash}:{self.version}"
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("key", unique=True)
+        await self.collection.create_index("created_at", expireAfterSeconds=self.db_ttl_seconds)
+
+    async def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(file_hash)
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+
+        try:
+            with stage_timer("db_find", self.collection.name):
+                doc = await self.collection.find_one({"key": key}, {"_id": 0, "resume_text": 1, "parsed_data": 1})
+        except Exception as e:
+            self.db_errors += 1
+            logging.error("Parse cache lookup failed: %s", e)
+            return None
+        if not doc:
+            return None
+
+        self.db_hits += 1
+        entry = {"resume_text": doc.get("resume_text", ""), "parsed_data": doc.get("parsed_data")}
+        self.memory.set(key, entry, size=self._entry_size(entry))
+        return entry
+
+    async def set(self, file_hash: str, resume_text: str, parsed_data: Optional[Dict[str, Any]]) -> None:
+        key = self.make_key(file_hash)
+        entry = {"resume_text": resume_text, "parsed_data": parsed_data}
+        self.memory.set(key, entry, size=self._entry_size(entry))
+        try:
+            with stage_timer("db_upsert", self.collection.name):
+                await self.collection.update_one(
+                    {"key": key},
+                    {"$set": {**entry, "created_at": datetime.utcnow()}},
+                    upsert=True,
+                )
+        except Exception as e:
+            self.db_errors += 1
+            logging.error("Parse cache write failed: %s", e)
+
+    @staticmethod
+    def _entry_size(entry: Dict[str, Any]) -> int:
+        size = len(entry["resume_text"].encode("utf-8"))
+        if entry["parsed_data"] is not None:
+            size += len(json.dumps(entry["parsed_data"], default=str))
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        return {
+            "version": self.version,
+            "memory": memory,
+            "db_hits": self.db_hits,
+            "db_errors": self.db_errors,
+            # memory misses include the lookups that were then served from MongoDB
+            "misses": memory["misses"] - self.db_hits,
+        }
+
+
+@dataclass
+class CachedPortfolio:
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+    @property
+    def last_modified_header(self) -> str:
+        return format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Evaluate conditional request headers; If-None-Match takes precedence per RFC 9110"""
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates have one-second resolution
+            return self.last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+        return False
+
+
+# Stored with each portfolio for search and edit authorization; not part of the API response
+PORTFOLIO_PROJECTION = {"_id": 0, "summary": 0, "search": 0, "edit_token_hash": 0}
+
+
+class PortfolioCache:
+    """Read-through cache of published portfolios, keyed by route slug.
+
+    Entries hold the already-serialized response body with its ETag, so a
+    cache hit costs neither a Mongo round-trip nor JSON encoding. Writers
+    must call ``invalidate`` for the slug they change; that only clears this
+    process, so other processes serve the old entry until its TTL expires.
+
+    Misses are read through ``read_collection``, which may prefer
+    secondaries; a portfolio not found there is looked up on the primary,
+    since one deployed moments ago may not have replicated yet. With a
+    ``resumes`` store, the portfolio and its parsed resume are read in one
+    aggregation with ``$lookup``.
+    """
+
+    def __init__(self, collection, memory: TTLCache, read_collection=None, resumes=None):
+        self.collection = collection
+        self.read_collection = read_collection if read_collection is not None else collection
+        self.memory = memory
+        self.resumes = resumes
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("route_slug", unique=True)
+
+    async def get(self, route_slug: str) -> Optional[CachedPortfolio]:
+        entry = self.memory.get(route_slug)
+        if entry is not None:
+            return entry
+
+        portfolio = await self.fetch(route_slug)
+        if not portfolio:
+            return None
+
+        body = orjson.dumps({"success": True, "portfolio": portfolio}, default=str)
+        entry = CachedPortfolio(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            last_modified=portfolio.get("updated_at") or portfolio.get("created_at") or datetime.utcnow(),
+        )
+        self.memory.set(route_slug, entry, size=len(body))
+        return entry
+
+    async def _find(self, collection, route_slug: str) -> Optional[Dict[str, Any]]:
+        if self.resumes is None:
+            return await collection.find_one({"route_slug": route_slug}, PORTFOLIO_PROJECTION)
+        pipeline = [
+            {"$match": {"route_slug": route_slug}},
+            {"$limit": 1},
+            self.resumes.lookup_stage(),
+            {"$project": PORTFOLIO_PROJECTION},
+        ]
+        documents = await collection.aggregate(pipeline).to_list(1)
+        return self.resumes.assemble(documents[0]) if documents else None
+
+    async def fetch(self, route_slug: str, primary: bool = False) -> Optional[Dict[str, Any]]:
+        """Load a portfolio from MongoDB, bypassing the in-process cache; writers pass ``primary``"""
+        with stage_timer("db_find", self.collection.name):
+            portfolio = await self._find(self.collection if primary else self.read_collection, route_slug)
+            if not portfolio and not primary and self.read_collection is not self.collection:
+                portfolio = await self._find(self.collection, route_slug)
+        return portfolio
+
+    def invalidate(self, route_slug: str) -> None:
+        self.memory.pop(route_slug)
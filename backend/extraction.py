@@ -0,0 +1,413 @@
+import asyncio
+import importlib
+import importlib.util
+import io
+import logging
+import os
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+from xml.parsers import expat
+
+# The parser libraries are imported on first use rather than at module load:
+# API processes that only serve portfolios never pay for them, and with the
+# process executor they are only ever loaded inside the extraction workers.
+# python-docx is only the fallback for DOCX files the streaming reader can't handle, so it isn't preloaded.
+PARSER_MODULES = ("pypdfium2", "PyPDF2", "pdfplumber")
+
+# Bump whenever extraction output changes so cached text is not reused
+EXTRACTOR_VERSION = "5"
+
+# A page with less text than this is retried with the next, more thorough strategy
+MIN_PAGE_CHARS = int(os.environ.get('PDF_MIN_PAGE_CHARS', '20'))
+# Documents longer than this are split into page chunks extracted in parallel
+PDF_PAGE_CHUNK = int(os.environ.get('PDF_PAGE_CHUNK', '8'))
+
+
+@lru_cache(maxsize=None)
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+class PdfStrategy:
+    """One way of pulling text out of a PDF, opened once and read page by page"""
+
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def __init__(self, file_content: bytes):
+        raise NotImplementedError
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def extract_page(self, index: int) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PdfiumStrategy(PdfStrategy):
+    """PDFium text extraction; native code, by far the cheapest"""
+
+    name = "pdfium"
+
+    @classmethod
+    def available(cls) -> bool:
+        # optional: shipped with recent pdfplumber releases
+        return _module_available("pypdfium2")
+
+    def __init__(self, file_content: bytes):
+        import pypdfium2
+
+        self._doc = pypdfium2.PdfDocument(file_content)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._doc)
+
+    def extract_page(self, index: int) -> str:
+        page = self._doc[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range().replace('\r\n', '\n')
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+    def close(self) -> None:
+        self._doc.close()
+
+
+class PyPDF2Strategy(PdfStrategy):
+    name = "pypdf2"
+
+    def __init__(self, file_content: bytes):
+        import PyPDF2
+
+        self._reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._reader.pages)
+
+    def extract_page(self, index: int) -> str:
+        return self._reader.pages[index].extract_text() or ""
+
+
+class PdfplumberStrategy(PdfStrategy):
+    """pdfplumber layout analysis; slowest, but copes best with unusual layouts"""
+
+    name = "pdfplumber"
+
+    def __init__(self, file_content: bytes):
+        import pdfplumber
+
+        self._pdf = pdfplumber.open(io.BytesIO(file_content))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def extract_page(self, index: int) -> str:
+        page = self._pdf.pages[index]
+        try:
+            return page.extract_text() or ""
+        finally:
+            page.close()
+
+    def close(self) -> None:
+        self._pdf.close()
+
+
+PDF_STRATEGIES: Dict[str, Type[PdfStrategy]] = {
+    strategy.name: strategy
+    for strategy in (PdfiumStrategy, PyPDF2Strategy, PdfplumberStrategy)
+}
+
+
+def get_pdf_strategy_order() -> List[Type[PdfStrategy]]:
+    """Strategies to try, cheapest first; override with PDF_EXTRACTION_STRATEGIES"""
+    names = os.environ.get('PDF_EXTRACTION_STRATEGIES', 'pdfium,pypdf2,pdfplumber').split(',')
+    order = []
+    for name in names:
+        strategy = PDF_STRATEGIES.get(name.strip())
+        if strategy is None:
+            logging.warning("Unknown PDF extraction strategy: %s", name)
+        elif strategy.available():
+            order.append(strategy)
+    return order
+
+
+def _is_usable(text: str) -> bool:
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return False
+    printable = sum(1 for char in stripped if char.isprintable() or char.isspace())
+    return printable / len(stripped) >= 0.9
+
+
+@dataclass
+class PdfExtraction:
+    text: str = ""
+    page_count: int = 0
+    # Strategy that produced each page's text ("" when no strategy found any)
+    page_strategies: List[str] = field(default_factory=list)
+
+    @property
+    def strategy(self) -> str:
+        """Strategy that produced the most pages, or "text" for the raw-decode fallback"""
+        used = [name for name in self.page_strategies if name]
+        if not used:
+            return "text" if self.text else ""
+        return max(set(used), key=used.count)
+
+
+def extract_pdf_pages(file_content: bytes, start: int = 0, stop: Optional[int] = None) -> Tuple[int, List[Tuple[str, str]]]:
+    """Extract pages [start, stop) cheapest-strategy-first.
+
+    Each strategy parses the document at most once; the first one opened also
+    serves as the probe for the page count. Returns the page count and a
+    (text, strategy name) pair per extracted page.
+    """
+    opened: List[PdfStrategy] = []
+    strategies = iter(get_pdf_strategy_order())
+
+    def open_next() -> Optional[PdfStrategy]:
+        for strategy in strategies:
+            try:
+                instance = strategy(file_content)
+            except Exception as e:
+                logging.error("%s could not open PDF: %s", strategy.name, e)
+                continue
+            opened.append(instance)
+            return instance
+        return None
+
+    try:
+        probe = open_next()
+        if probe is None:
+            return 0, []
+        page_count = probe.page_count
+        stop = page_count if stop is None else min(stop, page_count)
+
+        pages = []
+        for index in range(start, stop):
+            best_text, best_name = "", ""
+            level = 0
+            while True:
+                extractor = opened[level] if level < len(opened) else open_next()
+                if extractor is None:
+                    break
+                try:
+                    page_text = extractor.extract_page(index)
+                except Exception as e:
+                    logging.error("%s failed on page %s: %s", extractor.name, index, e)
+                    page_text = ""
+                if len(page_text.strip()) > len(best_text.strip()):
+                    best_text, best_name = page_text, extractor.name
+                if _is_usable(page_text):
+                    break
+                level += 1
+            pages.append((best_text, best_name))
+        return page_count, pages
+    finally:
+        for extractor in opened:
+            try:
+                extractor.close()
+            except Exception:
+                pass
+
+
+def _build_pdf_extraction(file_content: bytes, page_count: int, pages: List[Tuple[str, str]]) -> PdfExtraction:
+    # Pages are separated by a form feed so later stages can tell page headers and footers apart
+    result = PdfExtraction(
+        text="\f".join(page_text + "\n" for page_text, _ in pages if page_text),
+        page_count=page_count,
+        page_strategies=[name for _, name in pages],
+    )
+    if not result.text.strip():
+        # Not a parseable PDF; it may just be text content (for testing)
+        text = file_content.decode('utf-8', errors='ignore')
+        result = PdfExtraction(text=text if text.strip() else "", page_count=page_count)
+    return result
+
+
+def extract_pdf(file_content: bytes) -> PdfExtraction:
+    """Extract a whole PDF in the current process"""
+    page_count, pages = extract_pdf_pages(file_content)
+    return _build_pdf_extraction(file_content, page_count, pages)
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    """Extract text from PDF file using the cheapest strategy that works per page"""
+    return extract_pdf(file_content).text
+
+
+async def extract_pdf_on_pool(pool, file_content: bytes) -> PdfExtraction:
+    """Extract a PDF on the worker pool, fanning long documents out in page chunks.
+
+    The first job extracts the leading chunk and reports the page count; the
+    remaining chunks then run in parallel on other workers.
+    """
+    page_count, pages = await pool.run(extract_pdf_pages, file_content, 0, PDF_PAGE_CHUNK)
+    if page_count > PDF_PAGE_CHUNK:
+        chunks = await asyncio.gather(*(
+            pool.run(extract_pdf_pages, file_content, start, start + PDF_PAGE_CHUNK)
+            for start in range(PDF_PAGE_CHUNK, page_count, PDF_PAGE_CHUNK)
+        ))
+        for _, chunk_pages in chunks:
+            pages.extend(chunk_pages)
+    return _build_pdf_extraction(file_content, page_count, pages)
+
+WORDML = "http://schemas.openxmlformats.org/wordprocessingml/2006/main "
+MARKUP_COMPATIBILITY = "http://schemas.openxmlformats.org/markup-compatibility/2006 "
+DOCX_READ_CHUNK = 64 * 1024
+# Run-level elements that stand for characters; everything else but w:t carries no text.
+# w:tab also defines tab stops under w:pPr/w:tabs, so these only count inside a run (w:r)
+_DOCX_CHARACTERS = {WORDML + "tab": "\t", WORDML + "br": "\n", WORDML + "cr": "\n", WORDML + "noBreakHyphen": "-"}
+
+
+class DocxTextReader:
+    """Expat handlers that turn ``word/document.xml`` into text lines in document order.
+
+    Paragraphs become lines as they close. Table cells are emitted once per
+    cell in row order, wherever the table sits between paragraphs; cells that
+    continue a vertical merge are skipped, and horizontally merged cells are a
+    single element in the XML, so merged content is never repeated. Text
+    boxes are read once, from their preferred (non-fallback) representation.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        # Open paragraphs (text boxes nest them) and the lines of open table cells
+        self._paragraphs: List[List[str]] = []
+        self._cells: List[List[str]] = []
+        self._merged_continuation: List[bool] = []
+        self._in_text = False
+        self._runs = 0
+        self._skip_depth = 0
+
+    def _container(self) -> List[str]:
+        return self._cells[-1] if self._cells else self.lines
+
+    def start(self, name: str, attributes: Dict[str, str]) -> None:
+        if self._skip_depth:
+            self._skip_depth += 1
+        elif name == MARKUP_COMPATIBILITY + "Fallback" or name == WORDML + "pPr":
+            # Paragraph properties hold formatting only (tab stops, numbering), never text
+            self._skip_depth = 1
+        elif name == WORDML + "r":
+            self._runs += 1
+        elif name == WORDML + "t":
+            self._in_text = True
+        elif name in _DOCX_CHARACTERS:
+            if self._runs and self._paragraphs:
+                self._paragraphs[-1].append(_DOCX_CHARACTERS[name])
+        elif name == WORDML + "p":
+            self._paragraphs.append([])
+        elif name == WORDML + "tc":
+            self._cells.append([])
+            self._merged_continuation.append(False)
+        elif name == WORDML + "vMerge":
+            # Only the cell that starts a vertical merge ("restart") holds its content
+            if self._cells and attributes.get(WORDML + "val", "continue") == "continue":
+                self._merged_continuation[-1] = True
+
+    def end(self, name: str) -> None:
+        if self._skip_depth:
+            self._skip_depth -= 1
+        elif name == WORDML + "r":
+            self._runs -= 1
+        elif name == WORDML + "t":
+            self._in_text = False
+        elif name == WORDML + "p":
+            text = "".join(self._paragraphs.pop())
+            if text.strip():
+                self._container().append(text)
+        elif name == WORDML + "tc":
+            lines = self._cells.pop()
+            if not self._merged_continuation.pop():
+                self._container().extend(lines)
+
+    def characters(self, data: str) -> None:
+        if self._in_text and not self._skip_depth and self._paragraphs:
+            self._paragraphs[-1].append(data)
+
+
+def extract_docx_streaming(file_content: bytes) -> str:
+    """Read DOCX text straight from the zip with an incremental XML parser, without building a document tree"""
+    reader = DocxTextReader()
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    parser.StartElementHandler = reader.start
+    parser.EndElementHandler = reader.end
+    parser.CharacterDataHandler = reader.characters
+    with zipfile.ZipFile(io.BytesIO(file_content)) as archive, archive.open("word/document.xml") as document:
+        while chunk := document.read(DOCX_READ_CHUNK):
+            parser.Parse(chunk, False)
+        parser.Parse(b"", True)
+    return "".join(line + "\n" for line in reader.lines)
+
+
+def extract_docx_with_python_docx(file_content: bytes) -> str:
+    """Extract text from DOCX file with python-docx"""
+    import docx
+
+    try:
+        doc_file = io.BytesIO(file_content)
+        doc = docx.Document(doc_file)
+        text = ""
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text += paragraph.text + "\n"
+        
+        # Also extract text from tables if any
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell.text.strip():
+                        text += cell.text + "\n"
+        
+        return text
+    except Exception as e:
+        logging.error("Error extracting text from DOCX: %s", e)
+        # Fallback: try to decode as text (for testing)
+        try:
+            text = file_content.decode('utf-8', errors='ignore')
+            if text.strip():
+                return text
+        except:
+            pass
+        return ""
+
+
+def extract_docx(file_content: bytes) -> Tuple[str, str]:
+    """Extract DOCX text, returning (text, strategy); python-docx is the fallback for files the streaming reader rejects"""
+    try:
+        return extract_docx_streaming(file_content), "docx-stream"
+    except (zipfile.BadZipFile, KeyError, expat.ExpatError) as e:
+        logging.warning("Streaming DOCX reader failed, falling back to python-docx: %s", e)
+        return extract_docx_with_python_docx(file_content), "python-docx"
+
+
+def extract_text_from_docx(file_content: bytes) -> str:
+    """Extract text from DOCX file"""
+    return extract_docx(file_content)[0]
+
+
+def preload_parsers() -> None:
+    """Import the parser libraries up front; used as the extraction workers' initializer"""
+    for name in PARSER_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
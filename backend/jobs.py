@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+DEAD_LETTER = "dead_letter"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, DEAD_LETTER)
+
+# Fields returned to clients polling a job; the uploaded bytes never leave the database
+JOB_PROJECTION = {
+    "_id": 0, "id": 1, "status": 1, "filename": 1, "attempts": 1, "max_attempts": 1,
+    "result": 1, "error": 1, "created_at": 1, "updated_at": 1, "finished_at": 1,
+}
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying cannot fix (bad input); the job fails without further attempts"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class JobQueue:
+    """MongoDB-backed work queue for resume parsing.
+
+    Workers lease a job by atomically flipping it to ``running`` with a lease
+    expiry; a worker that dies mid-job simply lets the lease lapse and another
+    worker picks the job up again. Failed attempts are retried with backoff
+    until ``max_attempts``, after which the job is dead-lettered. That limit
+    also covers jobs that kill their worker: an expired lease is only taken
+    again while attempts remain, and ``reap_expired`` dead-letters the rest.
+    """
+
+    def __init__(self, collection, lease_seconds: float = 120.0, max_attempts: int = 3, retention_seconds: int = 7 * 24 * 3600):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        # Wakes local workers on enqueue and local long-pollers on completion
+        self._new_job = asyncio.Event()
+        self._finished: Dict[str, asyncio.Event] = {}
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("status", 1), ("available_at", 1)])
+        await self.collection.create_index([("status", 1), ("lease_expires_at", 1)])
+        await self.collection.create_index("finished_at", expireAfterSeconds=self.retention_seconds)
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        now = datetime.utcnow()
+        job_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": job_id,
+            "status": QUEUED,
+            "payload": payload,
+            "filename": payload.get("filename"),
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        })
+        self._new_job.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, JOB_PROJECTION)
+
+    async def count_pending(self) -> Dict[str, int]:
+        """Number of queued and running jobs, served by the status indexes"""
+        return {
+            status: await self.collection.count_documents({"status": status})
+            for status in (QUEUED, RUNNING)
+        }
+
+    async def wait(self, job_id: str, timeout: float, poll_interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Long-poll until the job reaches a terminal status or ``timeout`` elapses.
+
+        Completions in this process wake the waiter immediately; completions
+        on other nodes are noticed on the next poll.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        try:
+            while True:
+                job = await self.get(job_id)
+                remaining = deadline - loop.time()
+                if job is None or job["status"] in TERMINAL_STATUSES or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if not event.is_set():
+                self._finished.pop(job_id, None)
+
+    async def lease(self, owner: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "available_at": {"$lte": now}},
+                # Jobs whose worker stopped renewing its lease are up for grabs again, while attempts remain
+                {"status": RUNNING, "lease_expires_at": {"$lt": now}, "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+            ]},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": owner,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def reap_expired(self) -> int:
+        """Dead-letter jobs whose lease expired on their last attempt, returning how many"""
+        now = datetime.utcnow()
+        result = await self.collection.update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lt": now}, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {
+                "$set": {
+                    "status": DEAD_LETTER,
+                    "error": "Lease expired on the last attempt; the worker stopped while running the job",
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"payload": "", "lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+        return result.modified_count
+
+    async def renew(self, job: Dict[str, Any], owner: str) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"id": job["id"], "lease_owner": owner, "status": RUNNING},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.lease_seconds), "updated_at": now}},
+        )
+
+    async def complete(self, job: Dict[str, Any], owner: str, result: Dict[str, Any]) -> None:
+        await self._finish(job, owner, SUCCEEDED, {"result": result})
+
+    async def fail(self, job: Dict[str, Any], owner: str, error: str, retryable: bool = True) -> None:
+        if retryable and job["attempts"] < job["max_attempts"]:
+            now = datetime.utcnow()
+            delay = random.uniform(0, min(60.0, 2.0 * (2 ** job["attempts"])))
+            await self.collection.update_one(
+                {"id": job["id"], "lease_owner": owner},
+                {
+                    "$set": {
+                        "status": QUEUED,
+                        "available_at": now + timedelta(seconds=delay),
+                        "error": error,
+                        "updated_at": now,
+                    },
+                    "$unset": {"lease_owner": "", "lease_expires_at": ""},
+                },
+            )
+            return
+        status = DEAD_LETTER if retryable else FAILED
+        await self._finish(job, owner, status, {"error": error})
+
+    async def _finish(self, job: Dict[str, Any], owner: str, status: str, fields: Dict[str, Any]) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"id": job["id"], "lease_owner": owner},
+            {
+                "$set": {"status": status, "finished_at": now, "updated_at": now, **fields},
+                # Drop the uploaded bytes once the job no longer needs them
+                "$unset": {"payload": "", "lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+        event = self._finished.get(job["id"])
+        if event is not None:
+            event.set()
+            self._finished.pop(job["id"], None)
+
+    async def wait_for_work(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._new_job.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._new_job.clear()
+
+
+class JobWorkerPool:
+    """Background asyncio workers that lease jobs from a JobQueue and run ``handler`` on them"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        reap_interval: float = 30.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.reap_interval = reap_interval
+        self._next_reap = 0.0
+        self.owner = f"worker_{uuid.uuid4()}"
+        self.active = 0
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        for _ in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._run()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await self.queue.lease(self.owner)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Error leasing resume job: %s", e)
+                job = None
+            if job is None:
+                await self._reap()
+                await self.queue.wait_for_work(self.poll_interval)
+                continue
+
+            self.active += 1
+            heartbeat = asyncio.create_task(self._heartbeat(job))
+            try:
+                try:
+                    result = await self.handler(job)
+                except asyncio.CancelledError:
+                    raise
+                except PermanentJobError as e:
+                    await self._record(job, self.queue.fail(job, self.owner, str(e), retryable=False))
+                except Exception as e:
+                    logging.error("Resume job %s attempt %s failed: %s", job['id'], job['attempts'], e)
+                    await self._record(job, self.queue.fail(job, self.owner, str(e), retryable=True))
+                else:
+                    await self._record(job, self.queue.complete(job, self.owner, result))
+            finally:
+                heartbeat.cancel()
+                self.active -= 1
+
+    async def _record(self, job: Dict[str, Any], outcome: Awaitable[None]) -> None:
+        """Write a job's outcome without letting a database error kill the worker.
+
+        If the write fails the lease lapses, and the job is leased again or
+        dead-lettered like one whose worker died.
+        """
+        try:
+            await outcome
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Error recording the outcome of resume job %s: %s", job["id"], e)
+
+    async def _reap(self) -> None:
+        """Dead-letter exhausted jobs with expired leases, at most once per ``reap_interval`` across workers"""
+        now = asyncio.get_running_loop().time()
+        if now < self._next_reap:
+            return
+        self._next_reap = now + self.reap_interval
+        try:
+            reaped = await self.queue.reap_expired()
+        except Exception as e:
+            logging.error("Error dead-lettering expired resume jobs: %s", e)
+            return
+        if reaped:
+            logging.warning("Dead-lettered %s resume jobs whose lease expired on their last attempt", reaped)
+
+    async def _heartbeat(self, job: Dict[str, Any]) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                await self.queue.renew(job, self.owner)
+            except Exception as e:
+                logging.error("Error renewing lease on resume job %s: %s", job['id'], e)
@@ -0,0 +1,214 @@
+"""Incremental, tolerant decoding of the JSON object an LLM streams back.
+
+``IncrementalJsonDecoder`` is fed the reply chunk by chunk and reports each
+top-level field as soon as its value is complete, plus the items parsed so
+far of top-level arrays, so callers can show partial results while the
+model is still writing. It also repairs what models commonly get wrong:
+prose or Markdown fences around the object, trailing commas, and replies
+cut off mid-array or mid-string (a truncated reply keeps every value that
+was complete, plus the partial string it stopped in).
+
+The decoder only tracks structure (strings, nesting, commas); values are
+still parsed by ``json.loads``, so numbers and literals keep their usual
+semantics.
+"""
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+
+
+@dataclass
+class FieldEvent:
+    field: str
+    value: Any
+    # False for a top-level array that is still being written; value holds the items so far
+    complete: bool = True
+
+
+class IncrementalJsonDecoder:
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []
+        # Per open object: whether the next string is a key
+        self._expect_key: List[bool] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._string_start = 0
+        self._escaped = False
+        self._pending_comma = False
+        self._key: Optional[str] = None
+        self._value_start = 0
+        # Where the cleaned output can be cut and closed to give valid JSON
+        self._safe: Tuple[int, Tuple[str, ...]] = (0, ())
+        self.started = False
+        self.done = False
+        # Defects that were repaired: surrounding_text, trailing_comma, truncated
+        self.repairs: set = set()
+
+    def _text(self, start: int = 0) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0][start:] if self._parts else ""
+
+    def _write(self, text: str) -> None:
+        self._parts.append(text)
+        self._length += len(text)
+
+    def _mark_safe(self) -> None:
+        self._safe = (self._length, tuple(self._stack))
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Consume the next piece of the reply, returning the fields it completed"""
+        events: List[FieldEvent] = []
+        i, end = 0, len(chunk)
+        while i < end:
+            if self.done:
+                if chunk[i:].strip():
+                    self.repairs.add("surrounding_text")
+                break
+
+            if self._in_string:
+                i = self._consume_string(chunk, i)
+                continue
+
+            char = chunk[i]
+            i += 1
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self._open(char)
+                elif not char.isspace():
+                    self.repairs.add("surrounding_text")
+                continue
+            if char.isspace():
+                continue
+
+            if char in "}]":
+                if self._pending_comma:
+                    self.repairs.add("trailing_comma")
+                    self._pending_comma = False
+                self._close(char, events)
+                continue
+            if self._pending_comma:
+                self._pending_comma = False
+                self._write(",")
+            if char == ",":
+                self._comma(events)
+            elif char == ":":
+                self._write(char)
+                if self._expect_key:
+                    self._expect_key[-1] = False
+                if len(self._stack) == 1:
+                    self._value_start = self._length
+            elif char in "{[":
+                self._open(char)
+            elif char == '"':
+                self._string_is_key = bool(self._stack) and self._stack[-1] == "{" and self._expect_key[-1]
+                self._string_start = self._length
+                self._in_string = True
+                self._write(char)
+            else:
+                self._write(char)
+        return events
+
+    def _consume_string(self, chunk: str, i: int) -> int:
+        """Copy string content up to and including the closing quote, returning the next index"""
+        end = len(chunk)
+        while i < end:
+            if self._escaped:
+                self._escaped = False
+                self._write(chunk[i])
+                i += 1
+                continue
+            # Jump to the next quote or backslash instead of walking every character
+            match = _STRING_SPECIAL_RE.search(chunk, i)
+            stop = match.start() if match else end
+            if stop > i:
+                self._write(chunk[i:stop])
+                i = stop
+                continue
+            char = chunk[i]
+            self._write(char)
+            i += 1
+            if char == "\\":
+                self._escaped = True
+            else:
+                self._in_string = False
+                if self._string_is_key:
+                    if len(self._stack) == 1:
+                        self._key = json.loads(self._text(self._string_start), strict=False)
+                else:
+                    self._mark_safe()
+                return i
+        return i
+
+    def _open(self, char: str) -> None:
+        self._write(char)
+        self._stack.append(char)
+        self._expect_key.append(char == "{")
+        self._mark_safe()
+
+    def _close(self, char: str, events: List[FieldEvent]) -> None:
+        if not self._stack or _CLOSERS[self._stack[-1]] != char:
+            raise json.JSONDecodeError(f"Unexpected {char!r}", self._text(), self._length)
+        if len(self._stack) == 1:
+            self._emit_field(events)
+        self._write(char)
+        self._stack.pop()
+        self._expect_key.pop()
+        self._mark_safe()
+        if not self._stack:
+            self.done = True
+
+    def _comma(self, events: List[FieldEvent]) -> None:
+        # Written lazily so a comma directly before a closer can be dropped
+        self._pending_comma = True
+        self._mark_safe()
+        depth = len(self._stack)
+        if self._stack[-1] == "{":
+            self._expect_key[-1] = True
+        if depth == 1:
+            self._emit_field(events)
+        elif depth == 2 and self._stack[-1] == "[" and self._key is not None:
+            items = json.loads(self._text(self._value_start) + "]", strict=False)
+            events.append(FieldEvent(self._key, items, complete=False))
+
+    def _emit_field(self, events: List[FieldEvent]) -> None:
+        if self._key is None:
+            return
+        value_text = self._text(self._value_start)
+        if value_text:
+            events.append(FieldEvent(self._key, json.loads(value_text, strict=False)))
+        self._key = None
+
+    def result(self) -> Dict[str, Any]:
+        """The decoded object, repaired if the reply stopped before it was closed"""
+        if not self.started:
+            raise json.JSONDecodeError("No JSON object in LLM reply", self._text(), 0)
+        if self.done:
+            return json.loads(self._text(), strict=False)
+
+        self.repairs.add("truncated")
+        text = self._text()
+        # Keep a string value the reply stopped in; keys and half-written numbers are dropped
+        if self._in_string and not self._string_is_key:
+            partial = text[:-1] if self._escaped else text
+            closers = "".join(_CLOSERS[c] for c in reversed(self._stack))
+            try:
+                return json.loads(partial + '"' + closers, strict=False)
+            except json.JSONDecodeError:
+                pass
+        length, stack = self._safe
+        return json.loads(text[:length] + "".join(_CLOSERS[c] for c in reversed(stack)), strict=False)
+
+
+def decode_json_reply(text: str) -> Tuple[Dict[str, Any], set]:
+    """Decode a complete LLM reply, returning the object and the defects that were repaired"""
+    decoder = IncrementalJsonDecoder()
+    decoder.feed(text)
+    return decoder.result(), decoder.repairs
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_STATUS_IN_MESSAGE = re.compile(r"\b(408|429|500|502|503|504)\b")
+_RATE_LIMIT_IN_MESSAGE = re.compile(r"rate.?limit|resource.?exhausted|quota", re.IGNORECASE)
+
+
+class LlmError(Exception):
+    """An LLM call failed; ``retryable`` says whether backing off and retrying may help"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def classify_llm_error(error: Exception) -> LlmError:
+    """Map a provider exception to LlmError, detecting 429/5xx from attributes or message text"""
+    if isinstance(error, LlmError):
+        return error
+    status_code = getattr(error, "status_code", None)
+    message = str(error)
+    if status_code is None:
+        match = _STATUS_IN_MESSAGE.search(message)
+        if match:
+            status_code = int(match.group(1))
+        elif _RATE_LIMIT_IN_MESSAGE.search(message):
+            status_code = 429
+    retryable = status_code in RETRYABLE_STATUS_CODES or isinstance(error, (asyncio.TimeoutError, ConnectionError))
+    return LlmError(message, status_code=status_code, retryable=retryable)
+
+
+class LlmBackend:
+    """A provider that turns a system prompt plus user text into a completion"""
+
+    name = ""
+
+    async def complete(self, system_message: str, text: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, system_message: str, text: str) -> AsyncIterator[str]:
+        """Yield the completion in pieces as the provider produces it; by default all at once"""
+        yield await self.complete(system_message, text)
+
+    async def close(self) -> None:
+        pass
+
+
+class EmergentChatBackend(LlmBackend):
+    """Gemini through emergentintegrations' LlmChat.
+
+    LlmChat keeps conversation history on the instance, so one is built per
+    call; the provider client it wraps is shared by the library itself. The
+    library (and the provider SDKs it pulls in) is imported on the first call
+    so processes that never parse resumes don't load it.
+    """
+
+    name = "emergent"
+
+    def __init__(self, api_key: str, provider: str, model: str):
+        self.api_key = api_key
+        self.provider = provider
+        self.model = model
+        self._chat_class = None
+        self._message_class = None
+
+    async def complete(self, system_message: str, text: str) -> str:
+        if self._chat_class is None:
+            from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+            self._chat_class, self._message_class = LlmChat, UserMessage
+
+        chat = self._chat_class(
+            api_key=self.api_key,
+            session_id=f"resume_parse_{uuid.uuid4()}",
+            system_message=system_message,
+        ).with_model(self.provider, self.model)
+
+        response = await chat.send_message(self._message_class(text=text))
+
+        # Handle different response formats
+        if hasattr(response, 'content'):
+            return response.content
+        if hasattr(response, 'text'):
+            return response.text
+        if isinstance(response, str):
+            return response
+        return str(response)
+
+
+class GeminiRestBackend(LlmBackend):
+    """Direct calls to the Gemini REST API over one pooled keep-alive HTTP client.
+
+    The system prompt is sent as an identical ``systemInstruction`` on every
+    call so Gemini's implicit prefix cache can serve it; cached token counts
+    reported by the API are accumulated in ``cached_tokens``.
+    """
+
+    name = "gemini"
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, api_key: str, model: str, max_connections: int = 16, timeout: float = 60.0):
+        import httpx
+
+        self.api_key = api_key
+        self.model = model
+        self.cached_tokens = 0
+        self._client = httpx.AsyncClient(
+            base_url=self.BASE_URL,
+            # A header rather than ?key=, so the key never appears in logged request URLs
+            headers={"x-goog-api-key": api_key},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    @staticmethod
+    def _request_body(system_message: str, text: str) -> Dict[str, Any]:
+        return {
+            "systemInstruction": {"parts": [{"text": system_message}]},
+            "contents": [{"role": "user", "parts": [{"text": text}]}],
+        }
+
+    @staticmethod
+    def _status_error(status_code: int, body: str) -> LlmError:
+        return LlmError(
+            f"Gemini returned {status_code}: {body[:200]}",
+            status_code=status_code,
+            retryable=status_code in RETRYABLE_STATUS_CODES,
+        )
+
+    @staticmethod
+    def _candidate_text(body: Dict[str, Any]) -> str:
+        candidates = body.get("candidates") or []
+        if not candidates:
+            raise LlmError("Gemini returned no candidates")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def complete(self, system_message: str, text: str) -> str:
+        response = await self._client.post(
+            f"/models/{self.model}:generateContent",
+            json=self._request_body(system_message, text),
+        )
+        if response.status_code != 200:
+            raise self._status_error(response.status_code, response.text)
+
+        body = response.json()
+        self.cached_tokens += body.get("usageMetadata", {}).get("cachedContentTokenCount", 0)
+        return self._candidate_text(body)
+
+    async def stream(self, system_message: str, text: str) -> AsyncIterator[str]:
+        """Stream the reply over server-sent events; each event carries the next piece of text"""
+        cached_tokens = 0
+        async with self._client.stream(
+            "POST",
+            f"/models/{self.model}:streamGenerateContent",
+            params={"alt": "sse"},
+            json=self._request_body(system_message, text),
+        ) as response:
+            if response.status_code != 200:
+                raise self._status_error(response.status_code, (await response.aread()).decode("utf-8", "replace"))
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                body = json.loads(line[5:])
+                # Usage is reported with running totals, so only the last event's count is kept
+                cached_tokens = body.get("usageMetadata", {}).get("cachedContentTokenCount", cached_tokens)
+                if body.get("candidates"):
+                    yield self._candidate_text(body)
+        self.cached_tokens += cached_tokens
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FakeLlmBackend(LlmBackend):
+    """Offline stand-in for load testing: simulated latency, injectable 429s, canned JSON.
+
+    The reply echoes the first non-empty line of the text as the name so
+    responses differ per resume, and is wrapped in a ```json fence like
+    real Gemini output. Streamed replies arrive in ``chunk_chars`` pieces
+    with the latency spread across them.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, error_rate: float = 0.0, chunk_chars: int = 64):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and random.random() < self.error_rate:
+            raise LlmError("Fake rate limit (429)", status_code=429, retryable=True)
+
+    async def complete(self, system_message: str, text: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._reply(text)
+
+    async def stream(self, system_message: str, text: str) -> AsyncIterator[str]:
+        self.calls += 1
+        reply = self._reply(text)
+        chunks = [reply[i:i + self.chunk_chars] for i in range(0, len(reply), self.chunk_chars)]
+        delay = self._delay()
+        # Time to first token dominates real latency; the rest is spread over the chunks
+        await asyncio.sleep(delay / 2)
+        self._maybe_fail()
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(delay / 2 / len(chunks))
+
+    def _reply(self, text: str) -> str:
+        # Skip the instructions the caller puts in front of the resume
+        lines = [line.strip() for line in text.split("\n")[1:] if line.strip()]
+        resume = lines[lines.index("Resume:") + 1:] if "Resume:" in lines else lines
+        resume = [line for line in resume if not line.startswith("## ")]
+        emails = [word for line in lines for word in line.split() if "@" in word]
+        data = {
+            "name": resume[0] if resume else "",
+            "email": emails[0] if emails else "",
+            "skills": [],
+            "education": [],
+            "experience": [],
+            "projects": [],
+            "socials": {},
+        }
+        # Echo back fields the caller already extracted, as the real model is asked to
+        known = next((line for line in lines if line.startswith("{")), None)
+        if known:
+            data.update(json.loads(known))
+        return f"```json\n{json.dumps(data)}\n```"
+
+
+class LlmClient:
+    """Long-lived LLM entry point shared by every request.
+
+    A semaphore caps concurrent provider calls at what the quota allows, and
+    retryable failures (429/5xx/timeouts) back off exponentially with full
+    jitter so bursts of failing requests do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        backend: LlmBackend,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 60.0,
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def complete(self, system_message: str, text: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.in_flight += 1
+                    self.calls += 1
+                    try:
+                        return await asyncio.wait_for(
+                            self.backend.complete(system_message, text), timeout=self.timeout
+                        )
+                    finally:
+                        self.in_flight -= 1
+            except Exception as e:
+                error = classify_llm_error(e)
+                if not error.retryable or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise error from e
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                self.retries += 1
+                logging.warning("LLM call failed (%s), retry %s/%s in %.2fs", error.status_code, attempt, self.max_retries, delay)
+                # Sleep outside the semaphore so waiting retries don't hold quota slots
+                await asyncio.sleep(delay)
+
+    async def stream(self, system_message: str, text: str) -> AsyncIterator[str]:
+        """Yield the completion as it arrives, under the same concurrency limit and retry policy.
+
+        Only failures before the first piece are retried, since pieces already
+        handed to the caller can't be taken back; ``timeout`` applies to the
+        wait for each piece rather than the whole reply.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._semaphore:
+                    self.in_flight += 1
+                    self.calls += 1
+                    chunks = self.backend.stream(system_message, text).__aiter__()
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout)
+                            except StopAsyncIteration:
+                                return
+                            started = True
+                            yield chunk
+                    finally:
+                        self.in_flight -= 1
+                        await chunks.aclose()
+            except Exception as e:
+                error = classify_llm_error(e)
+                if started or not error.retryable or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise error from e
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                self.retries += 1
+                logging.warning("LLM stream failed (%s), retry %s/%s in %.2fs", error.status_code, attempt, self.max_retries, delay)
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "backend": self.backend.name,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+        if isinstance(self.backend, GeminiRestBackend):
+            stats["cached_tokens"] = self.backend.cached_tokens
+        return stats
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_llm_client(api_key: Optional[str], provider: str, model: str) -> LlmClient:
+    """Build the shared LLM client from environment configuration"""
+    backend_name = os.environ.get('LLM_BACKEND', 'emergent')
+    timeout = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+    max_concurrency = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+
+    if backend_name == 'fake':
+        backend = FakeLlmBackend(
+            latency=float(os.environ.get('LLM_FAKE_LATENCY_SECONDS', '0.5')),
+            jitter=float(os.environ.get('LLM_FAKE_JITTER_SECONDS', '0.1')),
+            error_rate=float(os.environ.get('LLM_FAKE_ERROR_RATE', '0')),
+            chunk_chars=int(os.environ.get('LLM_FAKE_CHUNK_CHARS', '64')),
+        )
+    elif backend_name == 'gemini':
+        backend = GeminiRestBackend(api_key, model, max_connections=max_concurrency, timeout=timeout)
+    elif backend_name == 'emergent':
+        backend = EmergentChatBackend(api_key, provider, model)
+    else:
+        raise ValueError(f"Unknown LLM backend: {backend_name}")
+
+    return LlmClient(
+        backend,
+        max_concurrency=max_concurrency,
+        max_retries=int(os.environ.get('LLM_MAX_RETRIES', '3')),
+        backoff_base=float(os.environ.get('LLM_BACKOFF_BASE_SECONDS', '0.5')),
+        backoff_max=float(os.environ.get('LLM_BACKOFF_MAX_SECONDS', '8')),
+        timeout=timeout,
+    )
@@ -0,0 +1,259 @@
+"""Structured JSON logging that keeps I/O and formatting off the event loop.
+
+Records go through a ``QueueHandler`` into an in-process queue; a
+``QueueListener`` thread formats them as one JSON object per line and
+writes them out. The handler only stamps the record with the current
+request id, so a log call on the request path costs a dict and a queue
+put. Messages use %-style arguments and are merged in the writer thread,
+and when the queue is full records are dropped and counted rather than
+blocking the request.
+
+Every request gets an id (the ``X-Request-ID`` header, or a new one) that
+is attached to each record logged while serving it and echoed back in the
+response. ``RequestLogMiddleware`` writes one access record per request
+with its stage timings, sampled for fast successful requests.
+
+Resume text and LLM replies contain personal data, so payloads are only
+logged through ``log_payload``: off unless ``LOG_PAYLOAD_SAMPLE_RATE`` is
+set, truncated, and with emails, phone numbers and URLs masked (in the
+writer thread) unless ``LOG_REDACT_PAYLOADS`` is false.
+"""
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+import orjson
+
+from metrics import request_stages
+
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with ``extra=`` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_REDACTIONS = (
+    (re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"), "[email]"),
+    (re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE), "[url]"),
+    (re.compile(r"\+?\d[\d\s().-]{7,}\d"), "[phone]"),
+)
+
+payload_logger = logging.getLogger("portfoliomaker.payload")
+access_logger = logging.getLogger("portfoliomaker.access")
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class Payload:
+    """Deferred payload field: truncated and redacted only when the writer thread serializes it"""
+
+    __slots__ = ("text", "max_chars", "redact")
+
+    def __init__(self, text: str, max_chars: int, redact: bool = True):
+        self.text = text
+        self.max_chars = max_chars
+        self.redact = redact
+
+    def render(self) -> str:
+        text = self.text[:self.max_chars]
+        return redact(text) if self.redact else text
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Payload):
+        return value.render()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request id and ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=_json_default).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    """The previous plain-text format, with the request id and fields appended"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        if getattr(record, "request_id", None):
+            fields["request_id"] = record.request_id
+        if fields:
+            line += " " + orjson.dumps(fields, default=_json_default).decode("utf-8")
+        return line
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the writer thread without formatting them on the caller's thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler merges the message here; the listener's formatter does it instead
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogConfig:
+    """Handles to the running logging pipeline, for shutdown and metrics"""
+
+    def __init__(self, handler: RequestQueueHandler, listener: logging.handlers.QueueListener, payload_sample_rate: float, payload_max_chars: int, redact_payloads: bool):
+        self.handler = handler
+        self.listener = listener
+        self.payload_sample_rate = payload_sample_rate
+        self.payload_max_chars = payload_max_chars
+        self.redact_payloads = redact_payloads
+
+        self.running = False
+
+    def start(self) -> None:
+        if not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+
+_config: Optional[LogConfig] = None
+
+
+def log_payload(message: str, payload: str, **fields: Any) -> None:
+    """Log a verbose payload (resume text, LLM reply) for a sample of requests, truncated and redacted"""
+    if _config is None or _config.payload_sample_rate <= 0 or random.random() >= _config.payload_sample_rate:
+        return
+    payload_logger.info(
+        message,
+        extra={**fields, "payload_chars": len(payload), "payload": Payload(payload, _config.payload_max_chars, _config.redact_payloads)},
+    )
+
+
+def configure_logging() -> LogConfig:
+    """Route the root logger through the queue to a background writer, configured from the environment"""
+    global _config
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.environ.get('LOG_QUEUE_SIZE', '10000')))
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(TextFormatter() if os.environ.get('LOG_FORMAT', 'json') == 'text' else JsonFormatter())
+    handler = RequestQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, RequestQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    # httpx logs every request URL at INFO; provider calls aren't worth a line each
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _config = LogConfig(
+        handler,
+        listener,
+        payload_sample_rate=float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', '0')),
+        payload_max_chars=int(os.environ.get('LOG_PAYLOAD_MAX_CHARS', '200')),
+        redact_payloads=os.environ.get('LOG_REDACT_PAYLOADS', 'true').lower() != 'false',
+    )
+    _config.start()
+    return _config
+
+
+class RequestLogMiddleware:
+    """Pure ASGI middleware assigning request ids and writing one sampled access record per request.
+
+    Successful requests faster than ``slow_seconds`` are logged at
+    ``sample_rate``; errors and slow requests are always logged.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = (), sample_rate: float = 1.0, slow_seconds: float = 1.0):
+        self.app = app
+        self.exclude = set(exclude)
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                # Caller-supplied ids are capped so they can't bloat every record
+                rid = value.decode("latin-1")[:64]
+                break
+        rid = rid or uuid.uuid4().hex
+        rid_token = request_id.set(rid)
+        stages: Dict[tuple, float] = {}
+        stages_token = request_stages.set(stages)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if scope["path"] not in self.exclude and (
+                status >= 500 or elapsed >= self.slow_seconds or random.random() < self.sample_rate
+            ):
+                access_logger.info(
+                    "%s %s %d", scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(elapsed * 1000, 2),
+                        "stages_ms": {":".join(filter(None, labels)): round(seconds * 1000, 2) for labels, seconds in stages.items()},
+                    },
+                )
+            request_stages.reset(stages_token)
+            request_id.reset(rid_token)
@@ -0,0 +1,314 @@
+"""In-process Prometheus metrics with text exposition at ``/metrics``.
+
+Counters, gauges and histograms follow prometheus_client's ``labels()``
+API, but the hot path stays small: children are cached per label tuple,
+histograms bump a single bucket via bisect and cumulate only when scraped.
+Values live in the event loop's process and are updated from the loop,
+so no locking is needed.
+
+Numbers other components already track (cache hits, pool occupancy, LLM
+retries) are exposed through callback metrics read at scrape time, which
+costs nothing per request.
+"""
+import asyncio
+import contextvars
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Samples = Dict[Tuple[str, ...], float]
+
+# Set per request by the request log middleware; stage timings are summed into it for the access log
+request_stages: contextvars.ContextVar[Optional[Dict[Tuple[str, ...], float]]] = contextvars.ContextVar("request_stages", default=None)
+
+
+def _add_request_stage(labels: Tuple[str, ...], seconds: float) -> None:
+    stages = request_stages.get()
+    if stages is not None:
+        stages[labels] = stages.get(labels, 0.0) + seconds
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    async def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in self._children.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; cumulated when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> "Timer":
+        return Timer(self)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    async def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge whose samples come from ``collect`` at scrape time.
+
+    ``collect`` returns a mapping of label-value tuples to values and may be
+    a coroutine function, e.g. to count documents in MongoDB.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], collect: Callable[[], Union[Samples, Awaitable[Samples]]], registry: Optional["Registry"] = None):
+        self.kind = kind
+        self.collect = collect
+        super().__init__(name, documentation, labelnames, registry)
+
+    async def render(self) -> List[str]:
+        samples = self.collect()
+        if asyncio.iscoroutine(samples):
+            samples = await samples
+        lines = self.header()
+        for values, value in samples.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Timer:
+    """Times a block into a histogram child; failures also count towards ``STAGE_ERRORS``"""
+
+    __slots__ = ("child", "start", "labels")
+
+    def __init__(self, child: _HistogramChild, labels: Optional[Tuple[str, ...]] = None):
+        self.child = child
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.child.observe(elapsed)
+        if self.labels is not None:
+            _add_request_stage(self.labels, elapsed)
+            if exc_type is not None:
+                STAGE_ERRORS.labels(*self.labels).inc()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    async def render(self) -> bytes:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(await metric.render())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+STAGE_SECONDS = Histogram(
+    "resume_stage_duration_seconds",
+    "Time spent per processing stage; target is the extraction strategy, LLM backend or collection",
+    ["stage", "target"],
+)
+STAGE_ERRORS = Counter("resume_stage_errors_total", "Stages that raised", ["stage", "target"])
+LLM_PARSE_ERRORS = Counter("resume_llm_parse_errors_total", "LLM parses that failed, by reason", ["reason"])
+FALLBACK_PARSES = Counter("resume_fallback_parses_total", "Resumes parsed with the rule-based fallback")
+PROMPT_TOKENS = Counter(
+    "resume_prompt_tokens_total",
+    "Estimated LLM input tokens per resume: raw extracted text, after normalization, and the prompt sent",
+    ["kind"],
+)
+LLM_REPAIRS = Counter(
+    "resume_llm_repairs_total",
+    "Defects fixed in LLM JSON replies: surrounding_text, trailing_comma, truncated",
+    ["defect"],
+)
+LLM_SKIPPED = Counter("resume_llm_skipped_total", "Resumes the rule-based parser was confident enough to answer without the LLM")
+
+
+def stage_timer(stage: str, target: str = "") -> Timer:
+    """``with stage_timer("llm", "gemini"):`` records the block's duration in ``STAGE_SECONDS``"""
+    return Timer(STAGE_SECONDS.labels(stage, target), (stage, target))
+
+
+def observe_stage(stage: str, target: str, seconds: float) -> None:
+    """Record a stage whose label (e.g. the winning extraction strategy) is only known afterwards"""
+    STAGE_SECONDS.labels(stage, target).observe(seconds)
+    _add_request_stage((stage, target), seconds)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per method, route template and status.
+
+    Routes are labelled by their path template (``/api/portfolio/{route_slug}``)
+    so slugs don't explode label cardinality; unmatched paths share one label.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+        self._route_paths: Optional[Dict[Any, str]] = None
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None or endpoint not in self._route_paths:
+            self._route_paths = {
+                getattr(route, "endpoint", None): getattr(route, "path", "")
+                for route in scope["app"].router.routes
+            }
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_SECONDS.labels(scope["method"], self._route_label(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
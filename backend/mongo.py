@@ -0,0 +1,198 @@
+"""MongoDB client construction, connection pool monitoring and readiness checks.
+
+The client's pool size, timeouts and read preference come from the
+environment, so the DB layer can be sized to the load without code
+changes. ``PoolMonitor`` listens to the driver's connection pool events
+to report how many connections are open and checked out and how long
+requests wait for one. Those events arrive on the driver's threads
+(Motor runs PyMongo on a thread pool), so the monitor guards its
+counters with a lock.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference(name: str, max_staleness: int = -1):
+    """PyMongo read preference by its connection-string name; staleness is ignored for primary"""
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {name}")
+    if name == "primary":
+        return Primary()
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+def _address(address: Tuple[str, int]) -> str:
+    return f"{address[0]}:{address[1]}"
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Per-server connection counts and checkout waits from the driver's pool events"""
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        # A checkout starts and finishes on the same driver thread
+        self._local = threading.local()
+        self._pools: Dict[str, Dict[str, float]] = {}
+
+    def _pool(self, address: Tuple[str, int]) -> Dict[str, float]:
+        key = _address(address)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                "open": 0, "checked_out": 0, "checkouts": 0, "checkout_failures": 0,
+                "checkout_timeouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "cleared": 0,
+            }
+        return pool
+
+    def _record_wait(self, pool: Dict[str, float]) -> None:
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            waited = time.perf_counter() - started
+            pool["wait_seconds"] += waited
+            pool["max_wait_seconds"] = max(pool["max_wait_seconds"], waited)
+            self._local.started = None
+
+    def pool_created(self, event) -> None:
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self._pool(event.address)["cleared"] += 1
+
+    def pool_closed(self, event) -> None:
+        with self._lock:
+            self._pools.pop(_address(event.address), None)
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self._pool(event.address)["open"] += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self._pool(event.address)["open"] -= 1
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkout_failures"] += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                pool["checkout_timeouts"] += 1
+            self._record_wait(pool)
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] += 1
+            pool["checkouts"] += 1
+            self._record_wait(pool)
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self._pool(event.address)["checked_out"] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters per server, with saturation as the share of maxPoolSize checked out"""
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        for pool in pools.values():
+            pool["saturation"] = round(pool["checked_out"] / self.max_pool_size, 3) if self.max_pool_size else 0.0
+        return {
+            "max_pool_size": self.max_pool_size,
+            "saturation": max((pool["saturation"] for pool in pools.values()), default=0.0),
+            "servers": pools,
+        }
+
+
+class MongoReadiness:
+    """Startup pool warm-up and the ping behind the readiness probe"""
+
+    def __init__(self, client, db, monitor: PoolMonitor, ping_timeout: float = 2.0):
+        self.client = client
+        self.db = db
+        self.monitor = monitor
+        self.ping_timeout = ping_timeout
+        self.warmed = False
+
+    async def warm_up(self, connections: int) -> None:
+        """Open ``connections`` pooled connections with concurrent pings so first requests don't pay for them"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self.db.command("ping") for _ in range(max(1, connections)))),
+                timeout=self.ping_timeout * 5,
+            )
+            self.warmed = True
+        except Exception as e:
+            logging.error("Error warming up MongoDB connection pool: %s", e)
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        """Ping MongoDB, returning whether it answered in time plus ping latency and pool stats"""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.db.command("ping"), timeout=self.ping_timeout)
+            ready, error = True, None
+        except Exception as e:
+            ready, error = False, str(e) or type(e).__name__
+        details = {
+            "mongo": "ok" if ready else "unavailable",
+            "ping_ms": round((time.perf_counter() - start) * 1000, 2),
+            "warmed_up": self.warmed,
+            "pool": self.monitor.stats(),
+        }
+        if error:
+            details["error"] = error
+        return ready, details
+
+
+def create_mongo_client(mongo_url: str) -> Tuple[AsyncIOMotorClient, PoolMonitor]:
+    """Build the Motor client and its pool monitor from environment configuration"""
+    max_pool_size = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+    monitor = PoolMonitor(max_pool_size)
+    options: Dict[str, Any] = {
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        "maxConnecting": int(os.environ.get('MONGO_MAX_CONNECTING', '2')),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '20000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+        "read_preference": read_preference(
+            os.environ.get('MONGO_READ_PREFERENCE', 'primary'),
+            int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '-1')),
+        ),
+        "event_listeners": [monitor],
+    }
+    # Unbounded by default in the driver; only set when configured
+    for option, variable in (
+        ("waitQueueTimeoutMS", 'MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        ("socketTimeoutMS", 'MONGO_SOCKET_TIMEOUT_MS'),
+        ("maxIdleTimeMS", 'MONGO_MAX_IDLE_TIME_MS'),
+    ):
+        value: Optional[str] = os.environ.get(variable)
+        if value:
+            options[option] = int(value)
+    return AsyncIOMotorClient(mongo_url, **options), monitor
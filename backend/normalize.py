@@ -0,0 +1,163 @@
+"""Resume text normalization and token budgeting ahead of the LLM call.
+
+Extracted text carries a lot the model doesn't need: page headers and
+footers repeated on every page, page numbers, table cells that python-docx
+reports once per merged column or that repeat paragraph text, ligatures and
+runs of whitespace. ``normalize_resume_text`` removes those, and
+``fit_sections`` trims a parsed resume's sections to a token budget,
+cutting the least important sections first.
+
+Token counts are estimates (about four characters per token for Gemini's
+tokenizer on English text); they're used for budgeting and reporting, not
+billing.
+"""
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+PAGE_BREAK = "\f"
+CHARS_PER_TOKEN = 4
+# Lines at least this long that repeat are duplicated content, not a legitimately repeated short label
+DUPLICATE_MIN_CHARS = 30
+# How many lines at the top and bottom of a page count as its header/footer
+FURNITURE_EDGE_LINES = 3
+
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?[-–—(]?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*[-–—)]?$", re.IGNORECASE)
+INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+INVISIBLE_RE = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f\u200b-\u200f\u2060\ufeff]")
+# PDF fonts often map bullet glyphs into the Unicode private use area
+PRIVATE_USE_BULLET_RE = re.compile(r"^[\ue000-\uf8ff]\s*")
+PRIVATE_USE_RE = re.compile(r"[\ue000-\uf8ff]")
+
+TRUNCATION_MARKER = "[...]"
+# Sections in the order they are kept when the prompt is over budget
+SECTION_PRIORITY = ("header", "experience", "education", "skills", "projects", "other")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class NormalizedText:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    # What was removed, by kind: duplicates, page_furniture, page_numbers
+    removed: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _clean_line(line: str) -> str:
+    line = INVISIBLE_RE.sub("", line)
+    line = PRIVATE_USE_BULLET_RE.sub("• ", line.strip())
+    line = PRIVATE_USE_RE.sub("", line)
+    return INLINE_SPACE_RE.sub(" ", line).strip()
+
+
+def _line_key(line: str) -> str:
+    return line.casefold()
+
+
+def find_page_furniture(pages: Sequence[Sequence[str]]) -> set:
+    """Lines repeated at the top or bottom of at least half the pages (and two or more)"""
+    if len(pages) < 2:
+        return set()
+    edges: Counter = Counter()
+    for lines in pages:
+        edge = lines[:FURNITURE_EDGE_LINES] + lines[-FURNITURE_EDGE_LINES:]
+        edges.update({_line_key(line) for line in edge})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in edges.items() if count >= threshold}
+
+
+def normalize_resume_text(text: str) -> NormalizedText:
+    """Deduplicate, strip page furniture and collapse whitespace; line order is preserved"""
+    # NFKC folds ligatures (ﬁ -> fi), full-width forms and non-breaking spaces
+    normalized = unicodedata.normalize("NFKC", text)
+    pages = [
+        [line for line in (_clean_line(raw) for raw in page.splitlines()) if line]
+        for page in normalized.split(PAGE_BREAK)
+    ]
+    furniture = find_page_furniture(pages)
+
+    removed: Counter = Counter()
+    kept: List[str] = []
+    seen: set = set()
+    previous = None
+    for lines in pages:
+        for line in lines:
+            key = _line_key(line)
+            if PAGE_NUMBER_RE.match(line):
+                removed["page_numbers"] += 1
+            elif key in furniture and key in seen:
+                removed["page_furniture"] += 1
+            elif key == previous or (len(line) >= DUPLICATE_MIN_CHARS and key in seen):
+                # Consecutive repeats are merged table cells; long repeats are cells echoing paragraphs
+                removed["duplicates"] += 1
+            else:
+                kept.append(line)
+                seen.add(key)
+                previous = key
+                continue
+            previous = key
+
+    result = "\n".join(kept)
+    return NormalizedText(
+        text=result,
+        tokens_before=estimate_tokens(text),
+        tokens_after=estimate_tokens(result),
+        removed=dict(removed),
+    )
+
+
+def _take_lines(lines: List[str], budget_tokens: int) -> Tuple[List[str], int]:
+    """Leading lines that fit in the budget, and the tokens they use (one per newline included)"""
+    taken: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget_tokens:
+            break
+        taken.append(line)
+        used += cost
+    return taken, used
+
+
+def fit_sections(sections: Dict[str, List[str]], budget_tokens: int) -> Tuple[Dict[str, List[str]], int]:
+    """Trim sections to fit ``budget_tokens``, returning the kept lines and the tokens cut.
+
+    Every section first gets a small guaranteed share so none disappears
+    entirely; the rest of the budget goes to sections in ``SECTION_PRIORITY``
+    order. Sections are cut from the end, which for reverse-chronological
+    resumes drops the oldest entries first.
+    """
+    costs = {name: sum(estimate_tokens(line) + 1 for line in lines) for name, lines in sections.items()}
+    total = sum(costs.values())
+    if total <= budget_tokens:
+        return sections, 0
+
+    order = sorted(sections, key=lambda name: SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else len(SECTION_PRIORITY))
+    floor = budget_tokens // (2 * len(sections)) if sections else 0
+    allowance = {name: min(costs[name], floor) for name in sections}
+    remaining = budget_tokens - sum(allowance.values())
+    for name in order:
+        extra = min(costs[name] - allowance[name], remaining)
+        allowance[name] += extra
+        remaining -= extra
+
+    fitted: Dict[str, List[str]] = {}
+    used_total = 0
+    for name, lines in sections.items():
+        if allowance[name] >= costs[name]:
+            fitted[name], used = lines, costs[name]
+        else:
+            taken, used = _take_lines(lines, allowance[name])
+            fitted[name] = taken + [TRUNCATION_MARKER] if taken else []
+        used_total += used
+    return fitted, total - used_total
@@ -0,0 +1,406 @@
+"""Deterministic rule-based resume parser.
+
+Pulls contact details, socials, skills and the Education / Experience /
+Projects sections out of extracted resume text with precompiled regexes
+and a skills dictionary index. The result feeds the LLM a smaller prompt,
+stands in for it when ``confidence`` is high, and is the degraded-mode
+parse when the LLM is unavailable.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from normalize import fit_sections
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}", re.IGNORECASE)
+PHONE_RE = re.compile(r"(?<![\w/])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{2,4}(?:[\s.-]?\d{2,4}){2,3}(?![\w/])")
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s,;|()<>]+|\b(?:linkedin\.com|github\.com)/[^\s,;|()<>]+", re.IGNORECASE)
+LOCATION_RE = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .'-]+(?:\s+\d{4,6})?$")
+NAME_RE = re.compile(r"^[A-Z][A-Za-z'.-]*(?:\s+[A-Z][A-Za-z'.-]*){1,3}$")
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦●‣>]|\d+[.)])\s+")
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*[+#]*|\.net\b", re.IGNORECASE)
+
+_MONTH = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}})"
+DATE_RANGE_RE = re.compile(rf"\(?\s*{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now)\s*\)?", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+DIGIT_RE = re.compile(r"\d")
+HEADER_SEGMENT_RE = re.compile(r"\s*[|•·]\s*")
+
+DEGREE_RE = re.compile(
+    r"\b(?:b\.?\s?s\.?c?|b\.?\s?a|b\.?\s?e|b\.?\s?tech|m\.?\s?s\.?c?|m\.?\s?a|m\.?\s?tech|m\.?\s?b\.?\s?a|ph\.?\s?d|"
+    r"bachelor'?s?|master'?s?|doctorate|associate'?s?|diploma|degree|high school|secondary)\b",
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic|iit|mit)\b", re.IGNORECASE)
+TITLE_WORDS_RE = re.compile(
+    r"\b(?:engineer|developer|manager|intern|analyst|lead|designer|consultant|scientist|architect|director|"
+    r"specialist|administrator|officer|head|founder|programmer|researcher|associate|assistant)\b",
+    re.IGNORECASE,
+)
+TITLE_COMPANY_SEPARATORS = (" at ", " @ ", " | ", " — ", " – ", " - ", ", ")
+
+SECTION_HEADERS = {
+    "education": ("education", "academic background", "academics", "educational background", "qualifications", "academic qualifications"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history", "career history", "internships"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects", "side projects"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "technologies", "tech stack", "tools", "skills & tools", "key skills"),
+    # Recognised so their lines don't leak into the sections above
+    "other": ("summary", "profile", "objective", "about", "about me", "certifications", "certificates", "awards",
+              "achievements", "languages", "interests", "hobbies", "publications", "volunteering", "references",
+              "contact", "activities", "leadership", "honors", "links", "social links", "socials", "online profiles"),
+}
+_HEADER_LOOKUP = {alias: section for section, aliases in SECTION_HEADERS.items() for alias in aliases}
+_HEADER_CLEAN_RE = re.compile(r"[^a-z& ]+")
+# Labels that start a section on their own line but are entry fields when followed by content
+_ENTRY_LABELS = {"technologies", "tools", "tech stack"}
+ENTRY_FIELD_RE = re.compile(r"^(?P<label>technologies|tech stack|tools|stack|built with|link|links|github|demo|url)\s*:\s*(?P<value>.*)$", re.IGNORECASE)
+
+# Canonical skill name -> lowercase aliases (the canonical name is always an alias)
+SKILLS = {
+    "Python": (), "Java": (), "JavaScript": ("js",), "TypeScript": ("ts",), "C": (), "C++": ("cpp",), "C#": ("csharp",),
+    "Go": ("golang",), "Rust": (), "Ruby": (), "PHP": (), "Swift": (), "Kotlin": (), "Scala": (), "R": (),
+    "MATLAB": (), "Dart": (), "Perl": (), "Haskell": (), "Elixir": (), "Bash": ("shell scripting",), "SQL": (),
+    "HTML": ("html5",), "CSS": ("css3",), "Sass": ("scss",), "Tailwind CSS": ("tailwind", "tailwindcss"),
+    "React": ("react.js", "reactjs"), "React Native": (), "Next.js": ("nextjs",), "Vue.js": ("vue", "vuejs"),
+    "Angular": ("angularjs",), "Svelte": (), "Redux": (), "jQuery": (), "Three.js": ("threejs",),
+    "Node.js": ("node", "nodejs"), "Express": ("express.js", "expressjs"), "Django": (), "Flask": (), "FastAPI": (),
+    "Spring": ("spring boot", "springboot"), "Ruby on Rails": ("rails",), "Laravel": (), ".NET": ("dotnet", "asp.net"),
+    "GraphQL": (), "REST": ("rest api", "rest apis", "restful"), "gRPC": (), "WebSockets": ("websocket",),
+    "MongoDB": ("mongo",), "PostgreSQL": ("postgres",), "MySQL": (), "SQLite": (), "Redis": (), "Elasticsearch": (),
+    "Cassandra": (), "DynamoDB": (), "Firebase": (), "Supabase": (), "Oracle": (), "Snowflake": (), "BigQuery": (),
+    "Kafka": ("apache kafka",), "RabbitMQ": (), "Spark": ("apache spark", "pyspark"), "Hadoop": (), "Airflow": (),
+    "AWS": ("amazon web services",), "GCP": ("google cloud", "google cloud platform"), "Azure": ("microsoft azure",),
+    "Docker": (), "Kubernetes": ("k8s",), "Terraform": (), "Ansible": (), "Jenkins": (), "GitHub Actions": (),
+    "CI/CD": ("ci-cd",), "Linux": (), "Git": (), "Nginx": (), "Serverless": (), "Microservices": ("microservice",),
+    "Machine Learning": ("ml",), "Deep Learning": (), "NLP": ("natural language processing",), "Computer Vision": (),
+    "TensorFlow": (), "PyTorch": (), "Keras": (), "scikit-learn": ("sklearn", "scikit learn"), "Pandas": (),
+    "NumPy": (), "OpenCV": (), "LLMs": ("llm", "large language models"), "Data Analysis": (), "Tableau": (),
+    "Power BI": ("powerbi",), "Excel": ("microsoft excel",), "Figma": (), "Photoshop": ("adobe photoshop",),
+    "UI/UX": ("ui", "ux", "ui/ux design"), "Jira": (), "Agile": ("scrum",), "Unity": (), "Selenium": (),
+    "Jest": (), "Cypress": (), "Pytest": (), "Webpack": (), "Vite": (), "Solidity": (), "Blockchain": (),
+}
+_SKILL_INDEX = {
+    alias: canonical
+    for canonical, aliases in SKILLS.items()
+    for alias in (canonical.lower(),) + aliases
+}
+_SKILL_MAX_WORDS = max(len(alias.split()) for alias in _SKILL_INDEX)
+# Single letters and common words are only skills inside a skills section
+_AMBIGUOUS_SKILLS = {"c", "r", "go", "rest", "express", "spring", "swift", "ui", "ux", "ml", "js", "ts", "node", "tools", "excel", "unity", "oracle", "rails", "agile", "scrum"}
+# Labels and joiners in skills sections that don't mean a skill went unrecognised
+_SKILL_FILLER_WORDS = {
+    "and", "or", "with", "in", "including", "etc", "other", "others", "skills", "technical", "languages", "language",
+    "programming", "frameworks", "framework", "libraries", "tools", "databases", "database", "cloud", "platforms",
+    "technologies", "proficient", "familiar", "experienced", "advanced", "intermediate", "basic", "expert",
+}
+
+
+@dataclass
+class PreParse:
+    data: Dict[str, Any]
+    confidence: float
+    # Section name -> raw lines, in document order; "header" is everything before the first section
+    sections: Dict[str, List[str]] = field(default_factory=dict)
+    # Lines that carried only contact details, which the LLM does not need to see again
+    contact_lines: int = 0
+
+
+def _header_section(line: str) -> Tuple[Optional[str], str]:
+    """Return (section, inline content) if ``line`` is a section header like 'Skills' or 'Skills: Python, Go'"""
+    if BULLET_RE.match(line):
+        return None, ""
+    head, sep, rest = line.partition(":")
+    candidate = head if sep and len(head) <= 40 else line
+    if len(candidate) > 40:
+        return None, ""
+    key = " ".join(_HEADER_CLEAN_RE.sub(" ", candidate.lower()).split())
+    section = _HEADER_LOOKUP.get(key)
+    words = key.split()
+    if section is None and 1 < len(words) <= 3 and (candidate.isupper() or sep):
+        # "PROFESSIONAL SUMMARY", "Relevant Experience:" - a qualifier in front of a known heading
+        section = _HEADER_LOOKUP.get(" ".join(words[-2:])) or _HEADER_LOOKUP.get(words[-1])
+    if section is None or (key in _ENTRY_LABELS and rest.strip()):
+        return None, ""
+    return section, rest.strip() if candidate is head else ""
+
+
+def _match_skills(tokens: List[str], include_ambiguous: bool) -> Tuple[List[str], List[str]]:
+    """Dictionary skills in ``tokens`` in order of first mention, plus the tokens no skill covered"""
+    found: Dict[str, None] = {}
+    uncovered: List[str] = []
+    index = 0
+    while index < len(tokens):
+        for width in range(min(_SKILL_MAX_WORDS, len(tokens) - index), 0, -1):
+            phrase = " ".join(tokens[index:index + width])
+            canonical = _SKILL_INDEX.get(phrase)
+            if canonical and (include_ambiguous or width > 1 or phrase not in _AMBIGUOUS_SKILLS):
+                found.setdefault(canonical)
+                index += width
+                break
+        else:
+            uncovered.append(tokens[index])
+            index += 1
+    return list(found), uncovered
+
+
+def find_skills(text: str, include_ambiguous: bool = False) -> List[str]:
+    """Skills from the dictionary mentioned in ``text``, in order of first mention"""
+    return _match_skills([token.lower() for token in TOKEN_RE.findall(text)], include_ambiguous)[0]
+
+
+def unmatched_skill_lines(lines: List[str]) -> List[str]:
+    """Skills-section lines with words the dictionary didn't match, which only the LLM can place"""
+    unmatched = []
+    for line in lines:
+        _, uncovered = _match_skills([token.lower() for token in TOKEN_RE.findall(line)], include_ambiguous=True)
+        if any(token not in _SKILL_FILLER_WORDS for token in uncovered):
+            unmatched.append(line)
+    return unmatched
+
+
+def _strip_bullet(line: str) -> str:
+    return BULLET_RE.sub("", line).strip()
+
+
+def _join_sentences(lines: List[str]) -> str:
+    return " ".join(line if line[-1] in ".!?" else f"{line}." for line in lines if line)
+
+
+def _classify_url(url: str, socials: Dict[str, str]) -> None:
+    lowered = url.lower()
+    if not lowered.startswith("http"):
+        url = f"https://{url}"
+    key = "linkedin" if "linkedin.com" in lowered else "github" if "github.com" in lowered else "website"
+    # Prefer profile URLs (github.com/user) over deeper links such as project repositories
+    current = socials.get(key)
+    if current is None or url.rstrip("/").count("/") < current.rstrip("/").count("/"):
+        socials[key] = url
+
+
+def find_date_range(line: str) -> Optional[re.Match]:
+    # Most lines carry no year at all, and the year check is far cheaper than the full pattern
+    return DATE_RANGE_RE.search(line) if YEAR_RE.search(line) else None
+
+
+def _is_contact_line(line: str) -> bool:
+    """True for lines that only hold an email, phone, URL or a label for one"""
+    rest = URL_RE.sub("", EMAIL_RE.sub("", line))
+    rest = PHONE_RE.sub("", rest)
+    rest = re.sub(r"(?i)\b(?:email|e-mail|phone|mobile|tel|linkedin|github|portfolio|website|web)\b", "", rest)
+    return len(line.strip()) > 0 and len(rest.strip(" :|,-•·/")) < 3
+
+
+def _split_title_company(text: str) -> Tuple[str, str]:
+    for separator in TITLE_COMPANY_SEPARATORS:
+        if separator in text:
+            first, second = (part.strip(" ,|-–—") for part in text.split(separator, 1))
+            if TITLE_WORDS_RE.search(second) and not TITLE_WORDS_RE.search(first):
+                return second, first
+            return first, second
+    return text.strip(), ""
+
+
+def parse_experience(lines: List[str]) -> List[Dict[str, str]]:
+    """Split an experience section into entries at lines carrying a date range"""
+    entries: List[Dict[str, Any]] = []
+    pending: List[str] = []
+    for line in lines:
+        match = find_date_range(line)
+        if match and not BULLET_RE.match(line):
+            heading = (line[:match.start()] + line[match.end():]).strip(" ,|-–—()")
+            if not heading and pending:
+                heading = pending.pop()
+            elif not heading and entries and entries[-1]["description"]:
+                heading = entries[-1]["description"].pop()
+            title, company = _split_title_company(heading)
+            entries.append({"title": title, "company": company, "duration": match.group(0).strip(" ()"), "description": []})
+        elif entries:
+            entries[-1]["description"].append(_strip_bullet(line))
+        else:
+            pending.append(line)
+    return [{**entry, "description": _join_sentences(entry["description"])} for entry in entries]
+
+
+def parse_education(lines: List[str]) -> List[Dict[str, str]]:
+    entries: List[Dict[str, str]] = []
+    for line in lines:
+        text = _strip_bullet(line)
+        segments = [segment.strip() for segment in re.split(r"\s*(?:,|\||–|—| - |\(|\))\s*", text) if segment.strip()]
+        degree = next((segment for segment in segments if DEGREE_RE.search(segment)), "")
+        institution = next((segment for segment in segments if INSTITUTION_RE.search(segment) and segment != degree), "")
+        dates = find_date_range(text)
+        year = dates.group(0).strip(" ()") if dates else (YEAR_RE.findall(text) or [""])[-1]
+        current = entries[-1] if entries else None
+        starts_entry = (degree and (current is None or current["degree"])) or (institution and (current is None or current["institution"]))
+        if starts_entry or current is None:
+            entries.append({"degree": degree, "institution": institution, "year": year, "details": ""})
+        else:
+            current["degree"] = current["degree"] or degree
+            current["institution"] = current["institution"] or institution
+            current["year"] = current["year"] or year
+            if not (degree or institution):
+                current["details"] = f"{current['details']} {text}".strip()
+    return [entry for entry in entries if entry["degree"] or entry["institution"]]
+
+
+def parse_projects(lines: List[str]) -> List[Dict[str, str]]:
+    entries: List[Dict[str, Any]] = []
+    for line in lines:
+        text = _strip_bullet(line)
+        name, sep, rest = text.partition(":")
+        is_bullet = bool(BULLET_RE.match(line))
+        if not is_bullet and sep and len(name.split()) <= 8 and not URL_RE.match(text):
+            entries.append({"name": name.strip(), "lines": [rest.strip()] if rest.strip() else []})
+        elif not is_bullet and len(text.split()) <= 6 and not URL_RE.search(text):
+            entries.append({"name": text, "lines": []})
+        elif entries:
+            entries[-1]["lines"].append(text)
+    projects = []
+    for entry in entries:
+        description, technologies = [], ""
+        for text in entry["lines"]:
+            labelled = ENTRY_FIELD_RE.match(text)
+            if labelled and not URL_RE.search(labelled.group("value")):
+                technologies = labelled.group("value").strip()
+            elif not labelled:
+                description.append(URL_RE.sub("", text).strip())
+        links = URL_RE.findall(" ".join(entry["lines"]))
+        projects.append({
+            "name": entry["name"],
+            "description": _join_sentences(description),
+            "technologies": technologies or ", ".join(find_skills(" ".join(entry["lines"]))),
+            "link": links[0] if links else "",
+        })
+    return projects
+
+
+def preparse_resume(text: str) -> PreParse:
+    """Rule-based parse of resume text into ParsedResumeData fields with a 0-1 confidence"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    socials: Dict[str, str] = {}
+    email = phone = ""
+    contact_lines = 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        # Cheap substring checks gate the regexes; most lines are plain prose
+        has_url = "/" in line or "www." in line
+        has_email = "@" in line
+        has_digit = DIGIT_RE.search(line) is not None
+        if has_url:
+            for url in URL_RE.findall(line):
+                if "@" not in url:
+                    _classify_url(url.rstrip("."), socials)
+        if has_email and not email:
+            match = EMAIL_RE.search(line)
+            email = match.group(0) if match else ""
+        if has_digit and not phone:
+            match = PHONE_RE.search(URL_RE.sub("", line) if has_url else line)
+            if match and sum(char.isdigit() for char in match.group(0)) >= 7 and not find_date_range(line):
+                phone = match.group(0).strip()
+        if (has_url or has_email or has_digit) and _is_contact_line(line):
+            contact_lines += 1
+            continue
+
+        section, inline = _header_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            if inline:
+                sections[current].append(inline)
+            continue
+        sections.setdefault(current, []).append(line)
+
+    header = sections.get("header", [])
+    name = next((line for line in header[:5] if NAME_RE.match(line) and not TITLE_WORDS_RE.search(line)), "")
+    if name.isupper():
+        name = name.title()
+    # Header lines often pack several fields: "Data Scientist | San Francisco, CA"
+    header_segments = [segment for line in header[:8] for segment in HEADER_SEGMENT_RE.split(line)]
+    location = next((segment for segment in header_segments if LOCATION_RE.match(segment) and segment.title() != name), "")
+
+    skills_text = "\n".join(sections.get("skills", []))
+    skills = find_skills(skills_text, include_ambiguous=True) if skills_text else find_skills(text)
+
+    experience = parse_experience(sections.get("experience", []))
+    education = parse_education(sections.get("education", []))
+    projects = parse_projects(sections.get("projects", []))
+
+    data = {
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "location": location,
+        "skills": skills,
+        "education": education,
+        "experience": experience,
+        "projects": projects,
+        "socials": socials,
+    }
+    return PreParse(data=data, confidence=score_preparse(data, sections), sections=sections, contact_lines=contact_lines)
+
+
+def score_preparse(data: Dict[str, Any], sections: Dict[str, List[str]]) -> float:
+    """How complete the rule-based parse is; 1.0 means every core field was found and structured"""
+    experience_ok = bool(data["experience"]) and all(
+        entry["title"] and entry["company"] and entry["duration"] for entry in data["experience"]
+    )
+    education_ok = bool(data["education"]) and all(entry["degree"] and entry["institution"] for entry in data["education"])
+    score = (
+        0.2 * bool(data["name"])
+        + 0.15 * bool(data["email"])
+        + 0.05 * bool(data["phone"] or data["location"])
+        + 0.15 * (len(data["skills"]) >= 3)
+        + 0.25 * experience_ok
+        + 0.2 * education_ok
+    )
+    if sections.get("projects") and not data["projects"]:
+        score -= 0.1
+    # Lots of text under headings we don't know means there is content the rules can't place
+    placed = sum(len(lines) for name, lines in sections.items() if name != "header")
+    unplaced = max(0, len(sections.get("header", [])) - 6)
+    if placed and unplaced / (placed + unplaced) > 0.2:
+        score -= 0.2
+    return round(max(0.0, min(1.0, score)), 3)
+
+
+def build_llm_prompt(preparsed: PreParse, text: str, token_budget: Optional[int] = None) -> str:
+    """A smaller prompt: fields the rules already found, plus only the sections that need interpreting.
+
+    With ``token_budget`` the resume body is trimmed section by section to
+    roughly that many tokens.
+    """
+    known = {key: value for key, value in preparsed.data.items() if key in ("name", "email", "phone", "location", "socials") and value}
+    if preparsed.data["skills"]:
+        known["skills"] = preparsed.data["skills"]
+    if len(preparsed.sections) <= 1:
+        sections = {"header": text.splitlines()}
+    else:
+        # Matched skills are passed as a list; only skills lines with words the dictionary
+        # doesn't know are still sent, so skills outside it reach the model
+        sections = {
+            section: unmatched_skill_lines(lines) if section == "skills" and preparsed.data["skills"] else lines
+            for section, lines in preparsed.sections.items()
+        }
+        sections = {section: lines for section, lines in sections.items() if lines}
+        # Header lines that are exactly a known field are already in the JSON above
+        if "header" in sections:
+            repeated = {str(value).casefold() for value in known.values() if isinstance(value, str)}
+            sections["header"] = [line for line in sections["header"] if line.casefold() not in repeated]
+    if token_budget:
+        sections, _ = fit_sections(sections, token_budget)
+    if len(sections) == 1 and "header" in sections:
+        body = "\n".join(sections["header"])
+    else:
+        body = "\n\n".join(f"## {section.upper()}\n" + "\n".join(lines) for section, lines in sections.items() if lines)
+    return (
+        "Parse this resume and return structured JSON data.\n"
+        "These fields were already extracted and are reliable; keep them, add anything missing:\n"
+        f"{json.dumps(known, ensure_ascii=False, separators=(',', ':'))}\n\n"
+        f"Resume:\n{body}"
+    )
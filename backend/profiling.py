@@ -0,0 +1,207 @@
+"""Opt-in sampling profiler for slow resume parses.
+
+A profiled request samples the event loop thread for its duration, and
+every extraction call it makes on the worker pool is wrapped so the worker
+samples its own thread and returns the stacks with the result. Profiles
+that exceed the latency threshold (or were requested with the admin
+header) are written as folded stacks, the input format of flamegraph.pl
+and speedscope, next to a JSON file with the input hash and timings.
+
+The event loop is shared, so its samples can include frames from other
+requests served at the same time; worker samples belong to this request.
+"""
+import contextvars
+import hmac
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import orjson
+
+PROFILE_HEADER = "x-profile-request"
+
+# Set while a profiled request runs so the extraction path can wrap its pool calls
+current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("current_profile", default=None)
+
+
+def _frame_label(code, cache: Dict[Any, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        path = code.co_filename
+        marker = path.rfind("site-packages/")
+        path = path[marker + len("site-packages/"):] if marker >= 0 else os.path.basename(path)
+        label = cache[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+    return label
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every ``interval`` seconds from a helper thread"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005, root: str = ""):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, self._labels))
+                frame = frame.f_back
+            if stack:
+                if self.root:
+                    stack.append(self.root)
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def profiled_call(interval: float, fn: Callable, *args) -> Tuple[Any, Dict[str, int]]:
+    """Run ``fn`` under a profiler in the worker and return (result, folded stacks)"""
+    profiler = SamplingProfiler(interval=interval, root="extraction_worker").start()
+    try:
+        result = fn(*args)
+    finally:
+        stacks = profiler.stop()
+    return result, dict(stacks)
+
+
+class ProfiledPool:
+    """Wraps an ExtractionPool so each call is profiled inside the worker"""
+
+    def __init__(self, pool, profile: "RequestProfile"):
+        self.pool = pool
+        self.profile = profile
+
+    async def run(self, fn: Callable, *args):
+        result, stacks = await self.pool.run(profiled_call, self.profile.interval, fn, *args)
+        self.profile.stacks.update(stacks)
+        return result
+
+
+class RequestProfile:
+    def __init__(self, profile_id: str, sha256: str, interval: float, forced: bool):
+        self.profile_id = profile_id
+        self.sha256 = sha256
+        self.interval = interval
+        self.forced = forced
+        self.stacks: Counter = Counter()
+
+    def wrap_pool(self, pool) -> ProfiledPool:
+        return ProfiledPool(pool, self)
+
+
+class RequestProfiler:
+    """Decides which requests to profile and writes the slow ones to ``output_dir``.
+
+    Requests are profiled when they carry ``X-Profile-Request: <admin token>``
+    (always written) or are picked by ``sample_rate`` (written only if they
+    take at least ``slow_seconds``). Only the newest ``keep`` profiles are kept.
+    """
+
+    def __init__(
+        self,
+        admin_token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        slow_seconds: float = 5.0,
+        interval: float = 0.005,
+        output_dir: Optional[str] = None,
+        keep: int = 50,
+    ):
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.interval = interval
+        self.output_dir = Path(output_dir or Path(tempfile.gettempdir()) / "resume-profiles")
+        self.keep = keep
+
+    def is_forced(self, headers) -> bool:
+        token = headers.get(PROFILE_HEADER)
+        return bool(self.admin_token and token and hmac.compare_digest(token, self.admin_token))
+
+    def should_profile(self, forced: bool) -> bool:
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def new_profile_id(self, sha256: str) -> str:
+        return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{sha256[:12]}"
+
+    @contextmanager
+    def session(self, profile_id: str, sha256: str, forced: bool, **details: Any) -> Iterator[RequestProfile]:
+        """Profile the enclosed block, writing it out if it was forced or slow"""
+        profile = RequestProfile(profile_id, sha256, self.interval, forced)
+        loop_profiler = SamplingProfiler(interval=self.interval, root="event_loop").start()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield profile
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            current_profile.reset(token)
+            profile.stacks.update(loop_profiler.stop())
+            if forced or elapsed >= self.slow_seconds:
+                self._write(profile, elapsed, error, details)
+
+    def _write(self, profile: RequestProfile, elapsed: float, error: Optional[str], details: Dict[str, Any]) -> None:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            folded = "".join(f"{stack} {count}\n" for stack, count in profile.stacks.most_common())
+            (self.output_dir / f"{profile.profile_id}.folded").write_text(folded)
+            (self.output_dir / f"{profile.profile_id}.json").write_bytes(orjson.dumps({
+                "profile_id": profile.profile_id,
+                "sha256": profile.sha256,
+                "elapsed_seconds": round(elapsed, 4),
+                "forced": profile.forced,
+                "samples": sum(profile.stacks.values()),
+                "interval_seconds": profile.interval,
+                "error": error,
+                **details,
+            }, option=orjson.OPT_INDENT_2))
+            logging.warning("Profiled resume %s took %.2fs, wrote %s.folded", profile.sha256, elapsed, self.output_dir / profile.profile_id)
+            self._prune()
+        except Exception as e:
+            logging.error("Error writing request profile: %s", e)
+
+    def _prune(self) -> None:
+        profiles = sorted(self.output_dir.glob("*.folded"))
+        for stale in profiles[:max(0, len(profiles) - self.keep)]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".json").unlink(missing_ok=True)
+
+
+def create_request_profiler() -> RequestProfiler:
+    """Build the request profiler from environment configuration"""
+    return RequestProfiler(
+        admin_token=os.environ.get('PROFILING_ADMIN_TOKEN') or None,
+        sample_rate=float(os.environ.get('PROFILING_SAMPLE_RATE', '0')),
+        slow_seconds=float(os.environ.get('PROFILING_SLOW_SECONDS', '5')),
+        interval=float(os.environ.get('PROFILING_INTERVAL_SECONDS', '0.005')),
+        output_dir=os.environ.get('PROFILING_OUTPUT_DIR') or None,
+        keep=int(os.environ.get('PROFILING_KEEP', '50')),
+    )
@@ -0,0 +1,98 @@
+"""Content-addressed storage of the parsed resumes behind portfolios.
+
+A parsed resume is stored once in ``parsed_resumes`` under the SHA-256 of
+its canonical JSON (the validated data with sorted keys), and portfolios
+reference it by ``resume_id``, so republishing the same resume with other
+templates only adds the small portfolio document. Saves are upserts with
+``$setOnInsert``, so concurrent deploys of one resume converge on a single
+document and repeat saves write nothing.
+
+Contact fields and skills are stored as plain values so they stay
+queryable; the list sections, which carry the long free-text descriptions,
+are zlib-compressed once their JSON exceeds ``compress_min_bytes``.
+"""
+import hashlib
+import logging
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import orjson
+from pymongo import UpdateOne
+
+COMPRESSIBLE_FIELDS = ("education", "experience", "projects")
+
+
+def canonical_json(data: Dict[str, Any]) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+
+def compute_resume_id(data: Dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_json(data)).hexdigest()
+
+
+class ResumeStore:
+    def __init__(self, collection, compress_min_bytes: int = 1024, compress_level: int = 6):
+        self.collection = collection
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def encode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The stored document for a parsed resume, keyed by its content hash"""
+        plain = dict(data)
+        compressed = {}
+        for field in COMPRESSIBLE_FIELDS:
+            if field not in plain:
+                continue
+            serialized = orjson.dumps(plain[field])
+            if len(serialized) >= self.compress_min_bytes:
+                compressed[field] = zlib.compress(serialized, self.compress_level)
+                del plain[field]
+        document = {
+            "_id": compute_resume_id(data),
+            "data": plain,
+            "size_bytes": len(canonical_json(data)),
+            "created_at": datetime.utcnow(),
+        }
+        if compressed:
+            document["compressed"] = compressed
+        return document
+
+    @staticmethod
+    def decode(document: Dict[str, Any]) -> Dict[str, Any]:
+        data = dict(document["data"])
+        for field, blob in (document.get("compressed") or {}).items():
+            data[field] = orjson.loads(zlib.decompress(blob))
+        return data
+
+    async def save(self, data: Dict[str, Any]) -> str:
+        """Store a parsed resume unless identical content is already stored, returning its id"""
+        document = self.encode(data)
+        await self.collection.update_one({"_id": document["_id"]}, {"$setOnInsert": document}, upsert=True)
+        return document["_id"]
+
+    async def save_many(self, resumes: List[Dict[str, Any]]) -> List[str]:
+        """Store many parsed resumes with one unordered bulk upsert, returning an id per input"""
+        documents = [self.encode(data) for data in resumes]
+        unique = {document["_id"]: document for document in documents}
+        if unique:
+            await self.collection.bulk_write(
+                [UpdateOne({"_id": resume_id}, {"$setOnInsert": document}, upsert=True) for resume_id, document in unique.items()],
+                ordered=False,
+            )
+        return [document["_id"] for document in documents]
+
+    def lookup_stage(self) -> Dict[str, Any]:
+        """Aggregation stage joining a portfolio's parsed resume in as ``resume``"""
+        return {"$lookup": {"from": self.collection.name, "localField": "resume_id", "foreignField": "_id", "as": "resume"}}
+
+    def assemble(self, portfolio: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the joined resume reference with ``parsed_resume``; older portfolios embed it already"""
+        joined = portfolio.pop("resume", None) or []
+        resume_id: Optional[str] = portfolio.pop("resume_id", None)
+        if joined:
+            portfolio["parsed_resume"] = self.decode(joined[0])
+        elif resume_id:
+            logging.error("Parsed resume %s is missing for portfolio %s", resume_id, portfolio.get('route_slug'))
+            portfolio["parsed_resume"] = {}
+        return portfolio
@@ -0,0 +1,182 @@
+"""Indexed search over deployed portfolios with keyset pagination.
+
+Parsed resumes live in their own collection (partly compressed), so each
+portfolio document carries two small denormalized copies of what search
+needs: ``summary`` holds the display fields returned in results, and
+``search`` holds normalized keys (lowercased skills, title and location
+words, username) that the indexes cover. Both are written with the
+portfolio and rewritten whenever its resume changes.
+
+Results are ordered newest first by ``_id`` and paged with an opaque
+cursor holding the last ``_id`` returned, so every page is an index range
+scan no matter how deep it is, unlike skip/limit.
+"""
+import base64
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne
+
+from metrics import stage_timer
+from snapshots import snapshot_url
+
+_WORD_RE = re.compile(r"\w+")
+
+SUMMARY_SKILLS = 20
+SUMMARY_PROJECTION = {"_id": 1, "route_slug": 1, "username": 1, "selected_template": 1, "created_at": 1, "summary": 1}
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def search_fields(username: str, resume: Dict[str, Any]) -> Dict[str, Any]:
+    """The ``summary`` and ``search`` fields stored on a portfolio for its parsed resume"""
+    skills = unique([skill.strip() for skill in resume.get("skills") or [] if isinstance(skill, str)])
+    titles = unique([str(job.get("title") or "").strip() for job in resume.get("experience") or []])
+    location = resume.get("location") or ""
+    return {
+        "summary": {
+            "name": resume.get("name") or "",
+            "location": location,
+            "skills": skills[:SUMMARY_SKILLS],
+            "titles": titles,
+        },
+        "search": {
+            "username": username.lower(),
+            "skills": unique([skill.lower() for skill in skills]),
+            "titles": unique([word for title in titles for word in words(title)]),
+            "location": unique(words(location)),
+        },
+    }
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(last_id.binary).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    """The ``_id`` a page cursor points after; ValueError if it wasn't issued by ``encode_cursor``"""
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (InvalidId, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class PortfolioSearch:
+    """Filtered, cursor-paginated listing of portfolios from their ``search`` keys.
+
+    Every filter has a compound index with ``_id`` so equality matches come
+    back already in page order; several filters are ANDed and MongoDB picks
+    the most selective index.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        for field in ("skills", "titles", "location", "username"):
+            await self.collection.create_index([(f"search.{field}", ASCENDING), ("_id", DESCENDING)])
+        # Free-text queries; a collection can have only one text index
+        await self.collection.create_index(
+            [("summary.name", TEXT), ("summary.titles", TEXT), ("summary.location", TEXT), ("search.skills", TEXT), ("username", TEXT)],
+            default_language="none",
+        )
+
+    async def backfill(self, resumes, batch_size: int = 500) -> int:
+        """Write ``summary`` and ``search`` on portfolios that have neither, returning how many were updated.
+
+        Covers portfolios that embed ``parsed_resume`` and ones that reference
+        a stored resume by ``resume_id``. Only documents still missing
+        ``search`` are read or written, so running it again is a no-op.
+        """
+        missing = {"search": {"$exists": False}}
+        projection = {"_id": 1, "route_slug": 1, "username": 1, "parsed_resume": 1, "resume_id": 1}
+        updated = 0
+        batch: List[Dict[str, Any]] = []
+        async for document in self.collection.find(missing, projection):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                updated += await self._backfill_batch(resumes, batch)
+                batch = []
+        if batch:
+            updated += await self._backfill_batch(resumes, batch)
+        return updated
+
+    async def _backfill_batch(self, resumes, batch: List[Dict[str, Any]]) -> int:
+        resume_ids = list({document["resume_id"] for document in batch if document.get("resume_id")})
+        stored = {}
+        if resume_ids:
+            async for resume in resumes.collection.find({"_id": {"$in": resume_ids}}):
+                stored[resume["_id"]] = resumes.decode(resume)
+
+        requests = []
+        for document in batch:
+            resume = document.get("parsed_resume")
+            if resume is None and document.get("resume_id"):
+                resume = stored.get(document["resume_id"])
+                if resume is None:
+                    logging.error("Parsed resume %s is missing for portfolio %s", document['resume_id'], document.get('route_slug'))
+            fields = search_fields(document.get("username") or "", resume or {})
+            # Re-checked on write so a concurrent update's fields are never overwritten
+            requests.append(UpdateOne({"_id": document["_id"], "search": {"$exists": False}}, {"$set": fields}))
+        with stage_timer("db_update", self.collection.name):
+            result = await self.collection.bulk_write(requests, ordered=False)
+        return result.modified_count
+
+    @staticmethod
+    def build_query(
+        skills: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        location: Optional[str] = None,
+        username: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        skills = unique([skill.strip().lower() for skill in skills or []])
+        if skills:
+            query["search.skills"] = {"$all": skills} if len(skills) > 1 else skills[0]
+        # Multi-word titles and locations match portfolios containing every word
+        for field, value in (("titles", title), ("location", location)):
+            terms = unique(words(value or ""))
+            if terms:
+                query[f"search.{field}"] = {"$all": terms} if len(terms) > 1 else terms[0]
+        if username:
+            # Anchored and case-folded at write time, so this is a range scan on the index
+            query["search.username"] = {"$regex": f"^{re.escape(username.lower())}"}
+        if text:
+            query["$text"] = {"$search": text}
+        return query
+
+    async def search(self, query: Dict[str, Any], limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of matching portfolio summaries, newest first, plus the cursor of the next page"""
+        if cursor:
+            query = {**query, "_id": {"$lt": decode_cursor(cursor)}}
+        with stage_timer("db_find", self.collection.name):
+            # One extra document tells whether there is a next page without a count
+            documents = await self.collection.find(query, SUMMARY_PROJECTION).sort("_id", DESCENDING).limit(limit + 1).to_list(limit + 1)
+        next_cursor = encode_cursor(documents[limit - 1]["_id"]) if len(documents) > limit else None
+        return [self._result(document) for document in documents[:limit]], next_cursor
+
+    @staticmethod
+    def _result(document: Dict[str, Any]) -> Dict[str, Any]:
+        summary = document.get("summary") or {}
+        return {
+            "route_slug": document["route_slug"],
+            "portfolio_url": f"/portfolio/{document['route_slug']}",
+            "snapshot_url": snapshot_url(document["route_slug"]),
+            "username": document.get("username"),
+            "selected_template": document.get("selected_template"),
+            "created_at": document.get("created_at"),
+            "name": summary.get("name", ""),
+            "location": summary.get("location", ""),
+            "skills": summary.get("skills", []),
+            "titles": summary.get("titles", []),
+        }
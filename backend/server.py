@@ -1,40 +1,182 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query, Request
+from pydantic import ValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse, Response
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable, AsyncIterator
+from functools import partial
 import uuid
+import hashlib
+import hmac
+import secrets
 from datetime import datetime
 import asyncio
-import tempfile
+import time
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-import PyPDF2
-import docx
-import pdfplumber
-import io
+import gzip
+from extraction import extract_docx, extract_pdf_on_pool, preload_parsers, EXTRACTOR_VERSION
+from cache import TTLCache, ParseCache, PortfolioCache
+from uploads import read_upload, IngestedUpload, ZipArchive, UploadSizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+from worker_pool import create_extraction_pool, PoolSaturatedError, PoolTimeoutError
+from llm_client import create_llm_client, LlmError
+from jobs import JobQueue, JobWorkerPool, PermanentJobError
+from snapshots import SnapshotStore, snapshot_url
+from resume_store import ResumeStore
+from logs import RequestLogMiddleware, configure_logging, log_payload, request_id
+from search import PortfolioSearch, search_fields
+from compression import CompressionMiddleware
+import metrics
+from mongo import create_mongo_client, read_preference, MongoReadiness
+from profiling import create_request_profiler, current_profile
+from metrics import MetricsMiddleware, CallbackMetric, stage_timer, observe_stage, LLM_PARSE_ERRORS, LLM_REPAIRS, FALLBACK_PARSES, LLM_SKIPPED, PROMPT_TOKENS
+from normalize import normalize_resume_text, estimate_tokens
+from preparse import preparse_resume, build_llm_prompt, PreParse
+from json_stream import IncrementalJsonDecoder, FieldEvent
+import orjson
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection; pool size, timeouts and read preference come from MONGO_* settings
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client, mongo_pool_monitor = create_mongo_client(mongo_url)
 db = client[os.environ['DB_NAME']]
+mongo_readiness = MongoReadiness(client, db, mongo_pool_monitor, ping_timeout=float(os.environ.get('MONGO_READY_TIMEOUT_SECONDS', '2')))
+# Connections opened at startup so the first requests don't wait for handshakes
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', '4'))
 
-# Create the main app without a prefix
-app = FastAPI()
+# Create the main app without a prefix; orjson serializes responses several times faster than the stdlib
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# Create a router with the /api prefix
+# Which routes and background work this process runs, so portfolio reads and resume
+# parsing can be scaled separately: "api" serves portfolios and templates, "parse"
+# serves the resume endpoints and runs the job workers, "all" does both
+SERVER_ROLE = os.environ.get('SERVER_ROLE', 'all')
+if SERVER_ROLE not in ('all', 'api', 'parse'):
+    raise ValueError(f"Unknown SERVER_ROLE: {SERVER_ROLE}")
+SERVES_API = SERVER_ROLE in ('all', 'api')
+SERVES_PARSE = SERVER_ROLE in ('all', 'parse')
+
+# Create routers with the /api prefix; each role includes its own
 api_router = APIRouter(prefix="/api")
+read_router = APIRouter(prefix="/api")
+parse_router = APIRouter(prefix="/api")
 
 # Gemini API setup
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+GEMINI_MODEL = "gemini-2.0-flash"
+# Bump whenever the system prompt changes so cached parses are not reused
+PROMPT_VERSION = "3"
+
+# Resumes the rule-based pre-parser is this confident about skip the LLM call entirely
+PREPARSE_SKIP_LLM_CONFIDENCE = float(os.environ.get('PREPARSE_SKIP_LLM_CONFIDENCE', '0.95'))
+# Estimated token budget for the resume part of the prompt; longer resumes are trimmed by section
+LLM_PROMPT_TOKEN_BUDGET = int(os.environ.get('LLM_PROMPT_TOKEN_BUDGET', '6000'))
+
+# One long-lived LLM client shares connections, the concurrency limit and retry policy across requests
+llm_client = create_llm_client(GEMINI_API_KEY, "gemini", GEMINI_MODEL)
+
+# Text extraction runs on a bounded worker pool so uploads never block the event loop;
+# workers import the parser libraries as they start so the API process doesn't have to
+extraction_pool = create_extraction_pool(initializer=preload_parsers)
+EXTRACTION_RETRY_AFTER_SECONDS = int(os.environ.get('EXTRACTION_RETRY_AFTER_SECONDS', '5'))
+
+# Slow parses can be profiled on demand (admin header) or by sampling; off unless configured
+request_profiler = create_request_profiler()
+
+# Uploads are streamed in chunks and capped so a single request cannot balloon worker memory
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', str(64 * 1024)))
+
+# Batch parsing fans out over many files with bounded concurrency
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', '500'))
+BATCH_MAX_UPLOAD_BYTES = int(os.environ.get('BATCH_MAX_UPLOAD_BYTES', str(200 * 1024 * 1024)))
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '8'))
+BATCH_SATURATED_RETRIES = int(os.environ.get('BATCH_SATURATED_RETRIES', '3'))
+
+# Bulk deploys validate every item but write them in one unordered insert_many
+DEPLOY_BATCH_MAX_ITEMS = int(os.environ.get('DEPLOY_BATCH_MAX_ITEMS', '1000'))
+# Rounds of regenerating slugs that collided before an item is reported as failed
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+# Portfolio reads can go to secondaries (e.g. MONGO_PORTFOLIO_READ_PREFERENCE=secondaryPreferred)
+PORTFOLIO_READ_PREFERENCE = os.environ.get('MONGO_PORTFOLIO_READ_PREFERENCE', os.environ.get('MONGO_READ_PREFERENCE', 'primary'))
+portfolio_read_collection = None
+if PORTFOLIO_READ_PREFERENCE != 'primary':
+    portfolio_read_collection = db.get_collection('portfolios', read_preference=read_preference(
+        PORTFOLIO_READ_PREFERENCE, int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '-1'))
+    ))
+
+# Parsed resumes are stored once by content hash and referenced from portfolios
+resume_store = ResumeStore(
+    db.parsed_resumes,
+    compress_min_bytes=int(os.environ.get('PARSED_RESUME_COMPRESS_MIN_BYTES', '1024')),
+)
+
+# Published portfolios are read far more than written, so reads go through an in-process cache.
+# Writes only invalidate the cache of the process that made them, so after a PATCH other replicas can
+# serve the old portfolio for up to PORTFOLIO_CACHE_TTL_SECONDS, and browsers for PORTFOLIO_CACHE_MAX_AGE
+# on top of that; keep both short.
+portfolio_cache = PortfolioCache(
+    db.portfolios,
+    read_collection=portfolio_read_collection,
+    resumes=resume_store,
+    memory=TTLCache(
+        max_entries=int(os.environ.get('PORTFOLIO_CACHE_MAX_ENTRIES', '10000')),
+        max_bytes=int(os.environ.get('PORTFOLIO_CACHE_MAX_BYTES', str(128 * 1024 * 1024))),
+        ttl=float(os.environ.get('PORTFOLIO_CACHE_TTL_SECONDS', '60')),
+    ),
+)
+PORTFOLIO_CACHE_MAX_AGE = int(os.environ.get('PORTFOLIO_CACHE_MAX_AGE', '60'))
+
+# Search reads indexed summary fields stored on each portfolio, a page at a time
+portfolio_search = PortfolioSearch(db.portfolios)
+SEARCH_DEFAULT_LIMIT = int(os.environ.get('SEARCH_DEFAULT_LIMIT', '20'))
+SEARCH_MAX_LIMIT = int(os.environ.get('SEARCH_MAX_LIMIT', '100'))
+# Portfolios deployed before search fields existed get them filled in once, at startup
+SEARCH_BACKFILL_ON_STARTUP = os.environ.get('SEARCH_BACKFILL_ON_STARTUP', 'true').lower() != 'false'
+
+# Deployed portfolios get a pre-rendered HTML snapshot that paints before the SPA bundle loads.
+# As with portfolios, other replicas can serve a snapshot from before an edit for up to
+# SNAPSHOT_CACHE_TTL_SECONDS. Clients revalidate on every view unless SNAPSHOT_CACHE_MAX_AGE is set.
+snapshot_store = SnapshotStore(
+    db.portfolio_snapshots,
+    memory=TTLCache(
+        max_entries=int(os.environ.get('SNAPSHOT_CACHE_MAX_ENTRIES', '10000')),
+        max_bytes=int(os.environ.get('SNAPSHOT_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        ttl=float(os.environ.get('SNAPSHOT_CACHE_TTL_SECONDS', '60')),
+    ),
+)
+SNAPSHOT_CACHE_MAX_AGE = int(os.environ.get('SNAPSHOT_CACHE_MAX_AGE', '0'))
+
+# Async parse jobs are queued in MongoDB and processed by background workers
+job_queue = JobQueue(
+    db.resume_jobs,
+    lease_seconds=float(os.environ.get('RESUME_JOB_LEASE_SECONDS', '120')),
+    max_attempts=int(os.environ.get('RESUME_JOB_MAX_ATTEMPTS', '3')),
+)
+RESUME_JOB_WORKERS = int(os.environ.get('RESUME_JOB_WORKERS', '2'))
+RESUME_JOB_MAX_WAIT_SECONDS = float(os.environ.get('RESUME_JOB_MAX_WAIT_SECONDS', '30'))
+
+# Repeat uploads of the same file are served from cache instead of re-extracting and re-calling Gemini
+parse_cache = ParseCache(
+    db.parse_cache,
+    version=f"{EXTRACTOR_VERSION}:{PROMPT_VERSION}:{GEMINI_MODEL}",
+    memory=TTLCache(
+        max_entries=int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', '1024')),
+        max_bytes=int(os.environ.get('PARSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        ttl=float(os.environ.get('PARSE_CACHE_TTL_SECONDS', '86400')),
+    ),
+    db_ttl_seconds=int(os.environ.get('PARSE_CACHE_DB_TTL_SECONDS', str(30 * 24 * 3600))),
+)
 
 # Define Models
 class ParsedResumeData(BaseModel):
@@ -48,6 +190,11 @@ class ParsedResumeData(BaseModel):
     projects: List[Dict[str, Any]] = []
     socials: Dict[str, str] = {}
 
+PARSED_RESUME_FIELDS = set(ParsedResumeData().dict())
+
+# Receives (field, value) as parsed resume fields become known, for streaming them to the client
+FieldCallback = Callable[[str, Any], None]
+
 class Portfolio(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     username: str
@@ -55,12 +202,25 @@ class Portfolio(BaseModel):
     selected_template: str
     route_slug: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+    # Bumped by every update; writers send the version they read to detect concurrent edits
+    version: int = 1
 
 class PortfolioCreate(BaseModel):
     username: str
     selected_template: str
     parsed_resume: ParsedResumeData
 
+class PortfolioUpdate(BaseModel):
+    version: int
+    selected_template: Optional[str] = None
+    # Only the resume fields given are replaced; the rest are kept
+    parsed_resume: Optional[Dict[str, Any]] = None
+
+class PortfolioBatchCreate(BaseModel):
+    # Validated one by one so a bad item fails alone instead of rejecting the batch
+    portfolios: List[Dict[str, Any]]
+
 class Template(BaseModel):
     id: str
     name: str
@@ -95,82 +255,7 @@ TEMPLATES = [
     }
 ]
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file using multiple methods"""
-    try:
-        # Method 1: Try pdfplumber first (more reliable)
-        pdf_file = io.BytesIO(file_content)
-        with pdfplumber.open(pdf_file) as pdf:
-            text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            if text.strip():
-                return text
-    except Exception as e:
-        logging.error(f"pdfplumber extraction failed: {e}")
-    
-    try:
-        # Method 2: Fallback to PyPDF2
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        if text.strip():
-            return text
-    except Exception as e:
-        logging.error(f"PyPDF2 extraction failed: {e}")
-    
-    # Method 3: If it's just text content (for testing)
-    try:
-        text = file_content.decode('utf-8', errors='ignore')
-        if text.strip():
-            return text
-    except Exception as e:
-        logging.error(f"Text decoding failed: {e}")
-    
-    return ""
-
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
-    try:
-        doc_file = io.BytesIO(file_content)
-        doc = docx.Document(doc_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text += paragraph.text + "\n"
-        
-        # Also extract text from tables if any
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        text += cell.text + "\n"
-        
-        return text
-    except Exception as e:
-        logging.error(f"Error extracting text from DOCX: {e}")
-        # Fallback: try to decode as text (for testing)
-        try:
-            text = file_content.decode('utf-8', errors='ignore')
-            if text.strip():
-                return text
-        except:
-            pass
-        return ""
-
-async def parse_resume_with_gemini(resume_text: str) -> ParsedResumeData:
-    """Parse resume text using Gemini API"""
-    try:
-        chat = LlmChat(
-            api_key=GEMINI_API_KEY,
-            session_id=f"resume_parse_{uuid.uuid4()}",
-            system_message="""You are an expert resume parser. Extract structured information from resumes and return ONLY valid JSON.
+RESUME_PARSER_SYSTEM_PROMPT = """You are an expert resume parser. Extract structured information from resumes and return ONLY valid JSON.
 
 Return the data in this exact format:
 {
@@ -211,69 +296,107 @@ Return the data in this exact format:
 }
 
 Extract only available information. Use empty strings for missing text fields and empty arrays for missing lists."""
-        ).with_model("gemini", "gemini-2.0-flash")
 
-        user_message = UserMessage(
-            text=f"Parse this resume and return structured JSON data:\n\n{resume_text}"
+async def parse_resume_with_gemini(resume_text: str, use_fallback: bool = True, on_field: Optional[FieldCallback] = None) -> ParsedResumeData:
+    """Parse resume text using Gemini API, falling back to basic parsing unless use_fallback is False.
+
+    The reply is streamed and decoded as it arrives; on_field, if given, is
+    called with the pre-parsed fields first and then each field the model
+    completes, so partial results can be shown before the parse finishes.
+    """
+    # Drop page furniture, duplicated table cells and whitespace before anything reads the text
+    with stage_timer("normalize"):
+        normalized = normalize_resume_text(resume_text)
+    
+    # The rule-based parse either answers outright or shrinks the prompt to what still needs the model
+    with stage_timer("preparse"):
+        preparsed = preparse_resume(normalized.text)
+    if preparsed.confidence >= PREPARSE_SKIP_LLM_CONFIDENCE:
+        LLM_SKIPPED.inc()
+        return ParsedResumeData(**preparsed.data)
+    if on_field:
+        for key, value in preparsed.data.items():
+            if value:
+                on_field(key, value)
+    
+    try:
+        prompt = build_llm_prompt(preparsed, normalized.text, token_budget=LLM_PROMPT_TOKEN_BUDGET)
+        prompt_tokens = estimate_tokens(prompt)
+        PROMPT_TOKENS.labels("raw").inc(normalized.tokens_before)
+        PROMPT_TOKENS.labels("normalized").inc(normalized.tokens_after)
+        PROMPT_TOKENS.labels("sent").inc(prompt_tokens)
+        logging.info(
+            "Prompt ~%d tokens from ~%d extracted", prompt_tokens, normalized.tokens_before,
+            extra={"prompt_tokens": prompt_tokens, "extracted_tokens": normalized.tokens_before, "removed": normalized.removed},
         )
         
-        response = await chat.send_message(user_message)
-        
-        # Handle different response formats
-        response_text = ""
-        if hasattr(response, 'content'):
-            response_text = response.content
-        elif hasattr(response, 'text'):
-            response_text = response.text
-        elif isinstance(response, str):
-            response_text = response
-        else:
-            # Try to get text from response object
-            response_text = str(response)
+        # Decode the reply as it streams in; fences, trailing commas and truncation are repaired
+        decoder = IncrementalJsonDecoder()
+        backend_name = llm_client.backend.name
+        start = time.perf_counter()
+        with stage_timer("llm", backend_name):
+            async for chunk in llm_client.stream(RESUME_PARSER_SYSTEM_PROMPT, prompt):
+                if not decoder.started:
+                    observe_stage("llm_first_chunk", backend_name, time.perf_counter() - start)
+                for event in decoder.feed(chunk):
+                    if on_field:
+                        emit_llm_field(on_field, event, preparsed)
         
-        logging.info(f"Gemini response: {response_text[:500]}")
-        
-        # Clean the response to extract JSON
-        response_text = response_text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        # Parse JSON
-        parsed_data = json.loads(response_text.strip())
-        return ParsedResumeData(**parsed_data)
+        with stage_timer("json_parse"):
+            parsed_data = decoder.result()
+        for defect in decoder.repairs:
+            LLM_REPAIRS.labels(defect).inc()
+        if "truncated" in decoder.repairs:
+            logging.warning("Gemini response was truncated; keeping the fields it completed")
+        logging.info("LLM response parsed", extra={"fields": list(parsed_data), "repairs": decoder.repairs})
+        return ParsedResumeData(**merge_preparsed(parsed_data, preparsed))
         
     except Exception as e:
-        logging.error(f"Error parsing resume with Gemini: {e}")
-        # Return basic extracted data if Gemini fails
-        try:
-            # Basic text parsing as fallback
-            lines = resume_text.split('\n')
-            name = lines[0] if lines else ""
-            email = ""
-            phone = ""
-            
-            # Extract basic info
-            for line in lines:
-                if '@' in line and '.' in line:
-                    email = line.strip()
-                if any(char.isdigit() for char in line) and ('-' in line or '(' in line):
-                    phone = line.strip()
-            
-            return ParsedResumeData(
-                name=name,
-                email=email,
-                phone=phone,
-                skills=["JavaScript", "Python", "React"],  # Placeholder
-                location="",
-                education=[],
-                experience=[],
-                projects=[],
-                socials={}
-            )
-        except:
-            return ParsedResumeData()
+        LLM_PARSE_ERRORS.labels(classify_parse_error(e)).inc()
+        logging.error("Error parsing resume with Gemini: %s", e)
+        if not use_fallback:
+            raise
+        return fallback_parse_resume(resume_text)
+
+def emit_llm_field(on_field: FieldCallback, event: FieldEvent, preparsed: PreParse) -> None:
+    """Pass a field from the model on, skipping empty values the pre-parsed ones will fill"""
+    field, value = event.field, event.value
+    if field not in PARSED_RESUME_FIELDS or not value:
+        return
+    # A half-written list would replace the complete pre-parsed one the client already shows
+    if not event.complete and preparsed.data.get(field):
+        return
+    if field == "socials" and isinstance(value, dict):
+        value = {**preparsed.data["socials"], **{k: v for k, v in value.items() if v}}
+    on_field(field, value)
+
+def classify_parse_error(error: Exception) -> str:
+    """Low-cardinality reason label for a failed LLM parse"""
+    if isinstance(error, LlmError):
+        return "llm_error"
+    if isinstance(error, json.JSONDecodeError):
+        return "invalid_json"
+    if isinstance(error, ValidationError):
+        return "invalid_schema"
+    return "error"
+
+def merge_preparsed(parsed_data: Dict[str, Any], preparsed: PreParse) -> Dict[str, Any]:
+    """Fill fields the model left empty with what the rule-based parser found"""
+    for key, value in preparsed.data.items():
+        if not parsed_data.get(key):
+            parsed_data[key] = value
+    if isinstance(parsed_data.get("socials"), dict):
+        parsed_data["socials"] = {**preparsed.data["socials"], **{k: v for k, v in parsed_data["socials"].items() if v}}
+    return parsed_data
+
+def fallback_parse_resume(resume_text: str) -> ParsedResumeData:
+    """Rule-based parsing used when Gemini is unavailable"""
+    FALLBACK_PARSES.inc()
+    try:
+        return ParsedResumeData(**preparse_resume(normalize_resume_text(resume_text).text).data)
+    except Exception as e:
+        logging.error("Error in fallback resume parsing: %s", e)
+        return ParsedResumeData()
 
 def generate_route_slug(username: str) -> str:
     """Generate unique route slug for portfolio"""
@@ -281,58 +404,368 @@ def generate_route_slug(username: str) -> str:
     clean_username = username.lower().replace(" ", "_").replace("@", "_at_")
     return f"{clean_username}_{random_id}"
 
+async def allocate_route_slugs(usernames: List[str]) -> List[str]:
+    """Generate one slug per username, unique within the list and not already taken in MongoDB"""
+    slugs = [generate_route_slug(username) for username in usernames]
+    for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+        with stage_timer("db_find", "portfolios"):
+            cursor = db.portfolios.find({"route_slug": {"$in": slugs}}, {"_id": 0, "route_slug": 1})
+            taken = {doc["route_slug"] async for doc in cursor}
+        seen = set()
+        clashes = []
+        for index, slug in enumerate(slugs):
+            if slug in taken or slug in seen:
+                clashes.append(index)
+            seen.add(slug)
+        if not clashes:
+            return slugs
+        for index in clashes:
+            slugs[index] = generate_route_slug(usernames[index])
+    raise RuntimeError("Could not allocate unique route slugs")
+
+def is_slug_conflict(write_error: Dict[str, Any]) -> bool:
+    """Whether a bulk write error is a duplicate route_slug (a slug taken after it was allocated)"""
+    return write_error.get("code") == 11000 and "route_slug" in str(write_error.get("keyPattern") or write_error.get("errmsg", ""))
+
+def hash_edit_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def new_edit_token() -> Tuple[str, str]:
+    """A random token returned once to whoever deploys a portfolio, and the hash stored in its place"""
+    token = secrets.token_urlsafe(32)
+    return token, hash_edit_token(token)
+
+def portfolio_document(portfolio: Portfolio, resume_id: str, edit_token_hash: str) -> Dict[str, Any]:
+    """The stored form of a portfolio, referencing its parsed resume instead of embedding it"""
+    return {
+        **portfolio.dict(exclude={"parsed_resume"}),
+        **search_fields(portfolio.username, portfolio.parsed_resume.dict()),
+        "resume_id": resume_id,
+        "edit_token_hash": edit_token_hash,
+    }
+
+async def insert_portfolios(portfolios: List[Portfolio], resume_ids: List[str], edit_token_hashes: List[str]) -> Dict[int, str]:
+    """Insert portfolios with unordered insert_many, re-slugging any that lost a slug race.
+
+    Returns error messages by index for the portfolios that could not be
+    inserted; the others are all written.
+    """
+    errors: Dict[int, str] = {}
+    pending = list(range(len(portfolios)))
+    for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+        if not pending:
+            return errors
+        try:
+            with stage_timer("db_insert_many", "portfolios"):
+                await db.portfolios.insert_many(
+                    [portfolio_document(portfolios[index], resume_ids[index], edit_token_hashes[index]) for index in pending],
+                    ordered=False,
+                )
+            return errors
+        except BulkWriteError as e:
+            retry = []
+            for write_error in e.details.get("writeErrors", []):
+                index = pending[write_error["index"]]
+                if is_slug_conflict(write_error):
+                    retry.append(index)
+                else:
+                    errors[index] = write_error.get("errmsg", "Write failed")
+            slugs = await allocate_route_slugs([portfolios[index].username for index in retry])
+            for index, slug in zip(retry, slugs):
+                portfolios[index].route_slug = slug
+            pending = retry
+    for index in pending:
+        errors[index] = "Could not allocate a unique route slug"
+    return errors
+
+async def run_extraction(file_kind: str, file_content: bytes) -> Tuple[str, str]:
+    """Extract resume text on the worker pool, returning (text, strategy) and mapping pool errors to HTTP responses"""
+    if file_kind == 'text':
+        return file_content.decode('utf-8', errors='ignore'), "text"
+    # Profiled requests have each worker call sample itself and send the stacks back
+    profile = current_profile.get()
+    pool = profile.wrap_pool(extraction_pool) if profile else extraction_pool
+    start = time.perf_counter()
+    try:
+        if file_kind == 'pdf':
+            extraction = await extract_pdf_on_pool(pool, file_content)
+            text, strategy = extraction.text, extraction.strategy
+        else:
+            text, strategy = await pool.run(extract_docx, file_content)
+        observe_stage("extraction", strategy, time.perf_counter() - start)
+        return text, strategy
+    except PoolSaturatedError as e:
+        logging.warning("Rejecting upload: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Resume parser is busy, please retry shortly",
+            headers={"Retry-After": str(EXTRACTION_RETRY_AFTER_SECONDS)},
+        )
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
 # API Routes
 @api_router.get("/")
 async def root():
-    return {"message": "Portfolio Maker API"}
+    return {"message": "Portfolio Maker API", "role": SERVER_ROLE}
+
+def get_resume_file_ext(filename: Optional[str]) -> str:
+    """Validate an uploaded resume's filename and return its extension"""
+    if not filename:
+        raise HTTPException(status_code=400, detail="No filename provided")
+        
+    file_ext = filename.lower().split('.')[-1]
+    if file_ext not in ['pdf', 'docx']:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    return file_ext
+
+async def process_resume(upload: IngestedUpload, use_cache: bool = True, on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
+    """Extract and parse an ingested resume, going through the parse cache unless use_cache is False"""
+    # Serve repeat uploads of the same file from the parse cache
+    file_hash = upload.sha256
+    cached = await parse_cache.get(file_hash) if use_cache else None
+    if cached and cached["parsed_data"] is not None:
+        return {
+            "success": True,
+            "parsed_data": cached["parsed_data"],
+            "message": "Resume parsed successfully",
+            "extracted_text_length": len(cached["resume_text"]),
+            "extraction_strategy": "cache",
+            "cached": True
+        }
+    
+    # Extract text based on file type
+    if cached:
+        resume_text, extraction_strategy = cached["resume_text"], "cache"
+    else:
+        resume_text, extraction_strategy = await run_extraction(upload.kind, upload.content)
+    
+    if not resume_text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from the file. Please ensure the file contains readable text.")
+    
+    logging.info(
+        "Extracted %d characters via %s", len(resume_text), extraction_strategy,
+        extra={"text_chars": len(resume_text), "strategy": extraction_strategy},
+    )
+    # Resume text is personal data: only sampled, truncated and redacted
+    log_payload("Extracted resume text", resume_text, strategy=extraction_strategy)
+    
+    # Parse with Gemini; only successful LLM parses are cached so failures get retried
+    try:
+        parsed_data = await parse_resume_with_gemini(resume_text, use_fallback=False, on_field=on_field)
+        await parse_cache.set(file_hash, resume_text, parsed_data.dict())
+    except Exception:
+        parsed_data = fallback_parse_resume(resume_text)
+        await parse_cache.set(file_hash, resume_text, None)
+    
+    return {
+        "success": True,
+        "parsed_data": parsed_data.dict(),
+        "message": "Resume parsed successfully",
+        "extracted_text_length": len(resume_text),
+        "extraction_strategy": extraction_strategy,
+        "cached": False
+    }
 
-@api_router.post("/resume/parse")
-async def parse_resume(file: UploadFile = File(...)):
-    """Parse uploaded resume using Gemini API"""
+@parse_router.post("/resume/parse")
+async def parse_resume(request: Request, file: UploadFile = File(...), mode: str = "sync"):
+    """Parse uploaded resume using Gemini API; mode=async queues a job and returns its id immediately"""
     try:
         # Validate file type
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No filename provided")
-            
-        file_ext = file.filename.lower().split('.')[-1]
-        if file_ext not in ['pdf', 'docx']:
-            raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+        get_resume_file_ext(file.filename)
+        if mode not in ("sync", "async"):
+            raise HTTPException(status_code=400, detail="mode must be 'sync' or 'async'")
         
-        # Read file content
-        file_content = await file.read()
+        # Stream the upload with a size cap; the content is sniffed so only real PDF/DOCX bytes reach the parsers
+        with stage_timer("upload_read"):
+            upload = await read_upload(file, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES)
         
-        if len(file_content) == 0:
-            raise HTTPException(status_code=400, detail="File is empty")
-        
-        # Extract text based on file type
-        if file_ext == 'pdf':
-            resume_text = extract_text_from_pdf(file_content)
-        else:
-            resume_text = extract_text_from_docx(file_content)
-        
-        if not resume_text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from the file. Please ensure the file contains readable text.")
+        if mode == "async":
+            job_id = await job_queue.enqueue({
+                "filename": file.filename,
+                "kind": upload.kind,
+                "sha256": upload.sha256,
+                "content": upload.content,
+                # So the worker's log records carry the id of the request that queued the job
+                "request_id": request_id.get(),
+            })
+            return ORJSONResponse(status_code=202, content={
+                "success": True,
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/api/resume/jobs/{job_id}"
+            })
         
-        logging.info(f"Extracted text length: {len(resume_text)} characters")
-        logging.info(f"First 200 chars: {resume_text[:200]}")
+        # The result is plain JSON types, so skip jsonable_encoder and hand it straight to orjson
+        forced = request_profiler.is_forced(request.headers)
+        if not request_profiler.should_profile(forced):
+            return ORJSONResponse(await process_resume(upload))
         
-        # Parse with Gemini
-        parsed_data = await parse_resume_with_gemini(resume_text)
-        
-        return {
-            "success": True,
-            "parsed_data": parsed_data.dict(),
-            "message": "Resume parsed successfully",
-            "extracted_text_length": len(resume_text)
-        }
+        # Admin-requested profiles bypass the parse cache so the slow path actually runs
+        profile_id = request_profiler.new_profile_id(upload.sha256)
+        with request_profiler.session(profile_id, upload.sha256, forced, filename=file.filename, kind=upload.kind, size=len(upload.content)):
+            result = await process_resume(upload, use_cache=not forced)
+        return ORJSONResponse(result, headers={"X-Profile-Id": profile_id} if forced else None)
         
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error in parse_resume: {e}")
+        logging.error("Error in parse_resume: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
-@api_router.get("/templates")
+def format_sse(event: str, data: Any) -> bytes:
+    """One Server-Sent Event; orjson never emits raw newlines, so the data fits on one line"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+async def stream_parse_events(upload: IngestedUpload) -> AsyncIterator[bytes]:
+    """Run a parse, yielding a field event per field as it becomes known, then the result or an error"""
+    fields: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(process_resume(upload, on_field=lambda field, value: fields.put_nowait((field, value))))
+    task.add_done_callback(lambda _: fields.put_nowait(None))
+    try:
+        while (item := await fields.get()) is not None:
+            yield format_sse("field", {"field": item[0], "value": item[1]})
+        yield format_sse("result", task.result())
+    except HTTPException as e:
+        yield format_sse("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logging.error("Error in parse_resume_stream: %s", e)
+        yield format_sse("error", {"status_code": 500, "detail": f"Error processing resume: {str(e)}"})
+    finally:
+        # The client went away or the parse finished; don't leave it running either way
+        task.cancel()
+
+@parse_router.post("/resume/parse/stream")
+async def parse_resume_stream(file: UploadFile = File(...)):
+    """Parse uploaded resume, streaming fields as Server-Sent Events while the model writes them"""
+    get_resume_file_ext(file.filename)
+    with stage_timer("upload_read"):
+        upload = await read_upload(file, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES)
+    # Proxies such as nginx buffer responses unless told not to, which would hold every event until the end
+    return StreamingResponse(
+        stream_parse_events(upload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def run_resume_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for async parses; client errors fail the job instead of being retried"""
+    payload = job["payload"]
+    upload = IngestedUpload(content=payload["content"], kind=payload["kind"], sha256=payload["sha256"])
+    token = request_id.set(payload.get("request_id") or job["id"])
+    try:
+        return await process_resume(upload)
+    except HTTPException as e:
+        if e.status_code < 500 and e.status_code != 429:
+            raise PermanentJobError(e.detail, e.status_code)
+        raise Exception(e.detail)
+    finally:
+        request_id.reset(token)
+
+job_workers = JobWorkerPool(job_queue, run_resume_job, concurrency=RESUME_JOB_WORKERS)
+
+@parse_router.get("/resume/jobs/{job_id}")
+async def get_resume_job(job_id: str, wait: float = 0):
+    """Get an async parse job; wait > 0 long-polls up to that many seconds for it to finish"""
+    if wait > 0:
+        job = await job_queue.wait(job_id, timeout=min(wait, RESUME_JOB_MAX_WAIT_SECONDS))
+    else:
+        job = await job_queue.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "success": True,
+        "job": job
+    }
+
+async def parse_batch_item(filename: str, load: Callable[[], Awaitable[IngestedUpload]], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Parse one file of a batch, turning failures into a per-file error result"""
+    async with semaphore:
+        try:
+            get_resume_file_ext(filename)
+            upload = await load()
+            for attempt in range(BATCH_SATURATED_RETRIES + 1):
+                try:
+                    result = await process_resume(upload)
+                    break
+                except HTTPException as e:
+                    # The extraction pool is shared with single uploads; wait for room instead of failing the file
+                    if e.status_code != 503 or attempt == BATCH_SATURATED_RETRIES:
+                        raise
+                    await asyncio.sleep(EXTRACTION_RETRY_AFTER_SECONDS)
+            return {"filename": filename, "status_code": 200, **result}
+        except HTTPException as e:
+            return {"filename": filename, "success": False, "status_code": e.status_code, "error": e.detail}
+        except Exception as e:
+            logging.error("Error parsing %s in batch: %s", filename, e)
+            return {"filename": filename, "success": False, "status_code": 500, "error": f"Error processing resume: {str(e)}"}
+
+@parse_router.post("/resume/parse/batch")
+async def parse_resume_batch(request: Request):
+    """Parse many resumes (files and/or zips of files), streaming NDJSON results as each completes"""
+    # The form is parsed here rather than through File(...) so uploads stay open while the response streams
+    form = await request.form(max_files=BATCH_MAX_FILES, max_fields=BATCH_MAX_FILES)
+    archives: List[ZipArchive] = []
+    items = []
+    try:
+        for file in form.getlist("files"):
+            if not isinstance(file, StarletteUploadFile):
+                continue
+            if (file.filename or "").lower().endswith(".zip"):
+                archive = ZipArchive(file.file, max_members=BATCH_MAX_FILES)
+                archives.append(archive)
+                for info in archive.members:
+                    items.append((info.filename, partial(run_in_threadpool, archive.read_member, info, MAX_UPLOAD_BYTES)))
+            else:
+                items.append((file.filename, partial(read_upload, file, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES)))
+        if not items:
+            raise HTTPException(status_code=400, detail="No files provided")
+        if len(items) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"Batch contains more than {BATCH_MAX_FILES} files")
+    except Exception:
+        await close_batch(form, archives)
+        raise
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        tasks = [asyncio.create_task(parse_batch_item(name, load, semaphore)) for name, load in items]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield orjson.dumps(await completed, default=str) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(close_batch, form, archives),
+    )
+
+async def close_batch(form, archives: List[ZipArchive]) -> None:
+    for archive in archives:
+        archive.close()
+    await form.close()
+
+@parse_router.get("/resume/cache/stats")
+async def get_parse_cache_stats():
+    """Get parse cache hit/miss counters"""
+    return {
+        "success": True,
+        "stats": parse_cache.stats()
+    }
+
+@parse_router.get("/llm/stats")
+async def get_llm_stats():
+    """Get LLM client concurrency and retry counters"""
+    return {
+        "success": True,
+        "stats": llm_client.stats()
+    }
+
+@read_router.get("/templates")
 async def get_templates():
     """Get all available portfolio templates"""
     return {
@@ -340,12 +773,12 @@ async def get_templates():
         "templates": TEMPLATES
     }
 
-@api_router.post("/portfolio/deploy")
+@read_router.post("/portfolio/deploy")
 async def deploy_portfolio(portfolio_data: PortfolioCreate):
     """Deploy portfolio and generate unique URL"""
     try:
-        # Generate unique route slug
-        route_slug = generate_route_slug(portfolio_data.username)
+        # Generate a route slug no other portfolio uses
+        route_slug = (await allocate_route_slugs([portfolio_data.username]))[0]
         
         # Create portfolio object
         portfolio = Portfolio(
@@ -355,47 +788,353 @@ async def deploy_portfolio(portfolio_data: PortfolioCreate):
             route_slug=route_slug
         )
         
-        # Save to database
-        result = await db.portfolios.insert_one(portfolio.dict())
+        # Save to database; an identical parsed resume deployed before is reused
+        with stage_timer("db_upsert", "parsed_resumes"):
+            resume_id = await resume_store.save(portfolio.parsed_resume.dict())
+        edit_token, edit_token_hash = new_edit_token()
+        # Same path as batch deploys, so a slug taken by a concurrent deploy is re-allocated instead of failing
+        errors = await insert_portfolios([portfolio], [resume_id], [edit_token_hash])
+        if errors:
+            raise HTTPException(status_code=500, detail=f"Failed to save portfolio: {errors[0]}")
+        route_slug = portfolio.route_slug
+        portfolio_cache.invalidate(route_slug)
         
-        if result.inserted_id:
-            return {
-                "success": True,
-                "portfolio_url": f"/portfolio/{route_slug}",
-                "message": "Portfolio deployed successfully!"
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save portfolio")
+        # A missing snapshot is rendered on first view, so don't fail the deploy over it
+        try:
+            await snapshot_store.save(portfolio.dict())
+        except Exception as e:
+            logging.error("Error rendering snapshot for %s: %s", route_slug, e)
+        
+        return {
+            "success": True,
+            "portfolio_url": f"/portfolio/{route_slug}",
+            # The link to share when set: pre-rendered HTML that the SPA takes over once loaded
+            "snapshot_url": snapshot_url(route_slug),
+            # Needed to update the portfolio later; only its hash is stored
+            "edit_token": edit_token,
+            "message": "Portfolio deployed successfully!"
+        }
             
     except Exception as e:
-        logging.error(f"Error deploying portfolio: {e}")
+        logging.error("Error deploying portfolio: %s", e)
         raise HTTPException(status_code=500, detail=f"Error deploying portfolio: {str(e)}")
 
-@api_router.get("/portfolio/{route_slug}")
-async def get_portfolio(route_slug: str):
-    """Get portfolio data by route slug"""
+@read_router.post("/portfolio/deploy/batch")
+async def deploy_portfolio_batch(batch: PortfolioBatchCreate):
+    """Deploy many portfolios in one bulk write, reporting a result per item"""
+    if not batch.portfolios:
+        raise HTTPException(status_code=400, detail="No portfolios provided")
+    if len(batch.portfolios) > DEPLOY_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch contains more than {DEPLOY_BATCH_MAX_ITEMS} portfolios")
+    
+    results: List[Dict[str, Any]] = [{} for _ in batch.portfolios]
+    valid: List[Tuple[int, PortfolioCreate]] = []
+    for index, item in enumerate(batch.portfolios):
+        try:
+            valid.append((index, PortfolioCreate(**item)))
+        except ValidationError as e:
+            results[index] = {"index": index, "success": False, "status_code": 422, "error": e.errors(include_url=False, include_context=False)}
+    
+    try:
+        slugs = await allocate_route_slugs([data.username for _, data in valid])
+        portfolios = [
+            Portfolio(
+                username=data.username,
+                parsed_resume=data.parsed_resume,
+                selected_template=data.selected_template,
+                route_slug=slug
+            )
+            for (_, data), slug in zip(valid, slugs)
+        ]
+        with stage_timer("db_upsert", "parsed_resumes"):
+            resume_ids = await resume_store.save_many([portfolio.parsed_resume.dict() for portfolio in portfolios])
+        edit_tokens = [new_edit_token() for _ in portfolios]
+        errors = await insert_portfolios(portfolios, resume_ids, [token_hash for _, token_hash in edit_tokens])
+    except Exception as e:
+        logging.error("Error deploying portfolio batch: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error deploying portfolios: {str(e)}")
+    
+    deployed = []
+    for position, (index, _) in enumerate(valid):
+        portfolio = portfolios[position]
+        if position in errors:
+            results[index] = {"index": index, "success": False, "status_code": 500, "error": errors[position]}
+            continue
+        portfolio_cache.invalidate(portfolio.route_slug)
+        deployed.append(portfolio.dict())
+        results[index] = {
+            "index": index,
+            "success": True,
+            "status_code": 200,
+            "route_slug": portfolio.route_slug,
+            "portfolio_url": f"/portfolio/{portfolio.route_slug}",
+            "snapshot_url": snapshot_url(portfolio.route_slug),
+            "edit_token": edit_tokens[position][0],
+        }
+    
+    # As with single deploys, missing snapshots are rendered on first view
     try:
-        portfolio = await db.portfolios.find_one({"route_slug": route_slug})
+        await snapshot_store.save_many(deployed)
+    except Exception as e:
+        logging.error("Error rendering snapshots for portfolio batch: %s", e)
+    
+    return {
+        "success": len(deployed) == len(results),
+        "deployed": len(deployed),
+        "failed": len(results) - len(deployed),
+        "results": results,
+    }
+
+def version_filter(version: int) -> Dict[str, Any]:
+    """Match a portfolio at ``version``; those deployed before versioning count as version 1"""
+    if version == 1:
+        return {"$or": [{"version": 1}, {"version": {"$exists": False}}]}
+    return {"version": version}
+
+@read_router.patch("/portfolio/{route_slug}")
+async def update_portfolio(route_slug: str, update: PortfolioUpdate, request: Request):
+    """Update a deployed portfolio in place, keeping its URL; 409 if it changed since ``version`` was read.
+
+    Requires the edit token returned at deploy as ``Authorization: Bearer <token>``.
+    """
+    unknown = set(update.parsed_resume or {}) - PARSED_RESUME_FIELDS
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown resume fields: {', '.join(sorted(unknown))}")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Edit token required", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        owner = await db.portfolios.find_one({"route_slug": route_slug}, {"_id": 0, "edit_token_hash": 1})
+        # The projection leaves an empty document for portfolios without a hash
+        if owner is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        # Portfolios deployed before edit tokens existed have no hash and can't be edited
+        if not hmac.compare_digest(owner.get("edit_token_hash") or "", hash_edit_token(token.strip())):
+            raise HTTPException(status_code=403, detail="Invalid edit token")
         
+        portfolio = await portfolio_cache.fetch(route_slug, primary=True)
         if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
+        current_version = portfolio.get("version", 1)
+        if current_version != update.version:
+            raise HTTPException(status_code=409, detail=f"Portfolio was updated; current version is {current_version}")
         
-        # Remove MongoDB _id field
-        portfolio.pop('_id', None)
+        changes: Dict[str, Any] = {}
+        unset: Dict[str, Any] = {}
+        if update.selected_template is not None and update.selected_template != portfolio.get("selected_template"):
+            changes["selected_template"] = update.selected_template
+        if update.parsed_resume:
+            try:
+                resume = ParsedResumeData(**{**portfolio.get("parsed_resume", {}), **update.parsed_resume}).dict()
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+            if resume != portfolio.get("parsed_resume"):
+                # Edited resumes are stored like new ones; the previous one may still back other portfolios
+                with stage_timer("db_upsert", "parsed_resumes"):
+                    changes["resume_id"] = await resume_store.save(resume)
+                changes.update(search_fields(portfolio["username"], resume))
+                unset["parsed_resume"] = ""
+                portfolio["parsed_resume"] = resume
+        if not changes:
+            return {"success": True, "route_slug": route_slug, "version": current_version, "updated": False}
         
-        return {
-            "success": True,
-            "portfolio": portfolio
+        updated_at = datetime.utcnow()
+        operations: Dict[str, Any] = {"$set": {**changes, "version": current_version + 1, "updated_at": updated_at}}
+        if unset:
+            operations["$unset"] = unset
+        with stage_timer("db_update", "portfolios"):
+            result = await db.portfolios.update_one({"route_slug": route_slug, **version_filter(current_version)}, operations)
+        if result.matched_count == 0:
+            raise HTTPException(status_code=409, detail="Portfolio was updated concurrently; reload and retry")
+        
+        # Only this slug's cached response and snapshot change; other portfolios sharing the resume are untouched
+        portfolio_cache.invalidate(route_slug)
+        portfolio.update(
+            {field: value for field, value in changes.items() if field not in ("resume_id", "summary", "search")},
+            version=current_version + 1,
+            updated_at=updated_at,
+        )
+        try:
+            await snapshot_store.save(portfolio)
+        except Exception as e:
+            logging.error("Error re-rendering snapshot for %s: %s", route_slug, e)
+            # Without a snapshot it is rendered on first view; a stale one would outlive the edit
+            await snapshot_store.delete(route_slug)
+        
+        return {"success": True, "route_slug": route_slug, "version": current_version + 1, "updated": True}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error("Error updating portfolio: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error updating portfolio: {str(e)}")
+
+@read_router.get("/portfolio/{route_slug}")
+async def get_portfolio(route_slug: str, request: Request):
+    """Get portfolio data by route slug, answering conditional requests with 304"""
+    try:
+        cached = await portfolio_cache.get(route_slug)
+        
+        if not cached:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        headers = {
+            "ETag": cached.etag,
+            "Last-Modified": cached.last_modified_header,
+            "Cache-Control": f"public, max-age={PORTFOLIO_CACHE_MAX_AGE}",
         }
+        if cached.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=cached.body, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching portfolio: {e}")
+        logging.error("Error fetching portfolio: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching portfolio: {str(e)}")
 
-# Include the router in the main app
+@read_router.get("/portfolios/search")
+async def search_portfolios(
+    skill: List[str] = Query(default=[]),
+    title: Optional[str] = None,
+    location: Optional[str] = None,
+    username: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+):
+    """Search portfolios by skills, job title, location, username prefix or free text, newest first"""
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    try:
+        query = portfolio_search.build_query(skills=skill, title=title, location=location, username=username, text=q)
+        results, next_cursor = await portfolio_search.search(query, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error("Error searching portfolios: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error searching portfolios: {str(e)}")
+    return {"success": True, "results": results, "next_cursor": next_cursor}
+
+@read_router.get("/portfolio/{route_slug}/snapshot")
+async def get_portfolio_snapshot(route_slug: str, request: Request):
+    """Get the pre-rendered HTML snapshot of a portfolio"""
+    try:
+        snapshot = await snapshot_store.get(route_slug)
+        
+        if not snapshot:
+            portfolio = await portfolio_cache.fetch(route_slug)
+            if not portfolio:
+                raise HTTPException(status_code=404, detail="Portfolio not found")
+            snapshot = await snapshot_store.save(portfolio)
+        
+        headers = {
+            "ETag": snapshot["etag"],
+            # Revalidated with the ETag (a cheap 304) so an edit shows up on the next view
+            "Cache-Control": f"public, max-age={SNAPSHOT_CACHE_MAX_AGE}" if SNAPSHOT_CACHE_MAX_AGE > 0 else "public, no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and snapshot["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        
+        # Snapshots are stored gzipped; only decompress for clients that can't take gzip
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=snapshot["html_gz"], media_type="text/html; charset=utf-8", headers=headers)
+        return Response(content=gzip.decompress(snapshot["html_gz"]), media_type="text/html; charset=utf-8", headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error("Error fetching portfolio snapshot: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error fetching portfolio snapshot: {str(e)}")
+
+# Counters the caches, pools and LLM client already keep are read when /metrics is scraped
+CallbackMetric("cache_requests_total", "Cache lookups by cache and result", "counter", ["cache", "result"], lambda: {
+    ("parse", "memory_hit"): parse_cache.memory.hits,
+    ("parse", "db_hit"): parse_cache.db_hits,
+    ("parse", "miss"): parse_cache.stats()["misses"],
+    ("portfolio", "hit"): portfolio_cache.memory.hits,
+    ("portfolio", "miss"): portfolio_cache.memory.misses,
+    ("snapshot", "hit"): snapshot_store.memory.hits,
+    ("snapshot", "miss"): snapshot_store.memory.misses,
+})
+CallbackMetric("cache_evictions_total", "Entries evicted from the in-process caches", "counter", ["cache"], lambda: {
+    ("parse",): parse_cache.memory.evictions,
+    ("portfolio",): portfolio_cache.memory.evictions,
+    ("snapshot",): snapshot_store.memory.evictions,
+})
+CallbackMetric("extraction_pool_in_flight", "Extraction tasks running or queued on the worker pool", "gauge", [], lambda: {
+    (): extraction_pool.in_flight,
+})
+CallbackMetric("llm_in_flight", "LLM calls currently holding a concurrency slot", "gauge", [], lambda: {
+    (): llm_client.in_flight,
+})
+CallbackMetric("llm_calls_total", "LLM provider calls by outcome", "counter", ["outcome"], lambda: {
+    ("attempt",): llm_client.calls,
+    ("retry",): llm_client.retries,
+    ("failure",): llm_client.failures,
+})
+CallbackMetric("resume_jobs_active", "Async parse jobs being processed by this process's workers", "gauge", [], lambda: {
+    (): job_workers.active,
+})
+
+def collect_mongo_pool(field: str) -> Dict[Tuple[str, ...], float]:
+    return {(address,): pool[field] for address, pool in mongo_pool_monitor.stats()["servers"].items()}
+
+CallbackMetric("mongo_pool_connections", "MongoDB pool connections per server: open, and checked out by a request", "gauge", ["address", "state"], lambda: {
+    (address, state): pool[state]
+    for address, pool in mongo_pool_monitor.stats()["servers"].items()
+    for state in ("open", "checked_out")
+})
+CallbackMetric("mongo_pool_saturation", "Share of maxPoolSize checked out per server", "gauge", ["address"], partial(collect_mongo_pool, "saturation"))
+CallbackMetric("mongo_pool_checkouts_total", "Connection checkouts per server", "counter", ["address"], partial(collect_mongo_pool, "checkouts"))
+CallbackMetric("mongo_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled connection", "counter", ["address"], partial(collect_mongo_pool, "wait_seconds"))
+CallbackMetric("mongo_pool_checkout_timeouts_total", "Checkouts that gave up waiting (waitQueueTimeoutMS)", "counter", ["address"], partial(collect_mongo_pool, "checkout_timeouts"))
+
+async def collect_pending_jobs() -> Dict[Tuple[str, ...], float]:
+    try:
+        return {(status,): count for status, count in (await job_queue.count_pending()).items()}
+    except Exception as e:
+        logging.error("Error counting resume jobs for metrics: %s", e)
+        return {}
+
+# Only parse nodes report queue depth, so a fleet of read replicas doesn't poll MongoDB on every scrape
+if SERVES_PARSE:
+    CallbackMetric("resume_jobs", "Async parse jobs in the queue by status", "gauge", ["status"], collect_pending_jobs)
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and serving; deliberately doesn't touch MongoDB"""
+    return {"status": "ok", "role": SERVER_ROLE}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: MongoDB answers a ping, with connection pool saturation for sizing"""
+    ready, details = await mongo_readiness.check()
+    return ORJSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "role": SERVER_ROLE, **details},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of the process metrics"""
+    return Response(content=await metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+# Include the routers for this process's role in the main app
 app.include_router(api_router)
+if SERVES_API:
+    app.include_router(read_router)
+if SERVES_PARSE:
+    app.include_router(parse_router)
+
+app.add_middleware(UploadSizeLimitMiddleware, limits=[
+    ("/api/resume/parse/batch", BATCH_MAX_UPLOAD_BYTES),
+    ("/api/resume", MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES),
+])
 
 app.add_middleware(
     CORSMiddleware,
@@ -405,13 +1144,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get('COMPRESSION_MIN_BYTES', '1024')))
+
+# Outside compression and the other middleware, so request latency includes them
+app.add_middleware(MetricsMiddleware, exclude=("/metrics", "/healthz", "/readyz"))
+
+# Around the metrics middleware so its request id and stage timings cover the whole request
+app.add_middleware(
+    RequestLogMiddleware,
+    exclude=("/metrics", "/healthz", "/readyz"),
+    sample_rate=float(os.environ.get('LOG_ACCESS_SAMPLE_RATE', '0.1')),
+    slow_seconds=float(os.environ.get('LOG_SLOW_REQUEST_SECONDS', '1.0')),
 )
+
+# Configure logging: JSON lines written by a background thread (LOG_FORMAT=text for the old format)
+log_config = configure_logging()
 logger = logging.getLogger(__name__)
 
+CallbackMetric("log_records_dropped_total", "Log records dropped because the log queue was full", "counter", [], lambda: {
+    (): log_config.handler.dropped,
+})
+
+@app.on_event("startup")
+async def start_logging():
+    # Started at import too; this restarts the writer if the app is started again after shutdown
+    log_config.start()
+
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await parse_cache.ensure_indexes()
+        await job_queue.ensure_indexes()
+        await portfolio_cache.ensure_indexes()
+        await snapshot_store.ensure_indexes()
+        await portfolio_search.ensure_indexes()
+    except Exception as e:
+        logging.error("Error creating indexes: %s", e)
+
+@app.on_event("startup")
+async def backfill_search_fields():
+    if not SEARCH_BACKFILL_ON_STARTUP:
+        return
+    try:
+        updated = await portfolio_search.backfill(resume_store)
+        if updated:
+            logger.info("Backfilled search fields on %d portfolios", updated, extra={"portfolios": updated})
+    except Exception as e:
+        logging.error("Error backfilling search fields: %s", e)
+
+@app.on_event("startup")
+async def warm_up_mongo_pool():
+    await mongo_readiness.warm_up(MONGO_WARMUP_CONNECTIONS)
+
+@app.on_event("startup")
+async def start_job_workers():
+    if SERVES_PARSE and RESUME_JOB_WORKERS > 0:
+        job_workers.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def shutdown_job_workers():
+    await job_workers.stop()
+
+@app.on_event("shutdown")
+async def shutdown_extraction_pool():
+    extraction_pool.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_llm_client():
+    await llm_client.close()
+
+@app.on_event("shutdown")
+async def shutdown_logging():
+    log_config.stop()
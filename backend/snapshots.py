@@ -0,0 +1,265 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from html import escape
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from pymongo import UpdateOne
+from starlette.concurrency import run_in_threadpool
+
+from cache import TTLCache
+
+# Colours per template so the first paint already looks like the chosen design
+TEMPLATE_THEMES = {
+    "solarverse": {"bg": "#05060f", "card": "#11142a", "text": "#e8eaff", "muted": "#9aa3d6", "accent": "#f7b733"},
+    "neongrid": {"bg": "#0b0217", "card": "#1a0b2e", "text": "#f5e9ff", "muted": "#b79be0", "accent": "#ff2bd6"},
+    "proclassic": {"bg": "#f9fafb", "card": "#ffffff", "text": "#111827", "muted": "#4b5563", "accent": "#2563eb"},
+    "infinityflow": {"bg": "#0f172a", "card": "#1e293b", "text": "#f8fafc", "muted": "#94a3b8", "accent": "#38bdf8"},
+}
+DEFAULT_THEME = TEMPLATE_THEMES["proclassic"]
+
+BASE_CSS = (
+    "*{box-sizing:border-box}"
+    "body{margin:0;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;"
+    "background:var(--bg);color:var(--text);line-height:1.5}"
+    "main{max-width:56rem;margin:0 auto;padding:3rem 1rem}"
+    "section{background:var(--card);border-radius:.5rem;padding:2rem;margin-bottom:2rem}"
+    "header{text-align:center}h1{font-size:2.25rem;margin:0 0 .5rem}h2{margin:0 0 1rem}"
+    "h3{margin:0}.muted{color:var(--muted)}a{color:var(--accent)}"
+    ".skills{display:flex;flex-wrap:wrap;gap:.75rem;padding:0;list-style:none}"
+    ".skills li{border:1px solid var(--accent);border-radius:9999px;padding:.25rem 1rem}"
+    ".item{border-left:4px solid var(--accent);padding-left:1.5rem;margin-bottom:1.5rem}"
+    ".socials{display:flex;justify-content:center;gap:1rem;padding:0;list-style:none}"
+)
+
+
+def _text(value: Any) -> str:
+    return escape(str(value or ""))
+
+
+SAFE_LINK_SCHEMES = ("http", "https", "mailto")
+
+
+def _safe_link(url: Any) -> Optional[str]:
+    """``url`` if it is safe as an href: http(s) or mailto, scheme-less links taken as https; else None"""
+    text = str(url or "").strip()
+    # Browsers ignore tabs, newlines and control characters inside the scheme ("java\tscript:")
+    cleaned = "".join(char for char in text if ord(char) > 0x20 and char != "\x7f")
+    if not cleaned:
+        return None
+    try:
+        scheme = urlsplit(cleaned).scheme.lower()
+    except ValueError:
+        return None
+    if not scheme:
+        return text if cleaned.startswith("//") else f"https://{text}"
+    return text if scheme in SAFE_LINK_SCHEMES else None
+
+
+def _items(entries: List[Dict[str, Any]], fields: List[str]) -> str:
+    parts = []
+    for entry in entries:
+        title, *rest = fields
+        parts.append(f'<div class="item"><h3>{_text(entry.get(title))}</h3>')
+        for name in rest:
+            if entry.get(name):
+                parts.append(f'<p class="muted">{_text(entry.get(name))}</p>')
+        parts.append("</div>")
+    return "".join(parts)
+
+
+# (manifest path, mtime, size) -> asset tags, re-read whenever the frontend build is replaced
+_asset_tags: Tuple[Optional[tuple], str] = (None, "")
+
+
+def _read_asset_tags(manifest_path: str) -> str:
+    try:
+        with open(manifest_path) as f:
+            entrypoints = json.load(f).get("entrypoints", [])
+    except Exception as e:
+        logging.error("Could not read frontend asset manifest %s: %s", manifest_path, e)
+        return ""
+
+    public_url = os.environ.get('FRONTEND_PUBLIC_URL', '').rstrip('/')
+    tags = []
+    for entry in entrypoints:
+        url = escape(f"{public_url}/{entry}")
+        if entry.endswith(".css"):
+            tags.append(f'<link rel="stylesheet" href="{url}">')
+        elif entry.endswith(".js"):
+            tags.append(f'<script defer src="{url}"></script>')
+    return "".join(tags)
+
+
+def load_frontend_asset_tags() -> str:
+    """Script/style tags for the SPA bundle, read from the CRA build's asset-manifest.json.
+
+    Returns an empty string (a static-only snapshot) when FRONTEND_ASSET_MANIFEST is unset.
+    The manifest is re-read when the file changes, so a frontend redeploy is picked up
+    without restarting the backend.
+    """
+    global _asset_tags
+    manifest_path = os.environ.get('FRONTEND_ASSET_MANIFEST')
+    if not manifest_path:
+        return ""
+    try:
+        stat = os.stat(manifest_path)
+        key = (manifest_path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = (manifest_path, None, None)
+    if _asset_tags[0] != key:
+        _asset_tags = (key, _read_asset_tags(manifest_path))
+    return _asset_tags[1]
+
+
+def asset_tags_version(asset_tags: str) -> str:
+    return hashlib.blake2b(asset_tags.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def snapshot_url(route_slug: str) -> Optional[str]:
+    """The snapshot URL to share for a portfolio, or None when snapshots can't load the SPA.
+
+    Without the bundle tags a snapshot is a static page that never renders the
+    chosen template, so the client-side route is the better link.
+    """
+    return f"/api/portfolio/{route_slug}/snapshot" if load_frontend_asset_tags() else None
+
+
+def render_portfolio_html(portfolio: Dict[str, Any], asset_tags: str = "") -> str:
+    """Render a minified, self-contained HTML page for a deployed portfolio.
+
+    The portfolio JSON is embedded for the SPA to pick up instead of calling
+    the API; when the SPA bundle is included the URL is rewritten to the
+    client-side route so the router renders the portfolio view over it.
+    """
+    resume = portfolio.get("parsed_resume") or {}
+    theme = TEMPLATE_THEMES.get(portfolio.get("selected_template"), DEFAULT_THEME)
+    route_slug = portfolio.get("route_slug", "")
+    name = resume.get("name") or portfolio.get("username", "")
+    contact = " • ".join(_text(value) for value in (resume.get("email"), resume.get("phone")) if value)
+    description = ", ".join(resume.get("skills", [])[:10])
+
+    body = [f"<header><h1>{_text(name)}</h1>"]
+    if contact:
+        body.append(f'<p class="muted">{contact}</p>')
+    if resume.get("location"):
+        body.append(f'<p class="muted">{_text(resume["location"])}</p>')
+    # Links come from resume text, so anything but http(s)/mailto (e.g. javascript:) is dropped
+    socials = [
+        (platform, link) for platform, link in
+        ((platform, _safe_link(url)) for platform, url in (resume.get("socials") or {}).items())
+        if link
+    ]
+    if socials:
+        body.append('<ul class="socials">')
+        body.extend(
+            f'<li><a href="{_text(url)}" rel="noopener noreferrer">{_text(platform.capitalize())}</a></li>'
+            for platform, url in socials
+        )
+        body.append("</ul>")
+    body.append("</header>")
+
+    if resume.get("skills"):
+        body.append('<section><h2>Skills</h2><ul class="skills">')
+        body.extend(f"<li>{_text(skill)}</li>" for skill in resume["skills"])
+        body.append("</ul></section>")
+    if resume.get("experience"):
+        body.append(f'<section><h2>Experience</h2>{_items(resume["experience"], ["title", "company", "duration", "description"])}</section>')
+    if resume.get("projects"):
+        body.append(f'<section><h2>Projects</h2>{_items(resume["projects"], ["name", "description", "technologies", "link"])}</section>')
+    if resume.get("education"):
+        body.append(f'<section><h2>Education</h2>{_items(resume["education"], ["degree", "institution", "year", "details"])}</section>')
+
+    # "</" is escaped so resume text can never close the script element
+    data = orjson.dumps(portfolio, default=str).decode("utf-8").replace("</", "<\\/")
+    theme_css = ":root{" + "".join(f"--{key}:{value};" for key, value in theme.items()) + "}"
+    route_script = ""
+    if asset_tags:
+        route_script = f'<script>history.replaceState(null,"","/portfolio/{escape(route_slug)}")</script>'
+
+    return (
+        '<!doctype html><html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width,initial-scale=1">'
+        f"<title>{_text(name)} | Portfolio</title>"
+        f'<meta name="description" content="{_text(description)}">'
+        f'<meta property="og:title" content="{_text(name)}">'
+        f"<style>{theme_css}{BASE_CSS}</style>{asset_tags}</head>"
+        f'<body><div id="root"><main>{"".join(body)}</main></div>'
+        f'<script id="__PORTFOLIO__" type="application/json">{data}</script>'
+        f"{route_script}</body></html>"
+    )
+
+
+class SnapshotStore:
+    """Gzip-compressed HTML snapshots of deployed portfolios in ``portfolio_snapshots``.
+
+    Snapshots are written at deploy time and rendered on first read for
+    portfolios deployed before snapshots existed. Each records the version of
+    the SPA bundle tags baked into it; after a frontend redeploy ``get``
+    treats older snapshots as missing, so they are re-rendered on their next
+    read instead of pointing at bundles that no longer exist. Hot snapshots
+    are also kept compressed in an in-process TTL cache.
+    """
+
+    def __init__(self, collection, memory: TTLCache):
+        self.collection = collection
+        self.memory = memory
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("route_slug", unique=True)
+
+    @staticmethod
+    def render(portfolio: Dict[str, Any]) -> Dict[str, Any]:
+        asset_tags = load_frontend_asset_tags()
+        html = render_portfolio_html(portfolio, asset_tags).encode("utf-8")
+        return {
+            "route_slug": portfolio["route_slug"],
+            "template": portfolio.get("selected_template"),
+            "assets_version": asset_tags_version(asset_tags),
+            "html_gz": gzip.compress(html, compresslevel=9),
+            "etag": f'"{hashlib.blake2b(html, digest_size=16).hexdigest()}"',
+            "rendered_at": datetime.utcnow(),
+        }
+
+    async def save(self, portfolio: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = self.render(portfolio)
+        await self.collection.update_one({"route_slug": snapshot["route_slug"]}, {"$set": snapshot}, upsert=True)
+        self.memory.set(snapshot["route_slug"], snapshot, size=len(snapshot["html_gz"]))
+        return snapshot
+
+    async def save_many(self, portfolios: List[Dict[str, Any]]) -> None:
+        """Render off the event loop and upsert every snapshot in one unordered bulk write"""
+        if not portfolios:
+            return
+        snapshots = await run_in_threadpool(lambda: [self.render(portfolio) for portfolio in portfolios])
+        await self.collection.bulk_write(
+            [UpdateOne({"route_slug": s["route_slug"]}, {"$set": s}, upsert=True) for s in snapshots],
+            ordered=False,
+        )
+        # Not cached in memory: a bulk deploy would otherwise evict the snapshots actually being read
+
+    async def get(self, route_slug: str) -> Optional[Dict[str, Any]]:
+        """The stored snapshot, or None if there is none or it was rendered for another frontend build"""
+        snapshot = self.memory.get(route_slug)
+        if snapshot is None:
+            snapshot = await self.collection.find_one({"route_slug": route_slug}, {"_id": 0})
+            if snapshot:
+                self.memory.set(route_slug, snapshot, size=len(snapshot["html_gz"]))
+        if snapshot and snapshot.get("assets_version") != asset_tags_version(load_frontend_asset_tags()):
+            return None
+        return snapshot
+
+    def invalidate(self, route_slug: str) -> None:
+        self.memory.pop(route_slug)
+
+    async def delete(self, route_slug: str) -> None:
+        self.invalidate(route_slug)
+        try:
+            await self.collection.delete_one({"route_slug": route_slug})
+        except Exception as e:
+            logging.error("Error deleting snapshot for %s: %s", route_slug, e)
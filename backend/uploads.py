@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+# Multipart framing (boundaries, part headers) on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+SNIFF_BYTES = 1024
+
+
+class UploadTooLargeError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request body too large")
+
+
+@dataclass
+class IngestedUpload:
+    content: bytes
+    kind: str
+    sha256: str
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def sniff_file_kind(head: bytes) -> Optional[str]:
+    """Identify an upload from its leading bytes: "pdf", "docx", "text" or None"""
+    # The PDF spec lets the header appear anywhere in the first 1024 bytes
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    # Plain text is accepted so text content can be uploaded for testing; it never reaches the parsers
+    if head and b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+            return "text"
+        except UnicodeDecodeError as e:
+            # A multi-byte character may be cut off at the end of the sniff window
+            if e.start >= len(head) - 3:
+                return "text"
+    return None
+
+
+async def read_upload(file: UploadFile, max_bytes: int, chunk_size: int = 64 * 1024) -> IngestedUpload:
+    """Stream an upload in chunks, sniffing its type up front and enforcing max_bytes.
+
+    The body is hashed while it streams, and reading stops as soon as the cap
+    is crossed, so an oversized or wrongly typed file is never fully buffered.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    total = 0
+    kind = None
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if kind is None:
+            kind = sniff_file_kind(chunk[:SNIFF_BYTES])
+            if kind is None:
+                raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {max_bytes} bytes")
+        digest.update(chunk)
+        chunks.append(chunk)
+
+    if total == 0:
+        raise HTTPException(status_code=400, detail="File is empty")
+    return IngestedUpload(content=b"".join(chunks), kind=kind, sha256=digest.hexdigest())
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies over the configured size on upload paths before they are spooled.
+
+    Requests that declare a larger Content-Length are refused without reading
+    the body; chunked bodies are counted as they arrive and cut off at the cap.
+    """
+
+    def __init__(self, app, limits: List[Tuple[str, int]]):
+        self.app = app
+        # (path prefix, max body bytes); the first matching prefix wins
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = None
+        if scope["type"] == "http":
+            max_bytes = next((limit for prefix, limit in self.limits if scope["path"].startswith(prefix)), None)
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > max_bytes:
+                await self._reject(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise UploadTooLargeError()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLargeError:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": "Request body too large"},
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+def ingest_bytes(content: bytes, max_bytes: int) -> IngestedUpload:
+    """Apply the same size, emptiness and type checks as read_upload to bytes already in memory"""
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {max_bytes} bytes")
+    if not content:
+        raise HTTPException(status_code=400, detail="File is empty")
+    kind = sniff_file_kind(content[:SNIFF_BYTES])
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    return IngestedUpload(content=content, kind=kind, sha256=hashlib.sha256(content).hexdigest())
+
+
+class ZipArchive:
+    """Lazily readable members of an uploaded zip of resumes.
+
+    Only the central directory is read up front; member bodies are read one
+    at a time on demand, with declared and actual sizes both checked against
+    ``max_bytes`` so a zip bomb cannot inflate past the per-file cap.
+    """
+
+    def __init__(self, fileobj, max_members: int):
+        try:
+            self._zip = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Invalid zip archive")
+        self._lock = threading.Lock()
+        self.members = [
+            info for info in self._zip.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not PurePosixPath(info.filename).name.startswith(".")
+        ]
+        if len(self.members) > max_members:
+            raise HTTPException(status_code=413, detail=f"Zip archive contains more than {max_members} files")
+
+    def read_member(self, info: zipfile.ZipInfo, max_bytes: int) -> IngestedUpload:
+        if info.file_size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {max_bytes} bytes")
+        with self._lock:
+            with self._zip.open(info) as member:
+                content = member.read(max_bytes + 1)
+        return ingest_bytes(content, max_bytes)
+
+    def close(self) -> None:
+        self._zip.close()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class PoolTimeoutError(Exception):
+    """Raised when a job does not finish within the per-job timeout"""
+
+
+class ExtractionPool:
+    """Bounded executor that keeps CPU-heavy text extraction off the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may
+    wait for a free worker. Anything beyond that is rejected immediately with
+    ``PoolSaturatedError`` so callers can shed load instead of piling up.
+    A job that times out keeps its slot until the worker really finishes, so
+    runaway documents still count against capacity.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: float = 30.0,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = self.max_workers * 4 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn keeps children free of the parent's event loop and Mongo client threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="extraction",
+                    initializer=self.initializer,
+                )
+        return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool, enforcing backpressure and the job timeout"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise PoolSaturatedError(
+                    f"Extraction pool saturated ({self._in_flight}/{self.capacity} jobs)"
+                )
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            logging.error("Extraction job %s timed out after %ss", getattr(fn, '__name__', fn), self.timeout)
+            raise PoolTimeoutError(f"Extraction did not finish within {self.timeout} seconds")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def create_extraction_pool(initializer: Optional[Callable[[], None]] = None) -> ExtractionPool:
+    """Build the extraction pool from environment configuration"""
+    max_workers = os.environ.get('EXTRACTION_WORKERS')
+    max_queue = os.environ.get('EXTRACTION_QUEUE_SIZE')
+    return ExtractionPool(
+        kind=os.environ.get('EXTRACTION_EXECUTOR', 'process'),
+        max_workers=int(max_workers) if max_workers else None,
+        max_queue=int(max_queue) if max_queue else None,
+        timeout=float(os.environ.get('EXTRACTION_TIMEOUT_SECONDS', '30')),
+        initializer=initializer,
+    )
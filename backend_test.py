@@ -13,10 +13,10 @@ class PortfolioAPITester:
         self.tests_run = 0
         self.tests_passed = 0
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, files=None):
+    def run_test(self, name, method, endpoint, expected_status, data=None, files=None, headers=None):
         """Run a single API test"""
         url = f"{self.api_url}/{endpoint}" if endpoint else self.api_url
-        headers = {}
+        headers = dict(headers or {})
         if data and not files:
             headers['Content-Type'] = 'application/json'
 
@@ -32,6 +32,8 @@ class PortfolioAPITester:
                     response = requests.post(url, data=data, files=files, timeout=30)
                 else:
                     response = requests.post(url, json=data, headers=headers, timeout=30)
+            elif method == 'PATCH':
+                response = requests.patch(url, json=data, headers=headers, timeout=30)
 
             success = response.status_code == expected_status
             if success:
@@ -57,6 +59,32 @@ class PortfolioAPITester:
         """Test root API endpoint"""
         return self.run_test("Root API Endpoint", "GET", "", 200)
 
+    def test_health_probes(self):
+        """Test liveness and readiness probes (served outside /api)"""
+        results = []
+        for name, path in (("Liveness Probe", "healthz"), ("Readiness Probe", "readyz")):
+            url = f"{self.base_url}/{path}"
+            self.tests_run += 1
+            print(f"\n🔍 Testing {name}...")
+            print(f"   URL: {url}")
+            try:
+                response = requests.get(url, timeout=30)
+                if response.status_code == 200:
+                    self.tests_passed += 1
+                    print(f"✅ Passed - Status: {response.status_code}")
+                    pool = response.json().get('pool')
+                    if pool:
+                        print(f"   Pool saturation: {pool.get('saturation')} of {pool.get('max_pool_size')} connections")
+                    results.append(True)
+                else:
+                    print(f"❌ Failed - Expected 200, got {response.status_code}")
+                    print(f"   Response: {response.text[:200]}...")
+                    results.append(False)
+            except Exception as e:
+                print(f"❌ Failed - Error: {str(e)}")
+                results.append(False)
+        return all(results)
+
     def test_get_templates(self):
         """Test getting portfolio templates"""
         success, response = self.run_test("Get Templates", "GET", "templates", 200)
@@ -134,6 +162,58 @@ E-commerce Platform
                 
         return success, response
 
+    def test_resume_parse_batch(self):
+        """Test batch resume parsing endpoint"""
+        files = [
+            ('files', ('resume_1.pdf', self.create_dummy_pdf(), 'application/pdf')),
+            ('files', ('resume_2.pdf', self.create_dummy_pdf(), 'application/pdf')),
+        ]
+        success, response = self.run_test("Parse Resume Batch", "POST", "resume/parse/batch", 200, files=files)
+        return success, response
+
+    def test_resume_parse_async(self):
+        """Test async resume parsing with job polling"""
+        files = {'file': ('test_resume.pdf', self.create_dummy_pdf(), 'application/pdf')}
+        success, response = self.run_test("Parse Resume Async", "POST", "resume/parse?mode=async", 202, files=files)
+        
+        if success and response.get('job_id'):
+            success, response = self.run_test("Get Resume Job", "GET", f"resume/jobs/{response['job_id']}?wait=25", 200)
+            if success:
+                print(f"   Job status: {response.get('job', {}).get('status', 'Not found')}")
+                
+        return success, response
+
+    def test_resume_parse_stream(self):
+        """Test streaming resume parsing over Server-Sent Events"""
+        url = f"{self.api_url}/resume/parse/stream"
+        files = {'file': ('test_resume.pdf', self.create_dummy_pdf(), 'application/pdf')}
+        self.tests_run += 1
+        print(f"\n🔍 Testing Parse Resume Stream...")
+        print(f"   URL: {url}")
+        
+        try:
+            events = []
+            with requests.post(url, files=files, stream=True, timeout=30) as response:
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith('event: '):
+                        event = line[len('event: '):]
+                    elif line.startswith('data: '):
+                        events.append((event, json.loads(line[len('data: '):])))
+            
+            fields = [data['field'] for event, data in events if event == 'field']
+            results = [data for event, data in events if event == 'result']
+            if response.status_code == 200 and results and results[-1].get('success'):
+                self.tests_passed += 1
+                print(f"✅ Passed - {len(fields)} field events before the result")
+                print(f"   Fields: {', '.join(dict.fromkeys(fields))}")
+                return True, results[-1]
+            print(f"❌ Failed - Status: {response.status_code}, events: {[event for event, _ in events]}")
+            return False, {}
+        except Exception as e:
+            print(f"❌ Failed - Error: {str(e)}")
+            return False, {}
+
     def test_invalid_file_upload(self):
         """Test uploading invalid file type"""
         dummy_content = b"This is not a valid PDF or DOCX file"
@@ -197,6 +277,28 @@ E-commerce Platform
                 
         return success, response, None
 
+    def test_portfolio_deploy_batch(self):
+        """Test bulk portfolio deployment with one invalid item"""
+        portfolios = [
+            {
+                "username": "cohort_student",
+                "selected_template": "proclassic",
+                "parsed_resume": {"name": f"Student {i}", "email": f"student{i}@email.com", "skills": ["Python"]}
+            }
+            for i in range(3)
+        ]
+        portfolios.append({"username": "missing_fields"})
+        
+        success, response = self.run_test("Deploy Portfolio Batch", "POST", "portfolio/deploy/batch", 200, data={"portfolios": portfolios})
+        
+        if success and response:
+            print(f"   Deployed: {response.get('deployed')}, failed: {response.get('failed')}")
+            slugs = [r.get('route_slug') for r in response.get('results', []) if r.get('success')]
+            if response.get('deployed') != 3 or response.get('failed') != 1 or len(set(slugs)) != 3:
+                print(f"   ⚠️  Expected 3 deployed portfolios with distinct slugs and 1 failure")
+                
+        return success, response
+
     def test_get_portfolio(self, route_slug):
         """Test getting portfolio by route slug"""
         if not route_slug:
@@ -216,6 +318,57 @@ E-commerce Platform
                 
         return success, response
 
+    def test_update_portfolio(self, route_slug, edit_token):
+        """Test in-place portfolio update, the edit token check and the stale-version conflict"""
+        if not route_slug or not edit_token:
+            print("❌ No route slug or edit token provided for portfolio update test")
+            return False, {}
+        
+        update = {"version": 1, "selected_template": "neongrid", "parsed_resume": {"location": "Remote"}}
+        auth = {"Authorization": f"Bearer {edit_token}"}
+        missing, _ = self.run_test("Update Portfolio Without Edit Token", "PATCH", f"portfolio/{route_slug}", 401, data=update)
+        wrong, _ = self.run_test("Update Portfolio With Wrong Edit Token", "PATCH", f"portfolio/{route_slug}", 403, data=update,
+                                 headers={"Authorization": "Bearer not-the-edit-token"})
+        
+        success, response = self.run_test("Update Portfolio", "PATCH", f"portfolio/{route_slug}", 200, data=update, headers=auth)
+        if success and response.get('version') != 2:
+            print(f"   ⚠️  Expected version 2, got {response.get('version')}")
+        
+        # Same version again is now stale
+        conflict, _ = self.run_test("Update Portfolio With Stale Version", "PATCH", f"portfolio/{route_slug}", 409, data=update, headers=auth)
+        return missing and wrong and success and conflict, response
+
+    def test_search_portfolios(self):
+        """Test portfolio search with cursor pagination"""
+        success, response = self.run_test("Search Portfolios", "GET", "portfolios/search?skill=python&limit=2", 200)
+        if success and response:
+            print(f"   Found {len(response.get('results', []))} portfolios on the first page")
+            cursor = response.get('next_cursor')
+            if cursor:
+                next_page, _ = self.run_test("Search Portfolios Next Page", "GET", f"portfolios/search?skill=python&limit=2&cursor={cursor}", 200)
+                success = success and next_page
+        
+        invalid, _ = self.run_test("Search Portfolios With Invalid Cursor", "GET", "portfolios/search?cursor=not-a-cursor", 400)
+        return success and invalid, response
+
+    def test_get_portfolio_snapshot(self, route_slug, snapshot_url=None):
+        """Test the pre-rendered snapshot; deploy only returns it as the link to share when the SPA bundle is configured"""
+        url = f"{self.base_url}{snapshot_url or f'/api/portfolio/{route_slug}/snapshot'}"
+        self.tests_run += 1
+        print(f"\n🔍 Testing Get Portfolio Snapshot...")
+        print(f"   URL: {url}")
+        try:
+            response = requests.get(url, timeout=30)
+            if response.status_code == 200 and response.headers.get('content-type', '').startswith('text/html') and 'John Doe' in response.text:
+                self.tests_passed += 1
+                print(f"✅ Passed - Status: {response.status_code}, {len(response.content)} bytes of HTML")
+                return True
+            print(f"❌ Failed - Status: {response.status_code}, Content-Type: {response.headers.get('content-type')}")
+            print(f"   Response: {response.text[:200]}...")
+        except Exception as e:
+            print(f"❌ Failed - Error: {str(e)}")
+        return False
+
     def test_nonexistent_portfolio(self):
         """Test getting non-existent portfolio"""
         fake_slug = "nonexistent_portfolio_12345"
@@ -231,22 +384,46 @@ def main():
     # Test 1: Root endpoint
     tester.test_root_endpoint()
     
+    # Test 1b: Health probes
+    tester.test_health_probes()
+    
     # Test 2: Get templates
     tester.test_get_templates()
     
     # Test 3: Resume parsing
     tester.test_resume_parse()
     
+    # Test 3b: Streaming resume parsing
+    tester.test_resume_parse_stream()
+    
     # Test 4: Invalid file upload
     tester.test_invalid_file_upload()
     
+    # Test 4b: Batch resume parsing
+    tester.test_resume_parse_batch()
+    
+    # Test 4c: Async resume parsing
+    tester.test_resume_parse_async()
+    
     # Test 5: Portfolio deployment
     success, response, portfolio_url = tester.test_portfolio_deploy()
     
+    # Test 5b: Bulk portfolio deployment
+    tester.test_portfolio_deploy_batch()
+    
     # Test 6: Get deployed portfolio
     if portfolio_url:
         route_slug = portfolio_url.split('/')[-1]  # Extract slug from URL
         tester.test_get_portfolio(route_slug)
+        
+        # Test 6a: The pre-rendered snapshot
+        tester.test_get_portfolio_snapshot(route_slug, response.get('snapshot_url'))
+        
+        # Test 6b: Update the deployed portfolio in place
+        tester.test_update_portfolio(route_slug, response.get('edit_token'))
+    
+    # Test 6c: Search deployed portfolios
+    tester.test_search_portfolios()
     
     # Test 7: Non-existent portfolio
     tester.test_nonexistent_portfolio()
@@ -12,6 +12,12 @@ import InfinityFlow from './templates/InfinityFlow';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Shared links open the pre-rendered snapshot when the backend serves one that loads the SPA bundle
+const shareUrl = (deployment) =>
+  deployment.snapshot_url
+    ? `${BACKEND_URL || window.location.origin}${deployment.snapshot_url}`
+    : `${window.location.origin}${deployment.portfolio_url}`;
+
 // Home Page Component
 const Home = () => {
   const [currentStep, setCurrentStep] = useState(1);
@@ -45,20 +51,60 @@ const Home = () => {
       const formData = new FormData();
       formData.append('file', file);
 
-      const response = await axios.post(`${API}/resume/parse`, formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
+      // Fields stream in as Server-Sent Events, so show them as soon as the first one arrives
+      const response = await fetch(`${API}/resume/parse/stream`, {
+        method: 'POST',
+        body: formData,
       });
+      if (!response.ok) {
+        throw new Error(`Upload failed with status ${response.status}`);
+      }
 
-      if (response.data.success) {
-        setParsedData(response.data.parsed_data);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let result = null;
+
+      const handleEvent = (rawEvent) => {
+        let event = 'message';
+        let data = '';
+        rawEvent.split('\n').forEach((line) => {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        if (!data) return;
+        const payload = JSON.parse(data);
+        if (event === 'field') {
+          setParsedData((previous) => ({ ...(previous || {}), [payload.field]: payload.value }));
+          setCurrentStep(2);
+        } else if (event === 'result') {
+          result = payload;
+        } else if (event === 'error') {
+          throw new Error(payload.detail);
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          handleEvent(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+        }
+      }
+
+      if (result && result.success) {
+        setParsedData(result.parsed_data);
         setCurrentStep(2);
       } else {
         alert('Failed to parse resume. Please try again.');
       }
     } catch (error) {
       console.error('Error parsing resume:', error);
+      setParsedData(null);
+      setCurrentStep(1);
       alert('Error parsing resume. Please check your file and try again.');
     } finally {
       setIsLoading(false);
@@ -177,7 +223,9 @@ const Home = () => {
 
           {currentStep === 2 && parsedData && (
             <div>
-              <h2 className="text-3xl font-bold text-gray-800 mb-8 text-center">Resume Parsed Successfully!</h2>
+              <h2 className="text-3xl font-bold text-gray-800 mb-8 text-center">
+                {isLoading ? 'Parsing Your Resume...' : 'Resume Parsed Successfully!'}
+              </h2>
               <div className="bg-white rounded-lg shadow-lg p-8 mb-8">
                 <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
                   <div>
@@ -206,9 +254,10 @@ const Home = () => {
               <div className="text-center">
                 <button
                   onClick={() => setCurrentStep(3)}
-                  className="bg-blue-600 text-white px-8 py-3 rounded-lg font-semibold hover:bg-blue-700 transition-colors"
+                  disabled={isLoading}
+                  className="bg-blue-600 text-white px-8 py-3 rounded-lg font-semibold hover:bg-blue-700 transition-colors disabled:opacity-50"
                 >
-                  Choose Template →
+                  {isLoading ? 'Parsing...' : 'Choose Template →'}
                 </button>
               </div>
             </div>
@@ -275,12 +324,20 @@ const Home = () => {
                 <p className="text-lg text-gray-700 mb-6">Your portfolio is now live at:</p>
                 <div className="bg-gray-100 rounded-lg p-4 mb-6">
                   <code className="text-lg font-mono text-blue-600">
-                    {window.location.origin}{deploymentResult.portfolio_url}
+                    {shareUrl(deploymentResult)}
                   </code>
                 </div>
+                {deploymentResult.edit_token && (
+                  <div className="bg-yellow-50 border border-yellow-200 rounded-lg p-4 mb-6 text-left">
+                    <p className="text-sm text-gray-700 mb-2">
+                      Save this edit token. It is shown only once and is needed to update your portfolio:
+                    </p>
+                    <code className="text-sm font-mono break-all text-gray-900">{deploymentResult.edit_token}</code>
+                  </div>
+                )}
                 <div className="flex justify-center space-x-4">
                   <a
-                    href={deploymentResult.portfolio_url}
+                    href={shareUrl(deploymentResult)}
                     target="_blank"
                     rel="noopener noreferrer"
                     className="bg-blue-600 text-white px-6 py-3 rounded-lg font-semibold hover:bg-blue-700 transition-colors"
@@ -303,13 +360,27 @@ const Home = () => {
   );
 };
 
+// Portfolio data embedded by the backend's pre-rendered snapshot, if this page is one
+const getSnapshotPortfolio = (slug) => {
+  const element = document.getElementById('__PORTFOLIO__');
+  if (!element) return null;
+  try {
+    const portfolio = JSON.parse(element.textContent);
+    return portfolio.route_slug === slug ? portfolio : null;
+  } catch (error) {
+    return null;
+  }
+};
+
 // Portfolio Viewer Component
 const PortfolioViewer = ({ slug }) => {
-  const [portfolio, setPortfolio] = useState(null);
-  const [isLoading, setIsLoading] = useState(true);
+  const [portfolio, setPortfolio] = useState(() => getSnapshotPortfolio(slug));
+  const [isLoading, setIsLoading] = useState(() => !getSnapshotPortfolio(slug));
   const [error, setError] = useState(null);
 
   useEffect(() => {
+    // Snapshot pages already carry the data, so skip the API round-trip
+    if (portfolio && portfolio.route_slug === slug) return;
     fetchPortfolio();
   }, [slug]);
 
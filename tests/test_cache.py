@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+
+import orjson
+from mongomock_motor import AsyncMongoMockClient
+
+from cache import CachedPortfolio, ParseCache, PortfolioCache, TTLCache
+
+
+def make_parse_cache(collection=None, version: str = "4:2:model") -> ParseCache:
+    collection = collection if collection is not None else AsyncMongoMockClient()["test"]["parse_cache"]
+    return ParseCache(collection, version=version, memory=TTLCache())
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_keeps_within_byte_budget():
+    cache = TTLCache(max_bytes=10)
+    cache.set("a", "x", size=6)
+    cache.set("b", "y", size=6)
+    assert cache.get("a") is None
+    assert cache.size_bytes == 6
+    # Too large to ever fit, so not cached at all
+    cache.set("c", "z", size=11)
+    assert cache.get("c") is None
+    assert cache.get("b") == "y"
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1, ttl=-1)
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_replaces_and_pops():
+    cache = TTLCache()
+    cache.set("a", 1, size=4)
+    cache.set("a", 2, size=5)
+    assert (cache.get("a"), cache.size_bytes) == (2, 5)
+    cache.pop("a")
+    cache.pop("missing")
+    assert (len(cache), cache.size_bytes) == (0, 0)
+
+
+def test_parse_cache_round_trip_through_mongo():
+    async def run():
+        collection = AsyncMongoMockClient()["test"]["parse_cache"]
+        writer = make_parse_cache(collection)
+        await writer.set("abc", "resume text", {"name": "Ada"})
+        # A fresh process has an empty memory tier and reads MongoDB
+        reader = make_parse_cache(collection)
+        first = await reader.get("abc")
+        second = await reader.get("abc")
+        return first, second, reader.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert first == second == {"resume_text": "resume text", "parsed_data": {"name": "Ada"}}
+    assert stats["db_hits"] == 1
+    assert stats["memory"]["hits"] == 1
+    assert stats["misses"] == 0
+
+
+def test_parse_cache_is_keyed_by_version():
+    async def run():
+        collection = AsyncMongoMockClient()["test"]["parse_cache"]
+        await make_parse_cache(collection, version="4:2:model").set("abc", "old text", None)
+        return await make_parse_cache(collection, version="5:2:model").get("abc")
+
+    assert asyncio.run(run()) is None
+
+
+def make_portfolio_cache():
+    from resume_store import ResumeStore
+
+    db = AsyncMongoMockClient()["test"]
+    return PortfolioCache(db["portfolios"], memory=TTLCache(), resumes=ResumeStore(db["parsed_resumes"]))
+
+
+def test_portfolio_cache_serves_hits_from_memory_until_invalidated():
+    async def run():
+        cache = make_portfolio_cache()
+        resume_id = await cache.resumes.save({"name": "Ada", "skills": ["Go"]})
+        await cache.collection.insert_one({
+            "route_slug": "ada_1", "username": "Ada", "resume_id": resume_id,
+            "edit_token_hash": "secret", "search": {"username": "ada"}, "created_at": datetime(2024, 5, 1),
+        })
+        first = await cache.get("ada_1")
+        await cache.collection.update_one({"route_slug": "ada_1"}, {"$set": {"username": "Ada L"}})
+        cached = await cache.get("ada_1")
+        cache.invalidate("ada_1")
+        return first, cached, await cache.get("ada_1"), await cache.get("missing")
+
+    first, cached, refreshed, missing = asyncio.run(run())
+    body = orjson.loads(first.body)["portfolio"]
+    assert body["parsed_resume"] == {"name": "Ada", "skills": ["Go"]}
+    assert not {"edit_token_hash", "search", "resume_id", "_id"} & set(body)
+    assert cached is first
+    assert orjson.loads(refreshed.body)["portfolio"]["username"] == "Ada L"
+    assert refreshed.etag != first.etag
+    assert missing is None
+
+
+def test_cached_portfolio_conditional_requests():
+    entry = CachedPortfolio(body=b"{}", etag='"abc"', last_modified=datetime(2024, 5, 1, 12, 0, 0, 500000))
+    assert entry.last_modified_header == "Wed, 01 May 2024 12:00:00 GMT"
+    assert entry.not_modified('"xyz", "abc"', None)
+    assert entry.not_modified('W/"abc"', None)
+    # If-None-Match wins over If-Modified-Since
+    assert not entry.not_modified('"xyz"', "Wed, 01 May 2024 12:00:00 GMT")
+    assert entry.not_modified(None, "Wed, 01 May 2024 12:00:00 GMT")
+    assert not entry.not_modified(None, "Tue, 30 Apr 2024 12:00:00 GMT")
+    assert not entry.not_modified(None, "not a date")
@@ -0,0 +1,50 @@
+import io
+
+import docx
+from docx.enum.text import WD_TAB_ALIGNMENT
+from docx.shared import Inches
+
+from extraction import extract_docx, extract_docx_streaming, extract_docx_with_python_docx
+
+
+def make_document(build) -> bytes:
+    document = docx.Document()
+    build(document)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_tab_stop_definitions_are_not_text():
+    def build(document):
+        paragraph = document.add_paragraph()
+        paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(5), WD_TAB_ALIGNMENT.RIGHT)
+        paragraph.add_run("Engineer\t2020 - 2022")
+
+    content = make_document(build)
+    assert extract_docx_streaming(content) == "Engineer\t2020 - 2022\n"
+    assert extract_docx_streaming(content) == extract_docx_with_python_docx(content)
+
+
+def test_breaks_inside_runs_become_newlines():
+    def build(document):
+        run = document.add_paragraph().add_run("Line one")
+        run.add_break()
+        run.add_text("Line two")
+
+    assert extract_docx_streaming(make_document(build)) == "Line one\nLine two\n"
+
+
+def test_vertically_merged_cells_are_read_once():
+    def build(document):
+        table = document.add_table(rows=2, cols=2)
+        table.cell(0, 0).merge(table.cell(1, 0)).text = "Skills"
+        table.cell(0, 1).text = "Python"
+        table.cell(1, 1).text = "Go"
+
+    assert extract_docx_streaming(make_document(build)).splitlines() == ["Skills", "Python", "Go"]
+
+
+def test_falls_back_to_python_docx_for_invalid_zip():
+    _, strategy = extract_docx(b"not a zip")
+    assert strategy == "python-docx"
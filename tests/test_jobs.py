@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from jobs import DEAD_LETTER, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorkerPool, PermanentJobError
+
+
+class FlakyQueue:
+    """Hands out queued jobs, but the database write recording each outcome raises"""
+
+    lease_seconds = 120.0
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.recorded = []
+
+    async def lease(self, owner):
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def renew(self, job, owner):
+        pass
+
+    async def complete(self, job, owner, result):
+        self.recorded.append(job["id"])
+        raise ConnectionError("mongo down")
+
+    async def fail(self, job, owner, error, retryable=True):
+        self.recorded.append(job["id"])
+        raise ConnectionError("mongo down")
+
+    async def reap_expired(self):
+        return 0
+
+    async def wait_for_work(self, timeout):
+        await asyncio.sleep(timeout)
+
+
+def make_queue(**kwargs) -> JobQueue:
+    return JobQueue(AsyncMongoMockClient()["test"]["resume_jobs"], **kwargs)
+
+
+def test_worker_survives_errors_recording_outcomes():
+    async def handler(job):
+        if job["id"] == "bad":
+            raise ValueError("unreadable")
+        return {"ok": True}
+
+    async def run():
+        queue = FlakyQueue([{"id": "bad", "attempts": 1}, {"id": "good", "attempts": 1}, {"id": "last", "attempts": 1}])
+        pool = JobWorkerPool(queue, handler, concurrency=1, poll_interval=0.01)
+        pool.start()
+        await asyncio.sleep(0.1)
+        alive = not pool._tasks[0].done()
+        await pool.stop()
+        return queue.recorded, alive
+
+    recorded, alive = asyncio.run(run())
+    assert recorded == ["bad", "good", "last"]
+    assert alive
+
+
+def test_worker_records_success_and_permanent_failure():
+    async def handler(job):
+        if job["payload"]["filename"] == "bad.txt":
+            raise PermanentJobError("Unsupported file type")
+        return {"name": "Ada"}
+
+    async def run():
+        queue = make_queue()
+        good = await queue.enqueue({"filename": "good.pdf"})
+        bad = await queue.enqueue({"filename": "bad.txt"})
+        pool = JobWorkerPool(queue, handler, concurrency=1, poll_interval=0.01)
+        pool.start()
+        await asyncio.sleep(0.1)
+        await pool.stop()
+        return await queue.get(good), await queue.get(bad)
+
+    good, bad = asyncio.run(run())
+    assert (good["status"], good["result"]) == (SUCCEEDED, {"name": "Ada"})
+    assert (bad["status"], bad["error"], bad["attempts"]) == (FAILED, "Unsupported file type", 1)
+
+
+def test_retryable_failures_are_requeued_then_dead_lettered():
+    async def run():
+        queue = make_queue(max_attempts=2)
+        job_id = await queue.enqueue({"filename": "resume.pdf"})
+        statuses = []
+        for _ in range(2):
+            job = await queue.lease("worker")
+            await queue.fail(job, "worker", "LLM timeout")
+            await queue.collection.update_one({"id": job_id}, {"$set": {"available_at": datetime.utcnow()}})
+            statuses.append((await queue.get(job_id))["status"])
+        return statuses
+
+    assert asyncio.run(run()) == [QUEUED, DEAD_LETTER]
+
+
+def test_expired_leases_are_retaken_until_attempts_run_out():
+    async def expire(queue, job_id):
+        await queue.collection.update_one({"id": job_id}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+    async def run():
+        queue = make_queue(max_attempts=2)
+        job_id = await queue.enqueue({"filename": "resume.pdf"})
+        await queue.lease("crashed-1")
+        await expire(queue, job_id)
+        retaken = await queue.lease("crashed-2")
+        await expire(queue, job_id)
+        exhausted = await queue.lease("worker")
+        reaped = await queue.reap_expired()
+        job = await queue.collection.find_one({"id": job_id})
+        return retaken, exhausted, reaped, job
+
+    retaken, exhausted, reaped, job = asyncio.run(run())
+    assert (retaken["status"], retaken["attempts"]) == (RUNNING, 2)
+    assert exhausted is None
+    assert reaped == 1
+    assert job["status"] == DEAD_LETTER
+    assert "payload" not in job
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from json_stream import FieldEvent, IncrementalJsonDecoder, decode_json_reply
+
+
+def test_strips_fences_and_surrounding_prose():
+    data, repairs = decode_json_reply('Here is the resume:\n```json\n{"name": "Ada"}\n```\nLet me know!')
+    assert data == {"name": "Ada"}
+    assert repairs == {"surrounding_text"}
+
+
+def test_drops_trailing_commas():
+    data, repairs = decode_json_reply('{"skills": ["Go", "Rust",], "name": "Ada",}')
+    assert data == {"skills": ["Go", "Rust"], "name": "Ada"}
+    assert repairs == {"trailing_comma"}
+
+
+def test_clean_reply_needs_no_repairs():
+    assert decode_json_reply('{"name": "Ada", "age": 36}') == ({"name": "Ada", "age": 36}, set())
+
+
+def test_truncated_array_keeps_complete_items():
+    data, repairs = decode_json_reply('{"name": "Ada", "experience": [{"title": "Engineer"}, {"title": "Le')
+    assert data["name"] == "Ada"
+    assert data["experience"][0] == {"title": "Engineer"}
+    assert repairs == {"truncated"}
+
+
+def test_truncated_string_keeps_partial_value():
+    data, repairs = decode_json_reply('{"name": "Ada", "summary": "Builds comp')
+    assert data == {"name": "Ada", "summary": "Builds comp"}
+    assert repairs == {"truncated"}
+
+
+def test_truncated_key_and_number_are_dropped():
+    assert decode_json_reply('{"name": "Ada", "age": 3')[0] == {"name": "Ada"}
+    assert decode_json_reply('{"name": "Ada", "skil')[0] == {"name": "Ada"}
+
+
+def test_reply_without_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        decode_json_reply("Sorry, I can't parse this resume.")
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 3, 64])
+def test_chunked_feed_reports_fields_as_they_complete(chunk_chars):
+    reply = '```json\n{"name": "Ada \\"A\\" L", "skills": ["Go", "Rust"], "experience": [{"title": "Eng"}, {"title": "Lead"}]}\n```'
+    decoder = IncrementalJsonDecoder()
+    events = []
+    for i in range(0, len(reply), chunk_chars):
+        events.extend(decoder.feed(reply[i:i + chunk_chars]))
+
+    complete = {event.field: event.value for event in events if event.complete}
+    assert complete == {
+        "name": 'Ada "A" L',
+        "skills": ["Go", "Rust"],
+        "experience": [{"title": "Eng"}, {"title": "Lead"}],
+    }
+    assert FieldEvent("skills", ["Go"], complete=False) in events
+    assert FieldEvent("experience", [{"title": "Eng"}], complete=False) in events
+    assert decoder.result() == complete
+    assert decoder.repairs == {"surrounding_text"}
@@ -0,0 +1,25 @@
+from normalize import PAGE_BREAK, normalize_resume_text
+
+
+def test_removes_page_numbers_and_repeated_page_furniture():
+    pages = [
+        ["Jane Doe - Resume", "Experience", "Engineer at Acme", "Page 1 of 2"],
+        ["Jane Doe - Resume", "Education", "B.S. Physics", "Page 2 of 2"],
+    ]
+    normalized = normalize_resume_text(PAGE_BREAK.join("\n".join(page) for page in pages))
+    assert normalized.text.splitlines() == ["Jane Doe - Resume", "Experience", "Engineer at Acme", "Education", "B.S. Physics"]
+    assert normalized.removed == {"page_furniture": 1, "page_numbers": 2}
+
+
+def test_removes_consecutive_and_long_repeated_lines():
+    long_line = "Designed and shipped the payments reconciliation service"
+    text = "\n".join(["Skills", "Skills", long_line, "Python", long_line, "Python"])
+    normalized = normalize_resume_text(text)
+    assert normalized.text.splitlines() == ["Skills", long_line, "Python", "Python"]
+    assert normalized.removed == {"duplicates": 2}
+
+
+def test_folds_unicode_and_collapses_whitespace():
+    normalized = normalize_resume_text("\ufeffe\ufb03cient \u00a0 team\u200b player\n\n\n\uf0b7 Python")
+    assert normalized.text == "efficient team player\n• Python"
+    assert normalized.tokens_saved > 0
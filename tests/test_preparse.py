@@ -0,0 +1,82 @@
+from preparse import build_llm_prompt, find_date_range, find_skills, parse_experience, preparse_resume
+
+RESUME = """Jane Doe
+Data Scientist | San Francisco, CA
+jane@example.com | (415) 555-0134 | linkedin.com/in/janedoe
+
+PROFESSIONAL SUMMARY
+Builds ML systems.
+
+Experience
+Senior Data Scientist at Acme Corp Jan 2020 - Present
+- Built forecasting models in Python
+Data Analyst, Globex (2017 - 2019)
+- Reporting in SQL
+
+Education
+B.S. Computer Science, Stanford University, 2017
+
+Skills: Python, SQL, Go
+"""
+
+
+def test_splits_sections_and_skips_contact_lines():
+    preparsed = preparse_resume(RESUME)
+    assert list(preparsed.sections) == ["header", "other", "experience", "education", "skills"]
+    assert preparsed.sections["skills"] == ["Python, SQL, Go"]
+    assert preparsed.contact_lines == 1
+
+
+def test_extracts_header_fields():
+    data = preparse_resume(RESUME).data
+    assert data["name"] == "Jane Doe"
+    assert data["email"] == "jane@example.com"
+    assert data["phone"] == "(415) 555-0134"
+    assert data["location"] == "San Francisco, CA"
+    assert data["socials"] == {"linkedin": "https://linkedin.com/in/janedoe"}
+
+
+def test_extracts_experience_and_education():
+    preparsed = preparse_resume(RESUME)
+    assert [(job["title"], job["company"], job["duration"]) for job in preparsed.data["experience"]] == [
+        ("Senior Data Scientist", "Acme Corp", "Jan 2020 - Present"),
+        ("Data Analyst", "Globex", "2017 - 2019"),
+    ]
+    assert preparsed.data["education"][0]["institution"] == "Stanford University"
+    assert preparsed.confidence == 1.0
+
+
+def test_skills_section_includes_ambiguous_names():
+    assert preparse_resume(RESUME).data["skills"] == ["Python", "SQL", "Go"]
+    # Outside a skills section short names like "Go" are too ambiguous to trust
+    assert find_skills("Python, Go and Rust") == ["Python", "Rust"]
+    assert find_skills("Python, Go and Rust", include_ambiguous=True) == ["Python", "Go", "Rust"]
+
+
+def test_finds_date_ranges():
+    assert find_date_range("Engineer 2019 - 2021").group(0).strip() == "2019 - 2021"
+    assert find_date_range("Analyst, May 2019 to present").group(0).strip() == "May 2019 to present"
+    assert find_date_range("Engineer (03/2018 – 11/2020)").group(0) == "(03/2018 – 11/2020)"
+    assert find_date_range("Led a team of 20 engineers") is None
+
+
+def test_experience_heading_on_the_line_before_its_dates():
+    entries = parse_experience(["Backend Engineer, Initech", "2015 - 2017", "- Shipped the billing service"])
+    assert entries == [{
+        "title": "Backend Engineer",
+        "company": "Initech",
+        "duration": "2015 - 2017",
+        "description": "Shipped the billing service.",
+    }]
+
+
+def test_prompt_keeps_skills_the_dictionary_missed():
+    text = RESUME.replace("Skills: Python, SQL, Go", "Skills: Python, SQL, Go, Salesforce Apex")
+    prompt = build_llm_prompt(preparse_resume(text), text)
+    assert "Python, SQL, Go, Salesforce Apex" in prompt
+
+
+def test_prompt_drops_fully_matched_skills():
+    prompt = build_llm_prompt(preparse_resume(RESUME), RESUME)
+    assert "## SKILLS" not in prompt
+    assert '"skills":["Python","SQL","Go"]' in prompt
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from mongomock_motor import AsyncMongoMockClient
+
+from cache import TTLCache
+from snapshots import SnapshotStore, render_portfolio_html, snapshot_url
+
+PORTFOLIO = {
+    "route_slug": "ada_1234",
+    "username": "Ada",
+    "selected_template": "proclassic",
+    "parsed_resume": {"name": "Ada Lovelace", "socials": {"github": "github.com/ada", "site": "javascript:alert(1)"}},
+}
+
+
+def write_manifest(path, entry):
+    path.write_text(json.dumps({"entrypoints": [entry]}))
+
+
+def test_drops_unsafe_social_links():
+    html = render_portfolio_html(PORTFOLIO)
+    assert 'href="https://github.com/ada"' in html
+    assert "href=\"javascript:" not in html
+    assert ">Site<" not in html
+
+
+def test_snapshot_link_only_shared_with_bundle_tags(tmp_path, monkeypatch):
+    monkeypatch.delenv("FRONTEND_ASSET_MANIFEST", raising=False)
+    assert snapshot_url("ada_1234") is None
+
+    manifest = tmp_path / "asset-manifest.json"
+    write_manifest(manifest, "static/js/main.1.js")
+    monkeypatch.setenv("FRONTEND_ASSET_MANIFEST", str(manifest))
+    assert snapshot_url("ada_1234") == "/api/portfolio/ada_1234/snapshot"
+
+
+def test_snapshots_for_an_old_frontend_build_are_stale(tmp_path, monkeypatch):
+    manifest = tmp_path / "asset-manifest.json"
+    write_manifest(manifest, "static/js/main.1.js")
+    monkeypatch.setenv("FRONTEND_ASSET_MANIFEST", str(manifest))
+
+    async def run():
+        store = SnapshotStore(AsyncMongoMockClient()["test"]["portfolio_snapshots"], TTLCache())
+        await store.save(PORTFOLIO)
+        current = await store.get("ada_1234")
+        write_manifest(manifest, "static/js/main.22.js")
+        return current, await store.get("ada_1234")
+
+    current, after_redeploy = asyncio.run(run())
+    assert current is not None
+    assert after_redeploy is None
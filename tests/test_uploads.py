@@ -0,0 +1,125 @@
+import asyncio
+import io
+import zipfile
+
+import httpx
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from uploads import UploadSizeLimitMiddleware, ZipArchive, ingest_bytes, read_upload, sniff_file_kind
+
+
+def test_sniffs_file_kind_from_leading_bytes():
+    assert sniff_file_kind(b"%PDF-1.7\n...") == "pdf"
+    assert sniff_file_kind(b"\r\n" * 10 + b"%PDF-1.4") == "pdf"
+    assert sniff_file_kind(b"PK\x03\x04rest of zip") == "docx"
+    assert sniff_file_kind("Jane Doe — Engineer".encode("utf-8")) == "text"
+    # A multi-byte character cut off by the sniff window is still text
+    assert sniff_file_kind("Résumé".encode("utf-8")[:2]) == "text"
+    assert sniff_file_kind(b"\x89PNG\r\n\x1a\n\x00\x00") is None
+    assert sniff_file_kind(b"") is None
+
+
+def read(content: bytes, max_bytes: int, chunk_size: int = 64 * 1024):
+    return asyncio.run(read_upload(UploadFile(io.BytesIO(content)), max_bytes, chunk_size=chunk_size))
+
+
+def test_read_upload_hashes_and_types_the_body():
+    content = b"%PDF-1.7 " + b"x" * 100
+    upload = read(content, max_bytes=200, chunk_size=32)
+    assert (upload.kind, upload.size, upload.content) == ("pdf", len(content), content)
+    assert upload.sha256 == ingest_bytes(content, 200).sha256
+
+
+def test_read_upload_stops_at_the_cap():
+    file = UploadFile(io.BytesIO(b"%PDF-" + b"x" * 1000))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(read_upload(file, max_bytes=100, chunk_size=64))
+    assert error.value.status_code == 413
+    assert file.file.tell() < 200
+
+
+@pytest.mark.parametrize("content, max_bytes, status_code", [
+    (b"%PDF-" + b"x" * 200, 100, 413),
+    (b"\x00\x01\x02\x03binary", 100, 400),
+    (b"", 100, 400),
+])
+def test_read_upload_rejects_bad_bodies(content, max_bytes, status_code):
+    with pytest.raises(HTTPException) as error:
+        read(content, max_bytes)
+    assert error.value.status_code == status_code
+
+
+def test_ingest_bytes_applies_the_same_checks():
+    assert ingest_bytes(b"PK\x03\x04zip", 100).kind == "docx"
+    for content, status_code in ((b"x" * 101, 413), (b"", 400), (b"\x00\xff", 400)):
+        with pytest.raises(HTTPException) as error:
+            ingest_bytes(content, 100)
+        assert error.value.status_code == status_code
+
+
+async def echo_size(request):
+    return JSONResponse({"received": len(await request.body())})
+
+
+def post(path: str, **kwargs) -> httpx.Response:
+    app = UploadSizeLimitMiddleware(Starlette(routes=[Route("/{path:path}", echo_size, methods=["POST"])]), [("/api/upload", 10)])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_size_limit_middleware():
+    assert post("/api/upload", content=b"x" * 10).json() == {"received": 10}
+    # Declared too large: refused before the body is read
+    assert post("/api/upload", content=b"x" * 11).status_code == 413
+
+    async def chunks():
+        yield b"x" * 6
+        yield b"x" * 6
+
+    # Chunked bodies carry no Content-Length and are cut off as they cross the cap
+    assert post("/api/upload", content=chunks()).status_code == 413
+    assert post("/api/other", content=b"x" * 100).json() == {"received": 100}
+
+
+def make_zip(members) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def test_zip_archive_lists_resumes_and_caps_member_size():
+    archive = ZipArchive(make_zip({
+        "resumes/ada.pdf": b"%PDF-1.7 ada",
+        "resumes/big.pdf": b"%PDF-" + b"0" * 10000,
+        "__MACOSX/resumes/._ada.pdf": b"junk",
+        "resumes/.DS_Store": b"junk",
+    }), max_members=5)
+    try:
+        members = {info.filename: info for info in archive.members}
+        assert sorted(members) == ["resumes/ada.pdf", "resumes/big.pdf"]
+        assert archive.read_member(members["resumes/ada.pdf"], max_bytes=100).kind == "pdf"
+        with pytest.raises(HTTPException) as error:
+            archive.read_member(members["resumes/big.pdf"], max_bytes=100)
+        assert error.value.status_code == 413
+    finally:
+        archive.close()
+
+
+def test_zip_archive_rejects_bad_archives():
+    with pytest.raises(HTTPException) as error:
+        ZipArchive(io.BytesIO(b"not a zip"), max_members=5)
+    assert error.value.status_code == 400
+    with pytest.raises(HTTPException) as error:
+        ZipArchive(make_zip({f"{i}.pdf": b"%PDF-" for i in range(3)}), max_members=2)
+    assert error.value.status_code == 413